@@ -12,6 +12,9 @@ At present, it differs from Studio exports in several ways:
 * The top-level directory in the resulting tarball is a "safe"
   (i.e. ascii) version of the course_key, rather than the word "course".
 * It only supports the export of courses.  It does not export libraries.
+
+With --stream, the course is exported straight into the tar.gz file instead
+of being written to a temporary directory which is then compressed.
 """
 
 import os
@@ -27,7 +30,7 @@ from opaque_keys.edx.keys import CourseKey
 from path import Path as path
 
 from xmodule.modulestore.django import modulestore
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tarball, export_course_to_xml
 
 
 class Command(BaseCommand):
@@ -39,6 +42,8 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('course_id')
         parser.add_argument('--output')
+        parser.add_argument('--stream', action='store_true',
+                            help='Export the course straight into the tar.gz file, without a temporary directory')
 
     def handle(self, *args, **options):
         course_id = options['course_id']
@@ -57,7 +62,10 @@ class Command(BaseCommand):
             filename = mktemp()
             pipe_results = True
 
-        export_course_to_tarfile(course_key, filename)
+        if options['stream']:
+            stream_course_to_tarfile(course_key, filename)
+        else:
+            export_course_to_tarfile(course_key, filename)
 
         results = self._get_results(filename) if pipe_results else None
 
@@ -81,9 +89,16 @@ def export_course_to_tarfile(course_key, filename):
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def export_course_to_directory(course_key, root_dir):
-    """Export course into a directory"""
+def stream_course_to_tarfile(course_key, filename):
+    """Exports a course straight into a tar.gz file"""
     store = modulestore()
+    course, course_dir = get_course_and_directory_name(store, course_key)
+    with tarfile.open(filename, 'w:gz') as tar_file:
+        export_course_to_tarball(store, None, course.id, tar_file, course_dir)
+
+
+def get_course_and_directory_name(store, course_key):
+    """Returns the course, and the name of the directory to export it to"""
     course = store.get_course(course_key)
     if course is None:
         raise CommandError("Invalid course_id")
@@ -94,6 +109,13 @@ def export_course_to_directory(course_key, root_dir):
     replacement_char = u'-'
     course_dir = replacement_char.join([course.id.org, course.id.course, course.id.run])
     course_dir = re.sub(r'[^\w\.\-]', replacement_char, course_dir)
+    return course, course_dir
+
+
+def export_course_to_directory(course_key, root_dir):
+    """Export course into a directory"""
+    store = modulestore()
+    course, course_dir = get_course_and_directory_name(store, course_key)
 
     export_course_to_xml(store, None, course.id, root_dir, course_dir)
 
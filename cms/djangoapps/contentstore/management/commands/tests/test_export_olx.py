@@ -83,6 +83,18 @@ class TestCourseExportOlx(ModuleStoreTestCase):
         with tarfile.open(filename) as tar_file:
             self.check_export_file(tar_file, test_course_key)
 
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_stream_course(self, store_type):
+        test_course_key = self.create_dummy_course(store_type)
+        tmp_dir = path(mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        filename = tmp_dir / 'test.tar.gz'
+        call_command('export_olx', '--stream', '--output', filename, unicode(test_course_key))
+        with tarfile.open(filename) as tar_file:
+            self.check_export_file(tar_file, test_course_key)
+            names = tar_file.getnames()
+            self.assertEqual(len(names), len(set(names)))
+
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_export_course_stdout(self, store_type):
         test_course_key = self.create_dummy_course(store_type)
@@ -51,7 +51,12 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import (
+    export_course_to_tarball,
+    export_course_to_xml,
+    export_library_to_tarball,
+    export_library_to_xml
+)
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 from xmodule.video_module.transcripts_utils import (
     Transcript,
@@ -637,20 +642,34 @@ def create_export_tarball(course_module, course_key, context, status=None):
     """
     name = course_module.url_name
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
+    root_dir = None
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+        if settings.FEATURES.get('ENABLE_EXPORT_STREAMING'):
+            LOGGER.debug(u'tar file being generated at %s', export_file.name)
+            # The export is streamed straight into the tarball, without an intermediate directory.
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                if isinstance(course_key, LibraryLocator):
+                    export_library_to_tarball(modulestore(), contentstore(), course_key, tar_file, name)
+                else:
+                    export_course_to_tarball(modulestore(), contentstore(), course_module.id, tar_file, name)
+
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
         else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
+            root_dir = path(mkdtemp())
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
 
-        if status:
-            status.set_state(u'Compressing')
-            status.increment_completed_steps()
-        LOGGER.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+            if status:
+                status.set_state(u'Compressing')
+                status.increment_completed_steps()
+            LOGGER.debug(u'tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                tar_file.add(root_dir / name, arcname=name)
 
     except SerializationError as exc:
         LOGGER.exception(u'There was an error exporting %s', course_key, exc_info=True)
@@ -684,7 +703,7 @@ def create_export_tarball(course_module, course_key, context, status=None):
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
     finally:
-        if os.path.exists(root_dir / name):
+        if root_dir is not None and os.path.exists(root_dir / name):
             shutil.rmtree(root_dir / name)
 
     return export_file
@@ -5,7 +5,13 @@ Tests core caching facilities.
 from django.test import TestCase
 from opaque_keys.edx.locator import AssetLocator, CourseLocator
 
-from openedx.core.djangoapps.contentserver.caching import del_cached_content, get_cached_content, set_cached_content
+from openedx.core.djangoapps.contentserver.caching import (
+    del_cached_content,
+    get_cached_content,
+    get_cached_content_metadata,
+    set_cached_content,
+    set_cached_content_metadata
+)
 
 
 class Content(object):
@@ -43,3 +49,13 @@ class CachingTestCase(TestCase):
                          'should not be stored in cache with unicodeLocation')
         self.assertEqual(None, get_cached_content(self.nonUnicodeLocation),
                          'should not be stored in cache with nonUnicodeLocation')
+
+    def test_delete_metadata(self):
+        set_cached_content(self.mockAsset)
+        set_cached_content_metadata(self.mockAsset)
+        self.assertEqual(self.mockAsset.content, get_cached_content_metadata(self.unicodeLocation).content)
+        del_cached_content(self.nonUnicodeLocation)
+        self.assertEqual(None, get_cached_content_metadata(self.unicodeLocation),
+                         'metadata should not be stored in cache with unicodeLocation')
+        self.assertEqual(None, get_cached_content(self.unicodeLocation),
+                         'should not be stored in cache with unicodeLocation')
@@ -5,6 +5,7 @@ from __future__ import absolute_import, division, print_function
 
 import copy
 import json
+import tarfile
 from uuid import uuid4
 
 import mock
@@ -53,6 +54,21 @@ class ExportCourseTestCase(CourseTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
+    @mock.patch.dict(settings.FEATURES, {'ENABLE_EXPORT_STREAMING': True})
+    def test_success_streamed(self):
+        """
+        Verify that a course export streamed into its tarball succeeds, with each path added once
+        """
+        key = str(self.course.location.course_key)
+        result = export_olx.delay(self.user.id, key, u'en')
+        status = UserTaskStatus.objects.get(task_id=result.id)
+        self.assertEqual(status.state, UserTaskStatus.SUCCEEDED)
+        output = UserTaskArtifact.objects.get(status=status)
+        with tarfile.open(fileobj=output.file, mode='r:gz') as tar_file:
+            names = tar_file.getnames()
+        self.assertIn(u'{}/course.xml'.format(self.course.url_name), names)
+        self.assertEqual(len(names), len(set(names)))
+
     @mock.patch('contentstore.tasks.export_course_to_xml', side_effect=side_effect_exception)
     def test_exception(self, mock_export):  # pylint: disable=unused-argument
         """
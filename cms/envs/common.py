@@ -66,6 +66,10 @@ from lms.envs.common import (
     MEDIA_ROOT,
     MEDIA_URL,
 
+    # Local disk cache for course assets
+    COURSE_ASSETS_DISK_CACHE_DIR,
+    COURSE_ASSETS_DISK_CACHE_MAX_SIZE,
+
     # Lazy Gettext
     _,
 
@@ -317,6 +321,10 @@ FEATURES = {
 
     # Set this to true to make API docs available at /api-docs/.
     'ENABLE_API_DOCS': False,
+
+    # Whether course and library exports are streamed straight into their tarball, with the assets
+    # fetched concurrently, rather than written to a directory which is then compressed.
+    'ENABLE_EXPORT_STREAMING': False,
 }
 
 ENABLE_JASMINE = False
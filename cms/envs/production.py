@@ -117,6 +117,13 @@ DEFAULT_MOBILE_AVAILABLE = ENV_TOKENS.get(
 MEDIA_ROOT = ENV_TOKENS.get('MEDIA_ROOT', MEDIA_ROOT)
 MEDIA_URL = ENV_TOKENS.get('MEDIA_URL', MEDIA_URL)
 
+# COURSE_ASSETS_DISK_CACHE_DIR specifies the directory where large course assets are cached by the contentserver.
+COURSE_ASSETS_DISK_CACHE_DIR = ENV_TOKENS.get('COURSE_ASSETS_DISK_CACHE_DIR', COURSE_ASSETS_DISK_CACHE_DIR)
+COURSE_ASSETS_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_ASSETS_DISK_CACHE_MAX_SIZE',
+    COURSE_ASSETS_DISK_CACHE_MAX_SIZE
+)
+
 # GITHUB_REPO_ROOT is the base directory
 # for course data
 GITHUB_REPO_ROOT = ENV_TOKENS.get('GITHUB_REPO_ROOT', GITHUB_REPO_ROOT)
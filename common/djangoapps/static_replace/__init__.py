@@ -8,11 +8,18 @@ from django.conf import settings
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
+from openedx.core.lib.cache_utils import get_cache, process_cached
 from six import text_type
 
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Name of the request cache holding the static urls resolved during the current request.
+STATIC_URL_CACHE_NAME = 'static_replace.static_urls'
+
+COURSE_URL_PREFIX = '/course/'
+JUMP_TO_ID_URL_PREFIX = '/jump_to_id/'
+
 
 def _url_replace_regex(prefix):
     """
@@ -30,6 +37,31 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+@process_cached
+def _compiled_url_replace_regex(prefix):
+    """
+    Return `_url_replace_regex(prefix)`, compiled.  Compiled regexes are kept for the life of the process.
+    """
+    return re.compile(_url_replace_regex(prefix))
+
+
+def _static_url_prefix(data_dir):
+    """
+    Return the regex prefix matching static urls, excluding those already pointing into `data_dir`.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+def _may_contain_static_urls(text):
+    """
+    Cheap check for whether `text` may contain any static urls, used to skip running regexes over it.
+    """
+    return '/static/' in text or settings.STATIC_URL in text
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -71,7 +103,9 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    if JUMP_TO_ID_URL_PREFIX not in text:
+        return text
+    return _compiled_url_replace_regex(JUMP_TO_ID_URL_PREFIX).sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -84,6 +118,9 @@ def replace_course_urls(text, course_key):
     returns: text with the links replaced
     """
 
+    if COURSE_URL_PREFIX not in text:
+        return text
+
     course_id = text_type(course_key)
 
     def replace_course_url(match):
@@ -91,7 +128,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex(COURSE_URL_PREFIX).sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -99,6 +136,18 @@ def process_static_urls(text, replacement_function, data_dir=None):
     Run an arbitrary replacement function on any urls matching the static file
     directory
     """
+    if not _may_contain_static_urls(text):
+        return text
+
+    wrap_part_extraction = _static_url_match_handler(replacement_function)
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(wrap_part_extraction, text)
+
+
+def _static_url_match_handler(replacement_function):
+    """
+    Return a function handling a static url match by calling `replacement_function`
+    with its parts, leaving XBlock resource urls alone.
+    """
     def wrap_part_extraction(match):
         """
         Unwraps a match group for the captures specified in _url_replace_regex
@@ -121,14 +170,7 @@ def process_static_urls(text, replacement_function, data_dir=None):
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return wrap_part_extraction
 
 
 def make_static_urls_absolute(request, html):
@@ -155,6 +197,9 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     /static/$course_data_dir/$stuff, or, if course_namespace is not None, by the
     correct url in the contentstore (/c4x/.. or /asset-loc:..)
 
+    Resolved urls are cached for the rest of the request, so a static url occurring
+    in several fragments rendered during a request is only resolved once.
+
     text: The source text to do the substitution in
     data_directory: The directory in which course data is stored
     course_id: The course identifier used to distinguish static content for this course in studio
@@ -163,10 +208,66 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
       * the original unmodified static URI
       * the updated static URI (will match the original if unchanged)
     """
+    return process_static_urls(
+        text,
+        _static_url_replacer(data_directory, course_id, static_asset_path, static_paths_out),
+        data_dir=static_asset_path or data_directory
+    )
+
+
+def replace_urls(text, course_id, jump_to_id_base_url=None, data_directory=None, static_asset_path=''):
+    """
+    Rewrite static, course and jump_to_id urls in `text` in a single pass.
 
+    This is equivalent to applying `replace_static_urls`, `replace_course_urls` and
+    (if `jump_to_id_base_url` is given) `replace_jump_to_id_urls` in turn, but scans
+    `text` only once, and not at all if it contains none of the url prefixes.
+    """
+    data_dir = static_asset_path or data_directory
+    has_static_urls = _may_contain_static_urls(text)
+    has_course_urls = COURSE_URL_PREFIX in text
+    has_jump_to_id_urls = jump_to_id_base_url is not None and JUMP_TO_ID_URL_PREFIX in text
+    if not (has_static_urls or has_course_urls or has_jump_to_id_urls):
+        return text
+
+    prefixes = []
+    if has_static_urls:
+        prefixes.append(_static_url_prefix(data_dir))
+    if has_course_urls:
+        prefixes.append(COURSE_URL_PREFIX)
+    if has_jump_to_id_urls:
+        prefixes.append(JUMP_TO_ID_URL_PREFIX)
+
+    handle_static_url = _static_url_match_handler(
+        _static_url_replacer(data_directory, course_id, static_asset_path)
+    )
+    course_url_base = u'/courses/{}/'.format(text_type(course_id))
+
+    def replace_url(match):
+        """
+        Rewrite a single matched url according to its prefix.
+        """
+        prefix = match.group('prefix')
+        quote = match.group('quote')
+        rest = match.group('rest')
+        if has_course_urls and prefix == COURSE_URL_PREFIX:
+            return "".join([quote, course_url_base, rest, quote])
+        if has_jump_to_id_urls and prefix == JUMP_TO_ID_URL_PREFIX:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
+        return handle_static_url(match)
+
+    return _compiled_url_replace_regex(u'(?:{})'.format(u'|'.join(prefixes))).sub(replace_url, text)
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path, static_paths_out=None):
+    """
+    Return the function used by `replace_static_urls` to replace a single matched static url.
+    """
     if static_paths_out is None:
         static_paths_out = []
 
+    url_cache = get_cache(STATIC_URL_CACHE_NAME)
+
     def replace_static_url(original, prefix, quote, rest):
         """
         Replace a single matched url.
@@ -177,53 +278,64 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
             static_paths_out.append((original_uri, original_uri))
             return original
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+        cache_key = (text_type(course_id), static_asset_path, data_directory, prefix, rest)
+        url = url_cache.get(cache_key)
+        if url is None:
+            url = url_cache[cache_key] = _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path)
 
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+        static_paths_out.append((original_uri, url))
+        return "".join([quote, url, quote])
 
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
+    return replace_static_url
 
-            if exists_in_staticfiles_storage:
+
+def _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path):
+    """
+    Return the url a static url with the given `prefix` and `rest` should be rewritten to.
+    """
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return "".join([prefix, rest])
+
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            # Import is placed here to avoid model import at project startup.
+            from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+            base_url = AssetBaseUrlConfig.get_base_url()
+            excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+            url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
                 url = staticfiles_storage.url(rest)
             else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
-
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
-
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
-
-        static_paths_out.append((original_uri, url))
-        return "".join([quote, url, quote])
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return url
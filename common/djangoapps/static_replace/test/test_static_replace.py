@@ -10,6 +10,7 @@ import ddt
 import pytest
 from django.test import override_settings
 from django.utils.http import urlencode, urlquote
+from edx_django_utils.cache import RequestCache
 from mock import Mock, patch
 from opaque_keys.edx.keys import CourseKey
 from PIL import Image
@@ -19,7 +20,9 @@ from static_replace import (
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
 )
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
@@ -37,6 +40,16 @@ COURSE_KEY = CourseKey.from_string('org/course/run')
 STATIC_SOURCE = '"/static/file.png"'
 
 
+@pytest.fixture(autouse=True)
+def clear_request_cache():
+    """
+    Static urls resolved by replace_static_urls are cached for the rest of the request.
+    """
+    RequestCache.clear_all_namespaces()
+    yield
+    RequestCache.clear_all_namespaces()
+
+
 def encode_unicode_characters_in_url(url):
     """
     Encodes all Unicode characters to their percent-encoding representation
@@ -199,6 +212,51 @@ def test_static_paths_out(mock_modulestore, mock_storage):
     assert static_paths == [(static_url, static_course_url), (raw_url, raw_url)]
 
 
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_static_url_resolution_is_request_cached(mock_storage):
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.abc123.png'
+
+    text = '<img src="/static/file.png"/><img src="/static/file.png"/>'
+    expected = '<img src="/static/file.abc123.png"/><img src="/static/file.abc123.png"/>'
+    assert replace_static_urls(text, DATA_DIRECTORY) == expected
+    assert replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY) == '"/static/file.abc123.png"'
+    mock_storage.exists.assert_called_once_with('file.png')
+    mock_storage.url.assert_called_once_with('file.png')
+
+
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_no_urls_skips_regex(mock_storage):
+    text = '<p>Nothing to <a href="http://example.com/x">replace</a></p>'
+    with patch('static_replace._compiled_url_replace_regex') as mock_regex:
+        assert replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY) == text
+        assert replace_course_urls(text, COURSE_KEY) == text
+        assert replace_jump_to_id_urls(text, COURSE_KEY, '/jump/') == text
+        assert replace_urls(text, COURSE_KEY, '/jump/', DATA_DIRECTORY) == text
+    assert not mock_regex.called
+    assert not mock_storage.exists.called
+
+
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls_matches_separate_passes(mock_storage):
+    mock_storage.exists.return_value = False
+    mock_storage.url.side_effect = lambda path: '/static/' + path
+
+    text = (
+        '<a href="/course/info">info</a> <img src="/static/file.png"/> '
+        '<a href="/jump_to_id/abc">jump</a> <a href=\'/static/foo.png?raw\'>raw</a>'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(text, DATA_DIRECTORY), COURSE_KEY),
+        COURSE_KEY,
+        '/jump/'
+    )
+    assert replace_urls(text, COURSE_KEY, '/jump/', DATA_DIRECTORY) == expected
+    assert '/courses/org/course/run/info' in expected
+    assert '/static/data_dir/file.png' in expected
+    assert '/jump/abc' in expected
+
+
 def test_regex():
     yes = ('"/static/foo.png"',
            '"/static/foo.png"',
@@ -433,73 +491,73 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             u'',
             u'/static/{prfx}_ünlöck.png?foo=/static/{prfx}_lock.png',
             u'/{asset}@{prfx}_ünlöck.png?foo={encoded_asset}{prfx}_lock.png',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_lock.png?foo=/static/{prfx}_ünlöck.png',
             u'/{asset}@{prfx}_lock.png?foo={encoded_asset}{prfx}_ünlöck.png',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_excluded.html',
             u'/{base_asset}@{prfx}_excluded.html?foo={encoded_base_asset}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_not_excluded.htm',
             u'/{base_asset}@{prfx}_excluded.html?foo={encoded_asset}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_excluded.html',
             u'/{asset}@{prfx}_not_excluded.htm?foo={encoded_base_asset}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_not_excluded.htm',
             u'/{asset}@{prfx}_not_excluded.htm?foo={encoded_asset}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_ünlöck.png?foo=/static/{prfx}_lock.png',
             u'//dev/{asset}@{prfx}_ünlöck.png?foo={encoded_asset}{prfx}_lock.png',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_lock.png?foo=/static/{prfx}_ünlöck.png',
             u'/{asset}@{prfx}_lock.png?foo={encoded_base_url}{encoded_asset}{prfx}_ünlöck.png',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_excluded.html',
             u'/{base_asset}@{prfx}_excluded.html?foo={encoded_base_asset}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_not_excluded.htm',
             u'/{base_asset}@{prfx}_excluded.html?foo={encoded_base_url}{encoded_asset}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_excluded.html',
             u'//dev/{asset}@{prfx}_not_excluded.htm?foo={encoded_base_asset}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_not_excluded.htm',
             u'//dev/{asset}@{prfx}_not_excluded.htm?foo={encoded_base_url}{encoded_asset}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         # Already asset key.
         (u'', u'/{base_asset}@{prfx}_ünlöck.png', u'/{asset}@{prfx}_ünlöck.png', 1),
@@ -662,73 +720,73 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             u'',
             u'/static/{prfx}_ünlöck.png?foo=/static/{prfx}_lock.png',
             u'/{c4x}/{prfx}_ünlöck.png?foo={encoded_c4x}{prfx}_lock.png',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_lock.png?foo=/static/{prfx}_ünlöck.png',
             u'/{c4x}/{prfx}_lock.png?foo={encoded_c4x}{prfx}_ünlöck.png',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_excluded.html',
             u'/{base_c4x}/{prfx}_excluded.html?foo={encoded_base_c4x}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_not_excluded.htm',
             u'/{base_c4x}/{prfx}_excluded.html?foo={encoded_c4x}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_excluded.html',
             u'/{c4x}/{prfx}_not_excluded.htm?foo={encoded_base_c4x}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_not_excluded.htm',
             u'/{c4x}/{prfx}_not_excluded.htm?foo={encoded_c4x}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_ünlöck.png?foo=/static/{prfx}_lock.png',
             u'//dev/{c4x}/{prfx}_ünlöck.png?foo={encoded_c4x}{prfx}_lock.png',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_lock.png?foo=/static/{prfx}_ünlöck.png',
             u'/{c4x}/{prfx}_lock.png?foo={encoded_base_url}{encoded_c4x}{prfx}_ünlöck.png',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_excluded.html',
             u'/{base_c4x}/{prfx}_excluded.html?foo={encoded_base_c4x}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_excluded.html?foo=/static/{prfx}_not_excluded.htm',
             u'/{base_c4x}/{prfx}_excluded.html?foo={encoded_base_url}{encoded_c4x}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_excluded.html',
             u'//dev/{c4x}/{prfx}_not_excluded.htm?foo={encoded_base_c4x}{prfx}_excluded.html',
-            2
+            1
         ),
         (
             u'dev',
             u'/static/{prfx}_not_excluded.htm?foo=/static/{prfx}_not_excluded.htm',
             u'//dev/{c4x}/{prfx}_not_excluded.htm?foo={encoded_base_url}{encoded_c4x}{prfx}_not_excluded.htm',
-            2
+            1
         ),
         # Old, c4x-style path.
         (u'', u'/{c4x}/{prfx}_ünlöck.png', u'/{c4x}/{prfx}_ünlöck.png', 1),
@@ -30,7 +30,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.core.cache import cache
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.db import IntegrityError, models
+from django.db import IntegrityError, models, transaction
 from django.db.models import Count, Q
 from django.db.models.signals import post_save, pre_save
 from django.db.utils import ProgrammingError
@@ -53,6 +53,7 @@ from user_util import user_util
 from edx_django_utils.cache import RequestCache
 import lms.lib.comment_client as cc
 from student.signals import UNENROLL_DONE, ENROLL_STATUS_CHANGE, ENROLLMENT_TRACK_UPDATED
+from student.tasks import send_enroll_status_change_signals
 from lms.djangoapps.certificates.models import GeneratedCertificate
 from course_modes.models import CourseMode
 from courseware.models import (
@@ -1062,6 +1063,13 @@ class CourseEnrollment(models.Model):
 
     MODE_CACHE_NAMESPACE = u'CourseEnrollment.mode_and_active'
 
+    # cache key format e.g enrollment_states.<user_id> = {<course_key>: ('honor', True)}
+    ENROLLMENT_STATES_CACHE_KEY = u"enrollment_states.{}"
+    ENROLLMENT_STATES_CACHE_TIMEOUT = 60 * 60
+
+    # Number of enrollments written at a time by bulk_enroll.
+    BULK_ENROLL_CHUNK_SIZE = 500
+
     class Meta(object):
         unique_together = (('user', 'course'),)
         ordering = ('user', 'course')
@@ -1250,34 +1258,66 @@ class CourseEnrollment(models.Model):
 
         try:
             context = contexts.course_context_from_course_id(self.course_id)
-            assert isinstance(self.course_id, CourseKey)
-            data = {
-                'user_id': self.user.id,
-                'course_id': text_type(self.course_id),
-                'mode': self.mode,
-            }
-            segment_properties = {
-                'category': 'conversion',
-                'label': text_type(self.course_id),
-                'org': self.course_id.org,
-                'course': self.course_id.course,
-                'run': self.course_id.run,
-                'mode': self.mode,
-            }
-            if event_name == EVENT_NAME_ENROLLMENT_ACTIVATED:
-                segment_properties['email'] = self.user.email
             with tracker.get_tracker().context(event_name, context):
-                tracker.emit(event_name, data)
-                segment.track(self.user_id, event_name, segment_properties)
+                self._emit_event_in_context(event_name)
 
         except:  # pylint: disable=bare-except
-            if event_name and self.course_id:
-                log.exception(
-                    u'Unable to emit event %s for user %s and course %s',
-                    event_name,
-                    self.user.username,
-                    self.course_id,
-                )
+            self._log_event_failure(event_name)
+
+    @classmethod
+    def emit_events(cls, enrollments, event_name):
+        """
+        Emits an event for each of the given enrollments in the same course, under a
+        single tracker context.
+        """
+        if not enrollments:
+            return
+        try:
+            context = contexts.course_context_from_course_id(enrollments[0].course_id)
+        except:  # pylint: disable=bare-except
+            enrollments[0]._log_event_failure(event_name)  # pylint: disable=protected-access
+            return
+        with tracker.get_tracker().context(event_name, context):
+            for enrollment in enrollments:
+                try:
+                    enrollment._emit_event_in_context(event_name)  # pylint: disable=protected-access
+                except:  # pylint: disable=bare-except
+                    enrollment._log_event_failure(event_name)  # pylint: disable=protected-access
+
+    def _emit_event_in_context(self, event_name):
+        """
+        Emits the event within the tracker context of the enrollment's course.
+        """
+        assert isinstance(self.course_id, CourseKey)
+        data = {
+            'user_id': self.user.id,
+            'course_id': text_type(self.course_id),
+            'mode': self.mode,
+        }
+        segment_properties = {
+            'category': 'conversion',
+            'label': text_type(self.course_id),
+            'org': self.course_id.org,
+            'course': self.course_id.course,
+            'run': self.course_id.run,
+            'mode': self.mode,
+        }
+        if event_name == EVENT_NAME_ENROLLMENT_ACTIVATED:
+            segment_properties['email'] = self.user.email
+        tracker.emit(event_name, data)
+        segment.track(self.user_id, event_name, segment_properties)
+
+    def _log_event_failure(self, event_name):
+        """
+        Logs the exception raised while emitting an event.
+        """
+        if event_name and self.course_id:
+            log.exception(
+                u'Unable to emit event %s for user %s and course %s',
+                event_name,
+                self.user.username,
+                self.course_id,
+            )
 
     @classmethod
     def enroll(cls, user, course_key, mode=None, check_access=False):
@@ -1398,6 +1438,124 @@ class CourseEnrollment(models.Model):
                 return None
             raise
 
+    @classmethod
+    def bulk_enroll(cls, users, course_key, mode=None):
+        """
+        Enroll many users in a course. This saves immediately.
+
+        Returns the users' CourseEnrollment objects, in the order of `users`.
+
+        Enrollments are created and updated BULK_ENROLL_CHUNK_SIZE at a time with
+        `bulk_create` and `update`, rather than by calling `enroll` for every user.
+        The enrollments of a chunk have the same effects as `enroll`: model signals
+        are still sent for every created or changed enrollment, but the tracking
+        events of a chunk are emitted under a single tracker context, the cached
+        enrollment status hashes are deleted at once and the ENROLL_STATUS_CHANGE
+        signals are sent by a celery task once the chunk is committed.
+
+        No access checks are made, it is expected that this method is called from a
+        method which has already verified the users may be enrolled in the course.
+        """
+        assert isinstance(course_key, CourseKey)
+        if mode is None:
+            mode = _default_course_mode(text_type(course_key))
+
+        users_by_id = OrderedDict()
+        for user in users:
+            if user.id is None:
+                user.save()
+            users_by_id[user.id] = user
+        user_ids = list(users_by_id)
+
+        enrollments = {}
+        for start in range(0, len(user_ids), cls.BULK_ENROLL_CHUNK_SIZE):
+            chunk = [users_by_id[user_id] for user_id in user_ids[start:start + cls.BULK_ENROLL_CHUNK_SIZE]]
+            with transaction.atomic():
+                enrollments.update(cls._bulk_enroll_chunk(chunk, course_key, mode))
+        return [enrollments[user.id] for user in users]
+
+    @classmethod
+    def _bulk_enroll_chunk(cls, users, course_key, mode):
+        """
+        Enrolls a chunk of the users of `bulk_enroll`, returning their enrollments by user id.
+        """
+        users_by_id = {user.id: user for user in users}
+        enrollments = {
+            enrollment.user_id: enrollment
+            for enrollment in cls.objects.filter(course_id=course_key, user_id__in=list(users_by_id))
+        }
+        activated = []
+        mode_changed = []
+        updated = []
+        for enrollment in enrollments.itervalues():
+            if not enrollment.is_active:
+                activated.append(enrollment)
+            if enrollment.mode != mode:
+                mode_changed.append(enrollment)
+            if not enrollment.is_active or enrollment.mode != mode:
+                # Recorded by the pre_save receiver of verified_track_content on save.
+                enrollment._old_mode = enrollment.mode  # pylint: disable=protected-access
+                enrollment.is_active = True
+                enrollment.mode = mode
+                updated.append(enrollment)
+        if updated:
+            cls.objects.filter(pk__in=[enrollment.pk for enrollment in updated]).update(is_active=True, mode=mode)
+
+        created = []
+        new_user_ids = [user_id for user_id in users_by_id if user_id not in enrollments]
+        if new_user_ids:
+            cls.objects.bulk_create([
+                cls(user_id=user_id, course_id=course_key, mode=mode, is_active=True) for user_id in new_user_ids
+            ])
+            # bulk_create doesn't set the primary keys of the rows it inserts on MySQL.
+            created = list(cls.objects.filter(course_id=course_key, user_id__in=new_user_ids))
+        for enrollment in created:
+            enrollment._old_mode = None  # pylint: disable=protected-access
+            enrollments[enrollment.user_id] = enrollment
+            activated.append(enrollment)
+            # `enroll` creates enrollments in the default mode before changing it.
+            if mode != CourseMode.DEFAULT_MODE_SLUG:
+                mode_changed.append(enrollment)
+        for enrollment in enrollments.itervalues():
+            enrollment.user = users_by_id[enrollment.user_id]
+
+        created_ids = set(enrollment.id for enrollment in created)
+        for enrollment in updated + created:
+            post_save.send(
+                sender=cls, instance=enrollment, created=enrollment.id in created_ids,
+                update_fields=None, raw=False, using=enrollment._state.db,  # pylint: disable=protected-access
+            )
+            cls._update_enrollment_in_request_cache(
+                enrollment.user, course_key, CourseEnrollmentState(enrollment.mode, enrollment.is_active)
+            )
+        cache.delete_many([cls.enrollment_status_hash_cache_key(enrollment.user) for enrollment in updated + created])
+
+        # Unlinked CEAs become linked now, as in get_or_create_enrollment.
+        users_by_email = {user.email: user for user in users}
+        allowed_enrollments = CourseEnrollmentAllowed.objects.filter(
+            email__in=list(users_by_email), course_id=course_key, user__isnull=True
+        )
+        for allowed_enrollment in allowed_enrollments:
+            CourseEnrollmentAllowed.objects.filter(pk=allowed_enrollment.pk).update(
+                user=users_by_email[allowed_enrollment.email]
+            )
+
+        cls.emit_events(activated, EVENT_NAME_ENROLLMENT_ACTIVATED)
+        cls.emit_events(mode_changed, EVENT_NAME_ENROLLMENT_MODE_CHANGED)
+        for enrollment in mode_changed:
+            ENROLLMENT_TRACK_UPDATED.send(
+                sender=None,
+                user=enrollment.user,
+                course_key=course_key,
+                countdown=SCORE_RECALCULATION_DELAY_ON_ENROLLMENT_UPDATE
+            )
+
+        user_ids = list(users_by_id)
+        transaction.on_commit(lambda: send_enroll_status_change_signals.delay(
+            user_ids, text_type(course_key), mode, EnrollStatusChange.enroll
+        ))
+        return enrollments
+
     @classmethod
     def unenroll(cls, user, course_id, skip_refund=False):
         """
@@ -1505,6 +1663,22 @@ class CourseEnrollment(models.Model):
     def enrollments_for_user(cls, user):
         return cls.objects.filter(user=user, is_active=1).select_related('user')
 
+    @classmethod
+    def active_enrollment_modes_for_user(cls, user):
+        """
+        Returns the modes of the user's active enrollments, keyed by course key.
+
+        Unlike `enrollments_for_user`, this is served from the cached enrollment
+        states of the user, so use it when the CourseEnrollment objects aren't needed.
+        """
+        if user.is_anonymous:
+            return {}
+        return {
+            course_key: enrollment_state.mode
+            for course_key, enrollment_state in cls._get_enrollment_states_for_user(user).iteritems()
+            if enrollment_state.is_active
+        }
+
     @classmethod
     def enrollments_for_user_with_overviews_preload(cls, user):  # pylint: disable=invalid-name
         """
@@ -1561,7 +1735,7 @@ class CourseEnrollment(models.Model):
         status_hash = cache.get(cache_key)
 
         if not status_hash:
-            enrollments = cls.enrollments_for_user(user).values_list('course_id', 'mode')
+            enrollments = cls.active_enrollment_modes_for_user(user).items()
             enrollments = [(six.text_type(e[0]).lower(), e[1].lower()) for e in enrollments]
             enrollments = sorted(enrollments, key=lambda e: e[0])
             hash_elements = [user.username]
@@ -1867,6 +2041,13 @@ class CourseEnrollment(models.Model):
         """
         return cls.COURSE_ENROLLMENT_CACHE_KEY.format(user_id, text_type(course_key))
 
+    @classmethod
+    def enrollment_states_cache_key(cls, user_id):
+        """
+        Returns the cache key of the enrollment states of all of the user's courses.
+        """
+        return cls.ENROLLMENT_STATES_CACHE_KEY.format(user_id)
+
     @classmethod
     def _get_enrollment_state(cls, user, course_key):
         """
@@ -1879,14 +2060,42 @@ class CourseEnrollment(models.Model):
             return CourseEnrollmentState(None, None)
         enrollment_state = cls._get_enrollment_in_request_cache(user, course_key)
         if not enrollment_state:
-            try:
-                record = cls.objects.get(user=user, course_id=course_key)
-                enrollment_state = CourseEnrollmentState(record.mode, record.is_active)
-            except cls.DoesNotExist:
-                enrollment_state = CourseEnrollmentState(None, None)
+            if isinstance(course_key, basestring):
+                course_key = CourseKey.from_string(course_key)
+            enrollment_state = cls._get_enrollment_states_for_user(user).get(
+                course_key, CourseEnrollmentState(None, None)
+            )
             cls._update_enrollment_in_request_cache(user, course_key, enrollment_state)
         return enrollment_state
 
+    @classmethod
+    def _get_enrollment_states_for_user(cls, user):
+        """
+        Returns the CourseEnrollmentStates of all of the user's enrollments, keyed by
+        course key. They are loaded with a single query and cached, in the request
+        cache and in the django cache, as one entry per user which is deleted
+        whenever one of the user's enrollments changes.
+        """
+        cache_key = cls.enrollment_states_cache_key(user.id)
+        request_cache = cls._get_mode_active_request_cache()
+        enrollment_states = request_cache.get(cache_key)
+        if enrollment_states is None:
+            enrollment_states = cache.get(cache_key)
+            if enrollment_states is None:
+                enrollment_states = {
+                    course_key: (mode, is_active)
+                    for course_key, mode, is_active in cls.objects.filter(user_id=user.id).values_list(
+                        'course_id', 'mode', 'is_active'
+                    )
+                }
+                cache.set(cache_key, enrollment_states, cls.ENROLLMENT_STATES_CACHE_TIMEOUT)
+            enrollment_states = {
+                course_key: CourseEnrollmentState(*enrollment_state)
+                for course_key, enrollment_state in enrollment_states.iteritems()
+            }
+            request_cache[cache_key] = enrollment_states
+        return enrollment_states
+
     @classmethod
     def bulk_fetch_enrollment_states(cls, users, course_key):
         """
@@ -1930,9 +2139,15 @@ class CourseEnrollment(models.Model):
     def _update_enrollment(cls, cache, user_id, course_key, enrollment_state):
         """
         Updates the cached value for the user's enrollment in the
-        given cache.
+        given cache, along with the user's enrollment states if loaded.
         """
         cache[(user_id, course_key)] = enrollment_state
+        enrollment_states = cache.get(cls.enrollment_states_cache_key(user_id))
+        if enrollment_states is not None:
+            if enrollment_state.mode is None:
+                enrollment_states.pop(course_key, None)
+            else:
+                enrollment_states[course_key] = enrollment_state
 
 
 @receiver(models.signals.post_save, sender=CourseEnrollment)
@@ -1946,6 +2161,15 @@ def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: dis
     )
     cache.delete(cache_key)
 
+    # The enrollment states of the user are reloaded with their next lookup. They're deleted again once
+    # the transaction commits, as other requests may cache the committed states until then.
+    enrollment_states_cache_key = CourseEnrollment.enrollment_states_cache_key(instance.user_id)
+    cache.delete(enrollment_states_cache_key)
+    transaction.on_commit(lambda: cache.delete(enrollment_states_cache_key))
+    CourseEnrollment._get_mode_active_request_cache().pop(  # pylint: disable=protected-access
+        enrollment_states_cache_key, None
+    )
+
 
 class ManualEnrollmentAudit(models.Model):
     """
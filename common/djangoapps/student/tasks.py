@@ -1,5 +1,5 @@
 """
-This file contains celery tasks for sending email
+This file contains celery tasks for sending email and enrollment signals
 """
 import logging
 
@@ -7,7 +7,11 @@ from boto.exception import NoAuthHandlerFound
 from celery.exceptions import MaxRetriesExceededError
 from celery.task import task  # pylint: disable=no-name-in-module, import-error
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.core import mail
+from opaque_keys.edx.keys import CourseKey
+
+from student.signals import ENROLL_STATUS_CHANGE
 
 log = logging.getLogger('edx.celery.task')
 
@@ -48,3 +52,16 @@ def send_activation_email(self, subject, message, from_address, dest_addr):
             exc_info=True
         )
         raise Exception
+
+
+@task()
+def send_enroll_status_change_signals(user_ids, course_id, mode, event):
+    """
+    Sends the ENROLL_STATUS_CHANGE signal for each of the given users in the course,
+    on behalf of CourseEnrollment.bulk_enroll.
+    """
+    course_key = CourseKey.from_string(course_id)
+    for user in User.objects.filter(id__in=user_ids):
+        ENROLL_STATUS_CHANGE.send(
+            sender=None, event=event, user=user, mode=mode, course_id=course_key, cost=None, currency=None
+        )
@@ -11,6 +11,7 @@ from django.core.cache import cache
 from django.db.models import signals
 from django.db.models.functions import Lower
 from django.test import TestCase
+from mock import patch
 
 from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
@@ -23,12 +24,17 @@ from openedx.core.djangolib.testing.utils import skip_unless_lms
 from student.models import (
     CourseEnrollment,
     CourseEnrollmentAllowed,
+    EnrollStatusChange,
+    EVENT_NAME_ENROLLMENT_ACTIVATED,
+    EVENT_NAME_ENROLLMENT_MODE_CHANGED,
     PendingEmailChange,
     ManualEnrollmentAudit,
     ALLOWEDTOENROLL_TO_ENROLLED,
     PendingNameChange
 )
-from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from student.signals import ENROLL_STATUS_CHANGE
+from student.tasks import send_enroll_status_change_signals
+from student.tests.factories import CourseEnrollmentAllowedFactory, CourseEnrollmentFactory, UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
@@ -126,6 +132,83 @@ class CourseEnrollmentTests(SharedModuleStoreTestCase):
         )
         self.assertListEqual([self.user, self.user_2], all_enrolled_users)
 
+    def test_enrollment_states_loaded_once_per_user(self):
+        other_enrollment = CourseEnrollmentFactory.create(user=self.user, mode=CourseMode.VERIFIED)
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course.id, mode=CourseMode.AUDIT, is_active=False)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(CourseEnrollment.is_enrolled(self.user, other_enrollment.course_id))
+            self.assertEqual(
+                CourseEnrollment.enrollment_mode_for_user(self.user, self.course.id), (CourseMode.AUDIT, False)
+            )
+            self.assertFalse(CourseEnrollment.is_enrolled(self.user, CourseKey.from_string('edX/missing/run')))
+            self.assertEqual(
+                CourseEnrollment.active_enrollment_modes_for_user(self.user),
+                {other_enrollment.course_id: CourseMode.VERIFIED},
+            )
+
+        # Changing an enrollment updates the user's enrollment states.
+        CourseEnrollment.enroll(self.user, self.course.id, CourseMode.VERIFIED)
+        self.assertTrue(CourseEnrollment.is_enrolled(self.user, self.course.id))
+        self.assertEqual(
+            CourseEnrollment.active_enrollment_modes_for_user(self.user),
+            {other_enrollment.course_id: CourseMode.VERIFIED, self.course.id: CourseMode.VERIFIED},
+        )
+
+    def test_enrollment_states_cache_cleared_on_commit(self):
+        cache_key = CourseEnrollment.enrollment_states_cache_key(self.user.id)
+        on_commit_callbacks = []
+        with patch('student.models.transaction.on_commit', on_commit_callbacks.append):
+            CourseEnrollment.enroll(self.user, self.course.id)
+        # Another request caches the states of the user before the enrollment is committed.
+        cache.set(cache_key, {})
+
+        for callback in on_commit_callbacks:
+            callback()
+        self.assertIsNone(cache.get(cache_key))
+
+    @patch('student.models.send_enroll_status_change_signals')
+    @patch('student.models.tracker')
+    def test_bulk_enroll(self, mock_tracker, mock_send_signals):
+        CourseEnrollmentFactory.create(user=self.user, course_id=self.course.id, mode=CourseMode.AUDIT, is_active=False)
+        CourseEnrollmentFactory.create(user=self.user_2, course_id=self.course.id, mode=CourseMode.VERIFIED)
+        new_user = UserFactory()
+        CourseEnrollmentAllowedFactory.create(email=new_user.email, course_id=self.course.id)
+        users = [self.user, self.user_2, new_user]
+
+        with patch.object(CourseEnrollment, 'BULK_ENROLL_CHUNK_SIZE', 2):
+            with patch('student.models.transaction.on_commit', lambda func: func()):
+                enrollments = CourseEnrollment.bulk_enroll(users, self.course.id, CourseMode.VERIFIED)
+
+        self.assertEqual([enrollment.user for enrollment in enrollments], users)
+        for user in users:
+            self.assertEqual(
+                CourseEnrollment.enrollment_mode_for_user(user, self.course.id), (CourseMode.VERIFIED, True)
+            )
+        self.assertEqual(CourseEnrollmentAllowed.objects.get(email=new_user.email).user, new_user)
+
+        emitted = [(name, data['user_id']) for (name, data), __ in mock_tracker.emit.call_args_list]
+        self.assertItemsEqual(emitted, [
+            (event_name, user.id)
+            for event_name in (EVENT_NAME_ENROLLMENT_ACTIVATED, EVENT_NAME_ENROLLMENT_MODE_CHANGED)
+            for user in (self.user, new_user)
+        ])
+        self.assertEqual(mock_send_signals.delay.call_count, 2)
+        self.assertEqual(
+            [user_id for call in mock_send_signals.delay.call_args_list for user_id in call[0][0]],
+            [user.id for user in users],
+        )
+
+    def test_send_enroll_status_change_signals(self):
+        with patch.object(ENROLL_STATUS_CHANGE, 'send') as mock_send:
+            send_enroll_status_change_signals(
+                [self.user.id, self.user_2.id], unicode(self.course.id), CourseMode.AUDIT, EnrollStatusChange.enroll
+            )
+        self.assertItemsEqual([call[1]['user'] for call in mock_send.call_args_list], [self.user, self.user_2])
+        for call in mock_send.call_args_list:
+            self.assertEqual(call[1]['course_id'], self.course.id)
+            self.assertEqual(call[1]['event'], EnrollStatusChange.enroll)
+
     @skip_unless_lms
     # NOTE: We mute the post_save signal to prevent Schedules from being created for new enrollments
     @factory.django.mute_signals(signals.post_save)
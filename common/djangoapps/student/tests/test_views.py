@@ -10,9 +10,10 @@ from datetime import timedelta, datetime
 import ddt
 from completion.test_utils import submit_completions_for_testing, CompletionWaffleTestMixin
 from django.conf import settings
+from django.db import connection
 from django.urls import reverse
 from django.test import RequestFactory, TestCase
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.utils.timezone import now
 from mock import patch
 from opaque_keys import InvalidKeyError
@@ -27,6 +28,7 @@ from openedx.core.djangoapps.content.course_overviews.models import CourseOvervi
 from openedx.core.djangoapps.content.course_overviews.tests.factories import CourseOverviewFactory
 from openedx.core.djangoapps.site_configuration.tests.test_util import with_site_configuration_context
 from pyquery import PyQuery as pq
+from six import iteritems
 from openedx.core.djangoapps.schedules.config import COURSE_UPDATE_WAFFLE_FLAG
 from openedx.core.djangoapps.schedules.tests.factories import ScheduleFactory
 from openedx.core.djangoapps.user_authn.cookies import _get_user_info_cookie_data
@@ -37,6 +39,7 @@ from student.helpers import DISABLE_UNENROLL_CERT_STATES
 from student.models import CourseEnrollment, UserProfile
 from student.signals import REFUND_ORDER
 from student.tests.factories import CourseEnrollmentFactory, UserFactory
+from student.views.dashboard import _DashboardBulkContext
 from util.milestones_helpers import (get_course_milestones,
                                      remove_prerequisite_course,
                                      set_prerequisite_courses)
@@ -69,7 +72,7 @@ class TestStudentDashboardUnenrollments(SharedModuleStoreTestCase):
         self.cert_status = 'processing'
         self.client.login(username=self.user.username, password=PASSWORD)
 
-    def mock_cert(self, _user, _course_overview):
+    def mock_cert(self, _user, _course_overview, _cert_status=None):
         """ Return a preset certificate status. """
         return {
             'status': self.cert_status,
@@ -870,6 +873,66 @@ class StudentDashboardTests(SharedModuleStoreTestCase, MilestonesTestCaseMixin,
             )
 
 
+@ddt.ddt
+@unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
+class DashboardBulkContextTests(CompletionWaffleTestMixin, TestCase):
+    """
+    Tests for loading the course card information of all of a user's enrollments at once.
+    """
+    def setUp(self):
+        super(DashboardBulkContextTests, self).setUp()
+        self.override_waffle_switch(True)
+
+    def create_enrollments(self, num_enrollments):
+        """
+        Enrolls a new user in `num_enrollments` courses, in each of which the user completed a block.
+        """
+        user = UserFactory()
+        enrollments = [CourseEnrollmentFactory(user=user, mode=CourseMode.VERIFIED) for __ in range(num_enrollments)]
+        for enrollment in enrollments:
+            submit_completions_for_testing(
+                user, enrollment.course_id, [enrollment.course_id.make_usage_key('video', 'video')]
+            )
+        return user, enrollments
+
+    def get_bulk_context(self, user, enrollments):
+        """
+        Returns the dashboard bulk context of the enrollments of `user`, and the number of
+        queries it took to load it.
+        """
+        request = RequestFactory().get(reverse('dashboard'))
+        request.user = user
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(
+            [enrollment.course_id for enrollment in enrollments]
+        )
+        course_modes_by_course = {
+            course_id: {mode.slug: mode for mode in modes}
+            for course_id, modes in iteritems(unexpired_course_modes)
+        }
+        with CaptureQueriesContext(connection) as queries:
+            bulk_context = _DashboardBulkContext(request, enrollments, course_modes_by_course)
+        return bulk_context, len(queries)
+
+    @ddt.data(2, 10, 25)
+    @patch.object(BulkEmailFlag, 'feature_enabled', return_value=True)
+    def test_num_queries(self, num_enrollments, _mock_email_feature):
+        __, expected_num_queries = self.get_bulk_context(*self.create_enrollments(1))
+        bulk_context, num_queries = self.get_bulk_context(*self.create_enrollments(num_enrollments))
+
+        self.assertEqual(num_queries, expected_num_queries)
+        self.assertEqual(len(bulk_context.cert_statuses), num_enrollments)
+        self.assertEqual(len(bulk_context.show_email_settings_for), num_enrollments)
+        self.assertEqual(len(bulk_context.enrolled_courses_either_paid), 0)
+        self.assertEqual(len(bulk_context.block_courses), 0)
+        for course_id, resume_button_url in iteritems(bulk_context.resume_button_urls):
+            self.assertEqual(
+                resume_button_url,
+                reverse('jump_to', kwargs={
+                    'course_id': course_id, 'location': course_id.make_usage_key('video', 'video')
+                })
+            )
+
+
 @unittest.skipUnless(settings.ROOT_URLCONF == 'lms.urls', 'Test only valid in lms')
 @override_settings(BRANCH_IO_KEY='test_key')
 class TextMeTheAppViewTests(UrlResetMixin, TestCase):
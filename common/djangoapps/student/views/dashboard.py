@@ -6,11 +6,11 @@ import datetime
 import logging
 from collections import defaultdict
 
-from completion.exceptions import UnavailableCompletionData
-from completion.utilities import get_key_to_last_completed_course_block
+from completion.models import BlockCompletion
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db.models import Max
 from django.urls import reverse
 from django.shortcuts import redirect
 from django.utils.translation import ugettext as _
@@ -21,12 +21,14 @@ from pytz import UTC
 from six import text_type, iteritems
 
 import track.views
-from bulk_email.models import BulkEmailFlag, Optout  # pylint: disable=import-error
+from bulk_email.models import BulkEmailFlag, CourseAuthorization, Optout  # pylint: disable=import-error
 from course_modes.models import CourseMode
 from courseware.access import has_access
 from edxmako.shortcuts import render_to_response, render_to_string
 from entitlements.models import CourseEntitlement
+from lms.djangoapps.certificates.models import GeneratedCertificate, certificate_status
 from lms.djangoapps.commerce.utils import EcommerceService  # pylint: disable=import-error
+from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.catalog.utils import (
     get_programs,
@@ -519,20 +521,114 @@ def _get_urls_for_resume_buttons(user, enrollments):
     '''
     Checks whether a user has made progress in any of a list of enrollments.
     '''
+    course_ids = [enrollment.course_id for enrollment in enrollments]
+    completions = BlockCompletion.objects.filter(user=user, course_key__in=course_ids)
+    latest_modified = dict(
+        completions.values_list('course_key').annotate(latest_modified=Max('modified')).order_by()
+    )
+    last_completed_blocks = {}
+    if latest_modified:
+        for completion in completions.filter(modified__in=set(latest_modified.values())):
+            if completion.modified == latest_modified[completion.course_key]:
+                last_completed_blocks[completion.course_key] = completion.block_key
+
     resume_button_urls = []
     for enrollment in enrollments:
-        try:
-            block_key = get_key_to_last_completed_course_block(user, enrollment.course_id)
+        block_key = last_completed_blocks.get(enrollment.course_id)
+        if block_key is not None:
             url_to_block = reverse(
                 'jump_to',
                 kwargs={'course_id': enrollment.course_id, 'location': block_key}
             )
-        except UnavailableCompletionData:
+        else:
             url_to_block = ''
         resume_button_urls.append(url_to_block)
     return resume_button_urls
 
 
+class _DashboardBulkContext(object):
+    """
+    The per-course information shown on the dashboard course cards, loaded for all of
+    the user's enrollments at once so the number of queries doesn't grow with the
+    number of enrollments.
+    """
+    def __init__(self, request, course_enrollments, course_modes_by_course):
+        self.request = request
+        self.user = request.user
+        self.course_enrollments = course_enrollments
+        self.course_ids = [enrollment.course_id for enrollment in course_enrollments]
+        self.course_modes_by_course = course_modes_by_course
+
+        PersistentCourseGrade.prefetch_for_user(self.user.id, self.course_ids)
+        self.cert_statuses = self._get_cert_statuses()
+        self.show_email_settings_for = self._get_show_email_settings_for()
+        self.block_courses = self._get_block_courses()
+        self.enrolled_courses_either_paid = self._get_enrolled_courses_either_paid()
+        self.resume_button_urls = dict(
+            zip(self.course_ids, _get_urls_for_resume_buttons(self.user, course_enrollments))
+        )
+
+    def _get_cert_statuses(self):
+        """
+        Returns the certificate info of each course, keyed by course id.
+        """
+        certificates = {
+            certificate.course_id: certificate
+            for certificate in GeneratedCertificate.objects.filter(user=self.user, course_id__in=self.course_ids)
+        }
+        return {
+            enrollment.course_id: cert_info(
+                self.user,
+                enrollment.course_overview,
+                certificate_status(certificates.get(enrollment.course_id)),
+            )
+            for enrollment in self.course_enrollments
+        }
+
+    def _get_show_email_settings_for(self):
+        """
+        Returns the ids of the courses for which email settings are shown, i.e. Mongo
+        courses for which bulk email is turned on.
+        """
+        CourseAuthorization.prefetch(self.course_ids)
+        return frozenset(
+            course_id for course_id in self.course_ids if BulkEmailFlag.feature_enabled(course_id)
+        )
+
+    def _get_block_courses(self):
+        """
+        Returns the ids of the courses the user redeemed a registration code of an
+        invalid invoice for.
+        """
+        redeemed_registration_codes = defaultdict(list)
+        for registration_code in CourseRegistrationCode.objects.filter(
+            course_id__in=self.course_ids,
+            registrationcoderedemption__redeemed_by=self.user,
+        ).select_related('invoice_item__invoice'):
+            redeemed_registration_codes[registration_code.course_id].append(registration_code)
+        return frozenset(
+            course_id for course_id in self.course_ids
+            if is_course_blocked(self.request, redeemed_registration_codes[course_id], course_id)
+        )
+
+    def _get_enrolled_courses_either_paid(self):
+        """
+        Returns the ids of the paid courses, as determined by `CourseEnrollment.is_paid_course`.
+        """
+        enrolled_courses_either_paid = set()
+        for enrollment in self.course_enrollments:
+            selectable_modes = {
+                slug: mode for slug, mode in iteritems(self.course_modes_by_course[enrollment.course_id])
+                if slug not in CourseMode.CREDIT_MODES
+            } or {CourseMode.DEFAULT_MODE.slug: CourseMode.DEFAULT_MODE}
+            if (
+                CourseMode.is_white_label(enrollment.course_id, modes_dict=selectable_modes) or
+                CourseMode.is_professional_slug(enrollment.mode)
+            ):
+                enrolled_courses_either_paid.add(enrollment.course_id)
+        return frozenset(enrolled_courses_either_paid)
+
+
 @login_required
 @ensure_csrf_cookie
 @add_maintenance_banner
@@ -730,17 +826,10 @@ def student_dashboard(request):
     # If a course is not included in this dictionary,
     # there is no verification messaging to display.
     verify_status_by_course = check_verify_status_by_course(user, course_enrollments)
-    cert_statuses = {
-        enrollment.course_id: cert_info(request.user, enrollment.course_overview)
-        for enrollment in course_enrollments
-    }
 
-    # only show email settings for Mongo course and when bulk email is turned on
-    show_email_settings_for = frozenset(
-        enrollment.course_id for enrollment in course_enrollments if (
-            BulkEmailFlag.feature_enabled(enrollment.course_id)
-        )
-    )
+    # Load the certificate, email settings, payment and resume information of
+    # all the enrollments at once.
+    bulk_context = _DashboardBulkContext(request, course_enrollments, course_modes_by_course)
 
     # Verification Attempts
     # Used to generate the "you must reverify for course x" banner
@@ -751,23 +840,6 @@ def student_dashboard(request):
     statuses = ["approved", "denied", "pending", "must_reverify"]
     reverifications = reverification_info(statuses)
 
-    block_courses = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if is_course_blocked(
-            request,
-            CourseRegistrationCode.objects.filter(
-                course_id=enrollment.course_id,
-                registrationcoderedemption__redeemed_by=request.user
-            ),
-            enrollment.course_id
-        )
-    )
-
-    enrolled_courses_either_paid = frozenset(
-        enrollment.course_id for enrollment in course_enrollments
-        if enrollment.is_paid_course()
-    )
-
     # If there are *any* denied reverifications that have not been toggled off,
     # we'll display the banner
     denied_banner = any(item.display for item in reverifications["denied"])
@@ -830,21 +902,21 @@ def student_dashboard(request):
         'errored_courses': errored_courses,
         'show_courseware_links_for': show_courseware_links_for,
         'all_course_modes': course_mode_info,
-        'cert_statuses': cert_statuses,
+        'cert_statuses': bulk_context.cert_statuses,
         'credit_statuses': _credit_statuses(user, course_enrollments),
-        'show_email_settings_for': show_email_settings_for,
+        'show_email_settings_for': bulk_context.show_email_settings_for,
         'reverifications': reverifications,
         'verification_display': verification_status['should_display'],
         'verification_status': verification_status['status'],
         'verification_status_by_course': verify_status_by_course,
         'verification_errors': verification_errors,
-        'block_courses': block_courses,
+        'block_courses': bulk_context.block_courses,
         'denied_banner': denied_banner,
         'billing_email': settings.PAYMENT_SUPPORT_EMAIL,
         'user': user,
         'logout_url': reverse('logout'),
         'platform_name': platform_name,
-        'enrolled_courses_either_paid': enrolled_courses_either_paid,
+        'enrolled_courses_either_paid': bulk_context.enrolled_courses_either_paid,
         'provider_states': [],
         'order_history_list': order_history_list,
         'courses_requirements_not_met': courses_requirements_not_met,
@@ -871,8 +943,8 @@ def student_dashboard(request):
 
     # Gather urls for course card resume buttons.
     resume_button_urls = ['' for entitlement in course_entitlements]
-    for url in _get_urls_for_resume_buttons(user, course_enrollments):
-        resume_button_urls.append(url)
+    for enrollment in course_enrollments:
+        resume_button_urls.append(bulk_context.resume_button_urls[enrollment.course_id])
     # There must be enough urls for dashboard.html. Template creates course
     # cards for "enrollments + entitlements".
     context.update({
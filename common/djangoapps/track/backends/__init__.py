@@ -25,3 +25,8 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_many(self, events):
+        """Send events to tracker, one at a time unless the backend can batch them."""
+        for event in events:
+            self.send(event)
@@ -0,0 +1,183 @@
+"""
+Event tracker backend that queues events in memory and sends them in batches,
+from a background thread, to another backend.
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Empty, Full, Queue
+
+from django.db import close_old_connections
+from edx_django_utils.monitoring import set_custom_metric
+
+from track.backends import BaseBackend
+from track.tracker import _instantiate_backend_from_name
+
+log = logging.getLogger(__name__)
+
+# Queued to stop the background thread once the events queued before it are sent.
+_STOP = object()
+
+
+class BufferedBackend(BaseBackend):
+    """
+    Event tracker backend wrapping another backend, so that sending an event only
+    queues it instead of blocking the request on the wrapped backend.
+
+    Queued events are sent with the `send_many` method of the wrapped backend by a
+    background thread, as soon as `batch_size` events are queued or `flush_interval`
+    seconds after the first event of the batch was queued. Backends without a
+    `send_many` method, such as those of EVENT_TRACKING_BACKENDS, are sent the
+    events of the batch one at a time. When `max_queue_size`
+    events are already queued, new events are dropped. The queued events are sent
+    when the process exits.
+
+    Example configuration::
+
+      'buffered_mongo': {
+          'ENGINE': 'track.backends.buffered.BufferedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {'database': 'track'},
+              },
+              'batch_size': 100,
+          }
+      }
+
+    """
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, flush_interval=1.0, shutdown_timeout=5.0,
+                 **kwargs):
+        """
+        :Parameters:
+
+          - `backend`: configuration of the wrapped backend, with the `ENGINE` and
+            `OPTIONS` keys used for `TRACKING_BACKENDS`
+          - `max_queue_size`: number of queued events above which events are dropped
+          - `batch_size`: maximum number of events sent at once
+          - `flush_interval`: maximum number of seconds an event is queued for before
+            being sent
+          - `shutdown_timeout`: maximum number of seconds to wait for the queued events
+            to be sent when the process exits
+
+        """
+        super(BufferedBackend, self).__init__(**kwargs)
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.shutdown_timeout = shutdown_timeout
+
+        # Number of events dropped because the queue was full, or because the
+        # wrapped backend failed to send them.
+        self.dropped_events = 0
+        self.failed_events = 0
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._overflowing = False
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent by the background thread."""
+        self._start_worker()
+        try:
+            self._queue.put_nowait(event)
+            self._overflowing = False
+        except Full:
+            self.dropped_events += 1
+            set_custom_metric('tracking_buffer_overflow', True)
+            set_custom_metric('tracking_buffer_dropped_events', self.dropped_events)
+            if not self._overflowing:
+                # Only log once until the queue accepts events again.
+                self._overflowing = True
+                log.warning('Event tracker queue is full, dropping events. %d events dropped so far.',
+                            self.dropped_events)
+
+    def close(self):
+        """Send the queued events and stop the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=self.shutdown_timeout)
+        except Full:
+            log.error('Unable to stop the event tracker background thread, its queue is full.')
+            return
+        thread.join(self.shutdown_timeout)
+        if thread.is_alive():
+            log.error('Timed out sending the queued events of the event tracker.')
+
+    def _start_worker(self):
+        """
+        Starts the background thread if it isn't running in this process yet,
+        e.g. after the backend was created by a parent process before forking.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = Queue(maxsize=self.max_queue_size)
+            self._thread = threading.Thread(target=self._run, name='BufferedBackend')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def _run(self):
+        """Sends the queued events in batches until stopped."""
+        stopped = False
+        while not stopped:
+            events, stopped = self._next_batch()
+            if events:
+                self._send_batch(events)
+
+    def _next_batch(self):
+        """
+        Waits for the next batch of events to send. Returns the events, and whether
+        the background thread was asked to stop.
+        """
+        events = []
+        event = self._queue.get()
+        deadline = time.time() + self.flush_interval
+        while event is not _STOP:
+            events.append(event)
+            timeout = deadline - time.time()
+            if len(events) >= self.batch_size or timeout <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=timeout)
+            except Empty:
+                break
+        return events, event is _STOP
+
+    def _send_batch(self, events):
+        """Sends the events with the wrapped backend."""
+        # The database connections of the background thread aren't closed at the
+        # end of requests.
+        close_old_connections()
+        send_many = getattr(self.backend, 'send_many', None)
+        if send_many is None:
+            for event in events:
+                self._send_events(self.backend.send, event, 1)
+        else:
+            self._send_events(send_many, events, len(events))
+
+    def _send_events(self, send, events, count):
+        """Sends the `count` events with `send`, counting them as failed if it raises."""
+        try:
+            send(events)
+        except Exception:  # pylint: disable=broad-except
+            self.failed_events += count
+            log.exception('Error sending %d events with the buffered event tracker backend', count)
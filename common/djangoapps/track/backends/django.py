@@ -80,3 +80,8 @@ class DjangoBackend(BaseBackend):
             tldat.save(using=self.name)
         except Exception as e:  # pylint: disable=broad-except
             log.exception(e)
+
+    def send_many(self, events):
+        """Save the events at once, raising any error to the caller"""
+        tldats = [TrackingLog(**{x: event.get(x, '') for x in LOGFIELDS}) for event in events]
+        TrackingLog.objects.using(self.name).bulk_create(tldats)
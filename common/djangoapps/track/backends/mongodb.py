@@ -96,3 +96,8 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_many(self, events):
+        """Insert the events in to the Mongo collection at once, raising any error to the caller"""
+        # Unlike insert_many, insert doesn't add an _id to the events.
+        self.collection.insert(events, manipulate=False, continue_on_error=True)
@@ -0,0 +1,109 @@
+from __future__ import absolute_import
+
+import os
+import time
+from Queue import Queue
+
+from django.test import TestCase
+from mock import Mock, patch
+
+from track.backends import BaseBackend
+from track.backends.buffered import BufferedBackend
+
+
+class InMemoryBackend(BaseBackend):
+    """Event tracker backend keeping the batches of events it is sent."""
+
+    def __init__(self, fail=False, **kwargs):
+        super(InMemoryBackend, self).__init__(**kwargs)
+        self.fail = fail
+        self.batches = []
+
+    def send(self, event):
+        self.send_many([event])
+
+    def send_many(self, events):
+        if self.fail:
+            raise Exception('Failed to send events')
+        self.batches.append(list(events))
+
+
+class SingleEventBackend(object):
+    """Event tracker backend without send_many, like those of eventtracking, keeping the events it is sent."""
+
+    def __init__(self, fail=False, **kwargs):
+        self.fail = fail
+        self.events = []
+
+    def send(self, event):
+        if self.fail and event.get('fail'):
+            raise Exception('Failed to send event')
+        self.events.append(event)
+
+
+class TestBufferedBackend(TestCase):
+    def create_backend(self, fail=False, engine='track.backends.tests.test_buffered.InMemoryBackend', **options):
+        backend = BufferedBackend(
+            backend={
+                'ENGINE': engine,
+                'OPTIONS': {'fail': fail},
+            },
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_send_in_batches(self):
+        backend = self.create_backend(batch_size=2, flush_interval=10)
+        events = [{'test': index} for index in range(5)]
+        for event in events:
+            backend.send(event)
+        backend.close()
+
+        self.assertEqual(backend.backend.batches, [events[0:2], events[2:4], events[4:]])
+
+    def test_flush_interval(self):
+        backend = self.create_backend(batch_size=100, flush_interval=0.01)
+        backend.send({'test': 1})
+
+        for __ in range(100):
+            if backend.backend.batches:
+                break
+            time.sleep(0.01)
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+
+    @patch('track.backends.buffered.set_custom_metric')
+    def test_queue_full(self, mock_set_custom_metric):
+        backend = self.create_backend(max_queue_size=1)
+        # Keep the events queued, as if the background thread was busy.
+        backend._pid = os.getpid()  # pylint: disable=protected-access
+        backend._queue = Queue(maxsize=1)  # pylint: disable=protected-access
+        backend._thread = Mock()  # pylint: disable=protected-access
+        self.addCleanup(setattr, backend, '_thread', None)
+
+        backend.send({'test': 1})
+        backend.send({'test': 2})
+        backend.send({'test': 3})
+
+        self.assertEqual(backend.dropped_events, 2)
+        mock_set_custom_metric.assert_called_with('tracking_buffer_dropped_events', 2)
+
+    def test_failed_batch(self):
+        backend = self.create_backend(fail=True, batch_size=1)
+        backend.send({'test': 1})
+        backend.send({'test': 2})
+        backend.close()
+
+        self.assertEqual(backend.failed_events, 2)
+
+    def test_backend_without_send_many(self):
+        backend = self.create_backend(
+            fail=True, engine='track.backends.tests.test_buffered.SingleEventBackend', batch_size=10
+        )
+        backend.send({'test': 1})
+        backend.send({'test': 2, 'fail': True})
+        backend.send({'test': 3})
+        backend.close()
+
+        self.assertEqual(backend.backend.events, [{'test': 1}, {'test': 3}])
+        self.assertEqual(backend.failed_events, 1)
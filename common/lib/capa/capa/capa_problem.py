@@ -13,6 +13,7 @@ Main module which shows problems (of "capa" type).
 This is used by capa_module.
 """
 
+import hashlib
 import logging
 import os.path
 import re
@@ -30,7 +31,7 @@ import capa.responsetypes as responsetypes
 import capa.xqueue_interface as xqueue_interface
 from capa.correctmap import CorrectMap
 from capa.safe_exec import safe_exec
-from capa.util import contextualize_text, convert_files_to_filenames
+from capa.util import LRUCache, contextualize_text, convert_files_to_filenames
 from openedx.core.djangolib.markup import HTML
 from xmodule.stringify import stringify_children
 
@@ -69,8 +70,28 @@ html_problem_semantics = [
     "openendedrubric",
 ]
 
+# placeholder elements standing in for unparsed input html in get_html(raw_fragments=True)
+RAW_FRAGMENT_PLACEHOLDER_TAG = 'capa-raw-fragment'
+RAW_FRAGMENT_PLACEHOLDER_RE = re.compile(r'<{tag} index="(\d+)"/>'.format(tag=RAW_FRAGMENT_PLACEHOLDER_TAG))
+
 log = logging.getLogger(__name__)
 
+# Process-local caches of the deterministic work done when a problem is
+# instantiated.  Parsed trees are keyed by a digest of the problem text; script
+# contexts are additionally keyed by seed and anonymous student id, because
+# both are visible to the problem's <script> code.
+PROBLEM_TREE_CACHE = LRUCache(maxsize=500)
+SCRIPT_CONTEXT_CACHE = LRUCache(maxsize=2000)
+
+
+def problem_text_digest(problem_text):
+    """
+    Return a hex digest identifying the given problem definition.
+    """
+    if isinstance(problem_text, unicode):
+        problem_text = problem_text.encode('utf-8')
+    return hashlib.sha1(problem_text).hexdigest()
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -158,6 +179,11 @@ class LoncapaProblem(object):
         self.capa_system = capa_system
         self.capa_module = capa_module
 
+        # input_id -> (render key, html) of the most recent rendering of each input
+        self.input_render_cache = {}
+        # rendered input html spliced into the serialized problem by get_html(raw_fragments=True)
+        self._raw_fragments = None
+
         state = state or {}
 
         # Set seed according to the following priority:
@@ -177,11 +203,24 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"startouttext\s*/", "text", problem_text)
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
+        self.problem_text_digest = problem_text_digest(problem_text)
+
+        # parse problem XML file into an element tree, reusing a cached parse of
+        # the same problem text when one is available
+        self.tree_is_cacheable = True
+        cached_tree = PROBLEM_TREE_CACHE.get(self.problem_text_digest)
+        if cached_tree is not None:
+            self.tree = deepcopy(cached_tree)
+        else:
+            self.tree = etree.XML(problem_text)
 
-        # parse problem XML file into an element tree
-        self.tree = etree.XML(problem_text)
+            self.make_xml_compatible(self.tree)
 
-        self.make_xml_compatible(self.tree)
+            # Included files come from the course filestore rather than the
+            # problem text, so trees containing them are never cached.
+            self.tree_is_cacheable = self.tree.find('.//include') is None
+            if self.tree_is_cacheable:
+                PROBLEM_TREE_CACHE.set(self.problem_text_digest, deepcopy(self.tree))
 
         # handle any <include file="foo"> tags
         self._process_includes()
@@ -720,13 +759,26 @@ class LoncapaProblem(object):
 
             targetedfeedbackset.append(solution_element)
 
-    def get_html(self):
+    def get_html(self, raw_fragments=False):
         """
         Main method called externally to get the HTML to be rendered for this capa Problem.
+
+        If `raw_fragments` is True, the rendered html of each input is spliced
+        into the serialized problem as is, rather than being parsed into the
+        problem's element tree and serialized again.
         """
         self.do_targeted_feedback(self.tree)
-        html = contextualize_text(etree.tostring(self._extract_html(self.tree)), self.context)
-        return html
+        if not raw_fragments:
+            return contextualize_text(etree.tostring(self._extract_html(self.tree)), self.context)
+
+        self._raw_fragments = []
+        try:
+            html = etree.tostring(self._extract_html(self.tree))
+            fragments = self._raw_fragments
+        finally:
+            self._raw_fragments = None
+        html = RAW_FRAGMENT_PLACEHOLDER_RE.sub(lambda match: fragments[int(match.group(1))], html)
+        return contextualize_text(html, self.context)
 
     def handle_input_ajax(self, data):
         """
@@ -837,7 +889,20 @@ class LoncapaProblem(object):
         variables for problem answer checking.
 
         Problem XML goes to Python execution context. Runs everything in script tags.
+
+        When the capa system provides a cache (so script results are already
+        shared between processes) the resulting context is also memoized in
+        process, keyed by problem definition, seed, anonymous student id and
+        the course's python_lib.zip.
         """
+        # An asset named python_lib.zip can be imported by the Python code of scripts.
+        zip_lib = self.capa_system.get_python_lib_zip() if tree.find('.//script') is not None else None
+        cache_key = self._script_context_cache_key(zip_lib)
+        if cache_key is not None:
+            cached_context = SCRIPT_CONTEXT_CACHE.get(cache_key)
+            if cached_context is not None:
+                return deepcopy(cached_context)
+
         context = {}
         context['seed'] = self.seed
         context['anonymous_student_id'] = self.capa_system.anonymous_student_id
@@ -865,8 +930,6 @@ class LoncapaProblem(object):
 
         extra_files = []
         if all_code:
-            # An asset named python_lib.zip can be imported by Python code.
-            zip_lib = self.capa_system.get_python_lib_zip()
             if zip_lib is not None:
                 extra_files.append(("python_lib.zip", zip_lib))
                 python_path.append("python_lib.zip")
@@ -891,8 +954,29 @@ class LoncapaProblem(object):
         context['script_code'] = all_code
         context['python_path'] = python_path
         context['extra_files'] = extra_files or None
+
+        # Contexts carrying python_lib.zip contents are left out of the
+        # in-process cache to keep its memory footprint small.
+        if cache_key is not None and not extra_files:
+            SCRIPT_CONTEXT_CACHE.set(cache_key, deepcopy(context))
         return context
 
+    def _script_context_cache_key(self, zip_lib):
+        """
+        Return the key under which this problem's script context is memoized,
+        or None if it should not be memoized. `zip_lib` is the content of the
+        course's python_lib.zip, or None if it has none.
+        """
+        if not (self.capa_system.cache and self.tree_is_cacheable):
+            return None
+        return (
+            self.problem_text_digest,
+            self.seed,
+            self.capa_system.anonymous_student_id,
+            getattr(self.capa_system.filestore, 'root_path', None),
+            hashlib.md5(zip_lib).hexdigest() if zip_lib is not None else None,
+        )
+
     def _extract_html(self, problemtree):  # private
         """
         Main (private) function which converts Problem XML tree to HTML.
@@ -975,7 +1059,14 @@ class LoncapaProblem(object):
             input_type_cls = inputtypes.registry.get_class_for_tag(problemtree.tag)
             # save the input type so that we can make ajax calls on it if we need to
             self.inputs[input_id] = input_type_cls(self.capa_system, problemtree, state)
-            return self.inputs[input_id].get_html()
+            if self._raw_fragments is None:
+                return self.inputs[input_id].get_html(render_cache=self.input_render_cache)
+
+            # leave a placeholder for get_html to replace with the unparsed input html
+            self._raw_fragments.append(
+                self.inputs[input_id].get_html_fragment(render_cache=self.input_render_cache)
+            )
+            return etree.Element(RAW_FRAGMENT_PLACEHOLDER_TAG, index=str(len(self._raw_fragments) - 1))
 
         # let each Response render itself
         if problemtree in self.responders:
@@ -363,17 +363,56 @@ class InputTypeBase(object):
         """
         return {}
 
-    def get_html(self):
+    def get_html_fragment(self, render_cache=None):
         """
-        Return the html for this input, as an etree element.
+        Return the html for this input, as an unparsed string.
+
+        If `render_cache` (a dict) is given it is used to memoize renderings by
+        input id: when the state and attributes of this input are unchanged since
+        the last time it was rendered with the same cache (see `_get_render_key`),
+        neither the render context nor the template is computed again.
         """
         if self.template is None:
             raise NotImplementedError("no rendering template specified for class {0}"
                                       .format(self.__class__))
 
-        context = self._get_render_context()
+        if render_cache is None:
+            return self.capa_system.render_template(self.template, self._get_render_context()).strip()
+
+        render_key = self._get_render_key()
+        cached = render_cache.get(self.input_id)
+        if cached is not None and cached[0] == render_key:
+            return cached[1]
+
+        html = self.capa_system.render_template(self.template, self._get_render_context()).strip()
+        render_cache[self.input_id] = (render_key, html)
+        return html
 
-        html = self.capa_system.render_template(self.template, context).strip()
+    def _get_render_key(self):
+        """
+        Returns the values which the rendering of this input depends on, for `get_html_fragment` to compare.
+
+        These are the input's state and its parsed attributes. The rest of the render context is derived
+        from the input's xml, which is the same for all the renderings of an input sharing a render cache.
+        """
+        return (
+            self.template,
+            self.status,
+            repr(self.value),
+            repr(self.msg),
+            repr(self.input_state),
+            repr(self.response_data),
+            self.answervariable,
+            repr(sorted(self.loaded_attributes.items())),
+        )
+
+    def get_html(self, render_cache=None):
+        """
+        Return the html for this input, as an etree element.
+
+        See `get_html_fragment` for `render_cache`.
+        """
+        html = self.get_html_fragment(render_cache)
 
         try:
             output = etree.XML(html)
@@ -4,10 +4,11 @@ Test capa problem.
 import ddt
 import textwrap
 from lxml import etree
-from mock import patch
+from mock import Mock, patch
 import unittest
 
-from capa.tests.helpers import new_loncapa_problem
+from capa.capa_problem import LoncapaProblem, PROBLEM_TREE_CACHE, SCRIPT_CONTEXT_CACHE, problem_text_digest
+from capa.tests.helpers import new_loncapa_problem, test_capa_system
 from openedx.core.djangolib.markup import HTML
 
 
@@ -708,3 +709,74 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
             """
         )
         self.assertEquals(problem.find_answer_text('1_2_1', 'hide'), 'hide')
+
+
+class CAPAProblemCacheTest(unittest.TestCase):
+    """ Tests for the process-local problem tree and script context caches. """
+
+    XML = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+            x = 5
+            </script>
+            <stringresponse answer="hide" type="ci">
+                <textline size="40"/>
+            </stringresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super(CAPAProblemCacheTest, self).setUp()
+        PROBLEM_TREE_CACHE.clear()
+        SCRIPT_CONTEXT_CACHE.clear()
+        self.addCleanup(PROBLEM_TREE_CACHE.clear)
+        self.addCleanup(SCRIPT_CONTEXT_CACHE.clear)
+
+    def test_tree_is_cached_and_copied(self):
+        first = new_loncapa_problem(self.XML)
+        self.assertIn(problem_text_digest(self.XML), PROBLEM_TREE_CACHE)
+
+        with patch.object(LoncapaProblem, 'make_xml_compatible') as mock_compat:
+            second = new_loncapa_problem(self.XML)
+            self.assertFalse(mock_compat.called)
+
+        self.assertIsNot(first.tree, second.tree)
+        self.assertEqual(etree.tostring(first.tree), etree.tostring(second.tree))
+        self.assertEqual(first.get_html(), second.get_html())
+
+    def test_trees_with_includes_are_not_cached(self):
+        xml = '<problem><include file="does_not_exist.xml"/></problem>'
+        problem = new_loncapa_problem(xml)
+        self.assertFalse(problem.tree_is_cacheable)
+        self.assertNotIn(problem_text_digest(xml), PROBLEM_TREE_CACHE)
+
+    def test_script_context_not_memoized_without_capa_cache(self):
+        problem = new_loncapa_problem(self.XML)
+        self.assertEqual(problem.context['x'], 5)
+        self.assertEqual(len(SCRIPT_CONTEXT_CACHE), 0)
+
+    def test_script_context_memoized_per_seed(self):
+        system = test_capa_system()
+        system.cache = Mock(get=Mock(return_value=None))
+        first = new_loncapa_problem(self.XML, capa_system=system, seed=1)
+        with patch('capa.capa_problem.safe_exec') as mock_exec:
+            second = new_loncapa_problem(self.XML, capa_system=system, seed=1)
+            self.assertFalse(mock_exec.called)
+            new_loncapa_problem(self.XML, capa_system=system, seed=2)
+            self.assertTrue(mock_exec.called)
+
+        self.assertEqual(first.context, second.context)
+        self.assertIsNot(first.context, second.context)
+
+    def test_script_context_memoized_per_python_lib(self):
+        system = test_capa_system()
+        system.cache = Mock(get=Mock(return_value=None))
+        new_loncapa_problem(self.XML, capa_system=system, seed=1)
+        with patch('capa.capa_problem.safe_exec') as mock_exec:
+            # The course's python_lib.zip is uploaded, or replaced.
+            system.get_python_lib_zip = lambda: 'zip content'
+            new_loncapa_problem(self.XML, capa_system=system, seed=1)
+            self.assertEqual(mock_exec.call_count, 1)
+            system.get_python_lib_zip = lambda: 'other zip content'
+            new_loncapa_problem(self.XML, capa_system=system, seed=1)
+            self.assertEqual(mock_exec.call_count, 2)
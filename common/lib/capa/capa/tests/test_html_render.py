@@ -179,7 +179,8 @@ class CapaHtmlRenderTest(unittest.TestCase):
 
         # Expect that the template renderer was called with the correct
         # arguments, once for the textline input and once for
-        # the solution
+        # the solution.  The textline rendering done when the problem was
+        # created is reused by get_html, since its context is unchanged.
         expected_textline_context = {
             'STATIC_URL': '/dummy-static/',
             'status': the_system.STATUS_CLASS('unsubmitted'),
@@ -201,7 +202,6 @@ class CapaHtmlRenderTest(unittest.TestCase):
         expected_calls = [
             mock.call('textline.html', expected_textline_context),
             mock.call('solutionspan.html', expected_solution_context),
-            mock.call('textline.html', expected_textline_context),
             mock.call('solutionspan.html', expected_solution_context)
         ]
 
@@ -305,6 +305,44 @@ class CapaHtmlRenderTest(unittest.TestCase):
         the_html = problem.get_html()
         self.assertRegexpMatches(the_html, r"<div>\s*</div>")
 
+    def test_input_rendering_is_memoized_until_state_changes(self):
+        xml_str = StringResponseXMLFactory().build_xml(answer='Test answer')
+        the_system = test_capa_system()
+        the_system.render_template = mock.Mock(return_value="<div>Input</div>")
+        problem = new_loncapa_problem(xml_str, capa_system=the_system)
+
+        problem.get_html()
+        problem.get_html()
+        self.assertEqual(
+            [call[0][0] for call in the_system.render_template.call_args_list],
+            ['textline.html']
+        )
+
+        problem.student_answers = {'1_2_1': 'changed'}
+        problem.get_html()
+        self.assertEqual(the_system.render_template.call_count, 2)
+
+        problem.correct_map.set('1_2_1', correctness='incorrect', msg='Try again')
+        problem.get_html()
+        self.assertEqual(the_system.render_template.call_count, 3)
+
+    def test_raw_fragments(self):
+        xml_str = StringResponseXMLFactory().build_xml(question_text='Test question', answer='Test answer')
+        the_system = test_capa_system()
+        the_system.render_template = mock.Mock(
+            return_value=u"<div class='input-template-render'>Input \u00e9 $test</div>"
+        )
+        problem = new_loncapa_problem(xml_str, capa_system=the_system)
+        problem.context['test'] = 'TEST'
+
+        raw_html = problem.get_html(raw_fragments=True)
+        self.assertIn(u"<div class='input-template-render'>Input \u00e9 TEST</div>", raw_html)
+        self.assertNotIn('capa-raw-fragment', raw_html)
+        self.assertEqual(
+            etree.tostring(etree.XML(raw_html)),
+            etree.tostring(etree.XML(problem.get_html()))
+        )
+
     def _create_test_file(self, path, content_str):
         test_fp = self.capa_system.filestore.open(path, "w")
         test_fp.write(content_str)
@@ -2,6 +2,8 @@
 Utility functions for capa.
 """
 import re
+import threading
+from collections import OrderedDict
 from decimal import Decimal
 
 import bleach
@@ -209,3 +211,55 @@ def remove_markup(html):
     u'Rock &amp; Roll'
     """
     return HTML(bleach.clean(html, tags=[], strip=True))
+
+
+class LRUCache(object):
+    """
+    A small, thread-safe, process-local least-recently-used cache.
+
+    Used to memoize expensive, deterministic capa work (parsed problem trees,
+    script contexts, rendered inputs) across problem instantiations in the
+    same process.  Values are stored as given; callers are responsible for
+    copying mutable values on the way in and out.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value cached for `key`, marking it as most recently used.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        """
+        Cache `value` under `key`, evicting the least recently used entry if full.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
@@ -14,11 +14,12 @@ Note: Hotfix (PLAT-734) No asset calls find_asset_metadata, and directly accesse
 """
 
 from contracts import contract, new_contract
-from opaque_keys.edx.keys import AssetKey
+from opaque_keys.edx.keys import AssetKey, CourseKey
 from xmodule.contentstore.django import contentstore
 
 
 new_contract('AssetKey', AssetKey)
+new_contract('CourseKey', CourseKey)
 
 
 class AssetException(Exception):
@@ -58,3 +59,20 @@ class AssetManager(object):
         compressed course structure from the structure cache.
         """
         return contentstore().find(asset_key, throw_on_not_found, as_stream)
+
+    @staticmethod
+    @contract(asset_key='AssetKey', throw_on_not_found='bool')
+    def find_metadata(asset_key, throw_on_not_found=True):
+        """
+        Finds the metadata of a course asset in the deprecated contentstore, without reading the asset's data.
+        """
+        return contentstore().find_metadata(asset_key, throw_on_not_found)
+
+    @staticmethod
+    @contract(course_key='CourseKey')
+    def get_asset_index(course_key):
+        """
+        Returns the index of the metadata of all of the course's assets kept by the deprecated contentstore.
+        See :meth:`xmodule.contentstore.mongo.MongoContentStore.get_asset_index`.
+        """
+        return contentstore().get_asset_index(course_key)
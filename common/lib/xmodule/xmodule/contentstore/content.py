@@ -20,8 +20,6 @@ from urllib import urlencode, quote_plus
 from opaque_keys.edx.locator import AssetLocator
 from opaque_keys.edx.keys import CourseKey, AssetKey
 from opaque_keys import InvalidKeyError
-from xmodule.modulestore.exceptions import ItemNotFoundError
-from xmodule.exceptions import NotFoundError
 from PIL import Image
 
 
@@ -246,13 +244,12 @@ class StaticContent(object):
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+        # If we can't find the item in the course's asset index, just treat it as if it's locked.
+        asset_index = AssetManager.get_asset_index(asset_key.course_key)
+        asset_metadata = asset_index.get((asset_key.block_type, asset_key.block_id))
+        if asset_metadata is not None:
+            serve_from_cdn = not asset_metadata['locked']
+            content_digest = asset_metadata['content_digest']
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -294,6 +291,12 @@ class StaticContent(object):
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -314,9 +317,19 @@ class StaticContentStream(StaticContent):
                                                   length=length, locked=locked, content_digest=content_digest)
         self._stream = stream
 
+    @property
+    def read_size(self):
+        """
+        The number of bytes read from the stream at a time: a whole chunk for GridFS files, so that
+        each read maps onto a single chunk fetched from the database.
+        """
+        return getattr(self._stream, 'chunk_size', None) or STREAM_DATA_CHUNK_SIZE
+
     def stream_data(self):
+        self._stream.seek(0)
+        read_size = self.read_size
         while True:
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
+            chunk = self._stream.read(read_size)
             if len(chunk) == 0:
                 break
             yield chunk
@@ -324,16 +337,17 @@ class StaticContentStream(StaticContent):
     def stream_data_in_range(self, first_byte, last_byte):
         """
         Stream the data between first_byte and last_byte (included)
+
+        Reads stop at read_size boundaries, so at most one chunk of the file is held in memory at a time.
         """
+        read_size = self.read_size
         self._stream.seek(first_byte)
         position = first_byte
-        while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
-                chunk = self._stream.read(last_byte - position + 1)
-                yield chunk
+        while position <= last_byte:
+            chunk = self._stream.read(min(read_size - position % read_size, last_byte - position + 1))
+            if len(chunk) == 0:
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            position += len(chunk)
             yield chunk
 
     def close(self):
@@ -348,6 +362,19 @@ class StaticContentStream(StaticContent):
         return content
 
 
+class StaticContentMetadata(StaticContent):
+    """
+    The metadata of a piece of static content (digest, locked status, length, etc.), without its data.
+    """
+    def __init__(self, loc, name, content_type, last_modified_at=None, thumbnail_location=None, import_path=None,
+                 length=None, locked=False, content_digest=None):
+        super(StaticContentMetadata, self).__init__(
+            loc, name, content_type, None, last_modified_at=last_modified_at,
+            thumbnail_location=thumbnail_location, import_path=import_path,
+            length=length, locked=locked, content_digest=content_digest
+        )
+
+
 class ContentStore(object):
     '''
     Abstraction for all ContentStore providers (e.g. MongoDB)
@@ -358,6 +385,12 @@ class ContentStore(object):
     def find(self, filename):
         raise NotImplementedError
 
+    def find_metadata(self, location, throw_on_not_found=True):
+        """
+        Returns the :class:`StaticContentMetadata` of the asset at the given location, without reading its data.
+        """
+        raise NotImplementedError
+
     def get_all_content_for_course(self, course_key, start=0, maxresults=-1, sort=None, filter_params=None):
         '''
         Returns a list of static assets for a course, followed by the total number of assets.
@@ -373,6 +406,13 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_asset_index(self, course_key):
+        """
+        Returns a dict keyed by the (block_type, block_id) of each of the course's assets whose values are
+        dicts with the asset's `locked` status and `content_digest`.
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -1,13 +1,32 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import calendar
+import logging
 import os
 import json
+import tarfile
+import zlib
 import pymongo
 import gridfs
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
 from gridfs.errors import NoFile
+from gridfs.grid_file import GridOut
 from fs.osfs import OSFS
+from bson.objectid import ObjectId
 from bson.son import SON
+from pymongo.errors import DuplicateKeyError
+from pytz import UTC
+
+try:
+    from django.core.cache import caches, InvalidCacheBackendError
+    DJANGO_AVAILABLE = True
+except ImportError:
+    DJANGO_AVAILABLE = False
 
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
@@ -16,22 +35,66 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
-from .content import StaticContent, ContentStore, StaticContentStream
+from openedx.core.lib.cache_utils import get_cache
+from .content import StaticContent, ContentStore, StaticContentMetadata, StaticContentStream
+
+log = logging.getLogger(__name__)
+
+# Name of the request cache holding the course asset indexes already fetched during the current request.
+ASSET_INDEX_REQUEST_CACHE_NAME = 'contentstore.asset_index'
+# Bump this whenever the format of the cached course asset indexes changes.
+ASSET_INDEX_VERSION = 2
+# Number of assets per cached shard of a course asset index, which keeps each shard well under
+# memcached's 1MB item size limit.
+ASSET_INDEX_SHARD_SIZE = 1000
+
+# Prefix of the _id of the files holding content shared by several assets, followed by the content's md5.
+SHARED_CONTENT_ID_PREFIX = u'shared-content/'
+# Number of chunks copied at once to a new shared file, which bounds the memory used to share large assets.
+SHARED_CONTENT_COPY_BATCH_SIZE = 16
+
+# Files document fields which are left out of the exported assets policy.
+EXPORT_POLICY_EXCLUDED_FIELDS = ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'content_ref']
+# Number of assets fetched concurrently when exporting a course's assets into a tarball.
+EXPORT_WORKERS = 4
+# Assets up to this size, in bytes, are read in full ahead of being added to an export tarball.
+EXPORT_PREFETCH_MAX_SIZE = 1024 * 1024
+
+
+def get_asset_index_cache():
+    """
+    Return the django cache holding the course asset indexes: the "course_assets" cache if
+    one is configured, the default cache otherwise.  Returns None outside of django.
+    """
+    if not DJANGO_AVAILABLE:
+        return None
+    try:
+        return caches['course_assets']
+    except InvalidCacheBackendError:
+        return caches['default']
 
 
 class MongoContentStore(ContentStore):
     """
     MongoDB-backed ContentStore.
+
+    Assets are normally stored as one GridFS file each. An asset may instead reference a shared copy of its content,
+    stored once per md5 under SHARED_CONTENT_ID_PREFIX: its own files document then has a `content_ref` field
+    naming the shared file and no chunks. Shared files keep a `refcount` of the assets referencing them and are
+    removed along with the last of these.
     """
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None,
+        deduplicate_assets=False, **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param deduplicate_assets: if True, copying assets makes the copies reference a shared copy of their
+            content instead of duplicating it
         """
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
@@ -44,8 +107,10 @@ class MongoContentStore(ContentStore):
 
         self.fs = gridfs.GridFS(mongo_db, bucket)  # pylint: disable=invalid-name
 
+        self.fs_root = mongo_db[bucket]
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
+        self.deduplicate_assets = deduplicate_assets
 
     def close_connections(self):
         """
@@ -66,6 +131,7 @@ class MongoContentStore(ContentStore):
         If connections is True, then close the connection to the database as well.
         """
         connection = self.fs_files.database.connection
+        get_cache(ASSET_INDEX_REQUEST_CACHE_NAME).clear()
 
         if database:
             connection.drop_database(self.fs_files.database)
@@ -100,6 +166,7 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._invalidate_asset_index(content.location.course_key)
         return content
 
     def delete(self, location_or_id):
@@ -109,7 +176,11 @@ class MongoContentStore(ContentStore):
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        file_document = self.fs_files.find_and_modify({'_id': location_or_id}, remove=True, fields={'content_ref': 1})
+        self.chunks.remove({'files_id': location_or_id})
+        if file_document is not None and 'content_ref' in file_document:
+            self._release_shared_content(file_document['content_ref'])
+        self._invalidate_asset_index_for_id(location_or_id)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -117,7 +188,7 @@ class MongoContentStore(ContentStore):
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
+                fp = self._get_file(content_id)
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
@@ -132,7 +203,7 @@ class MongoContentStore(ContentStore):
                     content_digest=getattr(fp, 'md5', None),
                 )
             else:
-                with self.fs.get(content_id) as fp:
+                with self._get_file(content_id) as fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
                     if thumbnail_location:
                         thumbnail_location = location.course_key.make_asset_key(
@@ -152,6 +223,50 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    def _get_file(self, content_id, file_document=None):
+        """
+        Returns a GridOut reading the content of the asset stored under `content_id`, which may be held by
+        a shared file. `file_document` is the asset's files document, if already at hand.
+
+        Raises NoFile if there's no such asset.
+        """
+        if file_document is None:
+            file_document = self.fs_files.find_one({'_id': content_id})
+            if file_document is None:
+                raise NoFile(content_id)
+        if 'content_ref' in file_document:
+            # Read the shared chunks, but keep the asset's own attributes (displayname, locked, etc.).
+            file_document = dict(file_document, _id=file_document['content_ref'])
+        return GridOut(self.fs_root, file_document=file_document)
+
+    @autoretry_read()
+    def find_metadata(self, location, throw_on_not_found=True):
+        """
+        Returns the :class:`StaticContentMetadata` of the asset at the given location, read from the
+        GridFS files collection only; none of the asset's chunks are fetched.
+        """
+        content_id, __ = self.asset_db_key(location)
+        item = self.fs_files.find_one({'_id': content_id}, {
+            'displayname': 1, 'contentType': 1, 'uploadDate': 1, 'length': 1, 'md5': 1,
+            'locked': 1, 'thumbnail_location': 1, 'import_path': 1,
+        })
+        if item is None:
+            if throw_on_not_found:
+                raise NotFoundError(content_id)
+            else:
+                return None
+
+        thumbnail_location = item.get('thumbnail_location')
+        if thumbnail_location:
+            thumbnail_location = location.course_key.make_asset_key('thumbnail', thumbnail_location[4])
+        return StaticContentMetadata(
+            location, item.get('displayname'), item.get('contentType'), last_modified_at=item.get('uploadDate'),
+            thumbnail_location=thumbnail_location,
+            import_path=item.get('import_path'),
+            length=item.get('length'), locked=item.get('locked', False),
+            content_digest=item.get('md5'),
+        )
+
     def export(self, location, output_directory):
         content = self.find(location)
 
@@ -195,12 +310,95 @@ class MongoContentStore(ContentStore):
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
             for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in EXPORT_POLICY_EXCLUDED_FIELDS:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
 
         with open(assets_policy_file, 'w') as f:
             json.dump(policy, f, sort_keys=True, indent=4)
 
+    def export_all_for_course_to_tarfile(self, course_key, tar_file, output_directory, exclude=frozenset(),
+                                         max_workers=EXPORT_WORKERS):
+        """
+        Export all of this course's assets straight into an open tarfile, without going through the disk,
+        and return the assets' policy.
+
+        The assets are fetched by a pool of `max_workers` threads, at most twice as many ahead of the one
+        being added to the tarball. Assets up to EXPORT_PREFETCH_MAX_SIZE are read in full by the workers,
+        larger ones are copied into the tarball a GridFS chunk at a time.
+
+        Each path is only added once: of several assets exported to the same path, only the last one is
+        added, as it's the one `export_all_for_course` would leave in place.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            tar_file (TarFile): the tarfile, open for writing, to add the asset files to
+            output_directory: the path inside the tarball under which to put all the asset files
+            exclude: the paths inside the tarball not to add assets at, e.g. because other files are
+                added there instead
+            max_workers: the number of assets to fetch concurrently
+        """
+        policy = {}
+        assets, __ = self.get_all_content_for_course(course_key)
+
+        member_names = [self._get_exported_asset_path(output_directory, asset) for asset in assets]
+        last_index_by_member_name = {member_name: index for index, member_name in enumerate(member_names)}
+        exported_assets = [
+            (member_name, asset) for index, (member_name, asset) in enumerate(zip(member_names, assets))
+            if last_index_by_member_name[member_name] == index and member_name not in exclude
+        ]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for member_name, asset in exported_assets:
+                pending.append((member_name, asset, executor.submit(self._open_exported_asset, asset)))
+                if len(pending) > 2 * max_workers:
+                    self._add_asset_to_tarfile(tar_file, *pending.popleft())
+            while pending:
+                self._add_asset_to_tarfile(tar_file, *pending.popleft())
+
+        for asset in assets:
+            for attr, value in asset.iteritems():
+                if attr not in EXPORT_POLICY_EXCLUDED_FIELDS:
+                    policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+        return policy
+
+    @autoretry_read()
+    def _open_exported_asset(self, asset):
+        """
+        Returns a file-like object reading the content of `asset`, one of the documents returned by
+        `get_all_content_for_course`. Small assets are read in full right away.
+        """
+        fp = self._get_file(asset['_id'], asset)
+        if fp.length > EXPORT_PREFETCH_MAX_SIZE:
+            return fp
+        with fp:
+            return BytesIO(fp.read())
+
+    @staticmethod
+    def _get_exported_asset_path(output_directory, asset):
+        """
+        Returns the path under `output_directory` which `export` would have written `asset` to.
+        """
+        if asset.get('import_path') is not None:
+            output_directory = output_directory + '/' + os.path.dirname(asset['import_path'])
+        export_name = escape_invalid_characters(name=asset['displayname'], invalid_char_list=['/', '\\'])
+        return os.path.normpath(output_directory + '/' + export_name)
+
+    @staticmethod
+    def _add_asset_to_tarfile(tar_file, member_name, asset, future):
+        """
+        Adds the content read by `future` for `asset` to `tar_file`, as `member_name`.
+        """
+        tarinfo = tarfile.TarInfo(member_name.encode('utf-8'))
+        tarinfo.size = asset['length']
+        tarinfo.mtime = calendar.timegm(asset['uploadDate'].utctimetuple())
+        tarinfo.mode = 0o644
+        asset_file = future.result()
+        try:
+            tar_file.addfile(tarinfo, asset_file)
+        finally:
+            asset_file.close()
+
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
 
@@ -224,7 +422,10 @@ class MongoContentStore(ContentStore):
             items = self.fs_files.find(query)
             assets_to_delete = assets_to_delete + items.count()
             for asset in items:
-                self.fs.delete(asset[prefix])
+                self.chunks.remove({'files_id': asset['_id']})
+                if 'content_ref' in asset:
+                    self._release_shared_content(asset['content_ref'])
+                self._invalidate_asset_index_for_id(asset[prefix])
 
             self.fs_files.remove(query)
         return assets_to_delete
@@ -357,6 +558,7 @@ class MongoContentStore(ContentStore):
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        self._invalidate_asset_index(location.course_key)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -379,14 +581,18 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation fairly expensively copies all of the data, unless assets are deduplicated,
+        in which case only the assets' files documents are copied.
         """
         source_query = query_for_course(source_course_key)
+        shared_copies = []
         # it'd be great to figure out how to do all of this on the db server and not pull the bits over
         for asset in self.fs_files.find(source_query):
             asset_key = self.make_id_son(asset)
             # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
+            content_ref = self._share_content(asset) if self.deduplicate_assets else None
+            if content_ref is None:
+                source_content = self._get_file(asset_key, asset)
             if isinstance(asset_key, basestring):
                 asset_key = AssetKey.from_string(asset_key)
                 __, asset_key = self.asset_db_key(asset_key)
@@ -402,6 +608,18 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
+            if content_ref is not None:
+                shared_copies.append({
+                    '_id': asset_id, 'filename': asset['filename'], 'contentType': asset['contentType'],
+                    'displayname': asset['displayname'], 'content_son': asset_key,
+                    'thumbnail_location': asset['thumbnail_location'], 'import_path': asset['import_path'],
+                    'locked': asset.get('locked', False),
+                    'length': asset['length'], 'chunkSize': asset['chunkSize'], 'md5': asset['md5'],
+                    'uploadDate': datetime.now(UTC),
+                    'content_ref': content_ref,
+                })
+                continue
+
             self.fs.put(
                 source_content.read(),
                 _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
@@ -414,6 +632,113 @@ class MongoContentStore(ContentStore):
                 locked=asset.get('locked', False)
             )
 
+        # The copies are counted as references before they're inserted, so that the shared files can't be
+        # removed in between.
+        released_refs = set()
+        for content_ref, references in Counter(doc['content_ref'] for doc in shared_copies).iteritems():
+            result = self.fs_files.update({'_id': content_ref}, {'$inc': {'refcount': references}})
+            if not result.get('n'):
+                # The source assets were deleted meanwhile, along with their shared file.
+                log.warning(u'Shared content %s was removed while copying assets to %s', content_ref, dest_course_key)
+                released_refs.add(content_ref)
+        shared_copies = [doc for doc in shared_copies if doc['content_ref'] not in released_refs]
+        if shared_copies:
+            self.fs_files.insert(shared_copies)
+        self._invalidate_asset_index(dest_course_key)
+
+    def _share_content(self, file_document):
+        """
+        Makes the asset with the given files document reference a shared copy of its content, and returns the
+        _id of the shared file, or None if the content can't be shared at the moment.
+
+        The asset's reference is counted first. If no asset with identical content was shared yet, the asset's
+        chunks are then copied to the new shared file. Only once the shared file holds the content is the asset
+        switched over to it and are its own chunks removed, so that it can be read at any point in between.
+        """
+        if 'content_ref' in file_document:
+            return file_document['content_ref']
+
+        content_ref = SHARED_CONTENT_ID_PREFIX + file_document['md5']
+        # Tells the chunks copied for this shared file apart from those of a previous one being removed.
+        generation = ObjectId()
+        result = self.fs_files.update(
+            {'_id': content_ref},
+            {
+                '$inc': {'refcount': 1},
+                '$setOnInsert': {
+                    'length': file_document['length'], 'chunkSize': file_document['chunkSize'],
+                    'md5': file_document['md5'], 'uploadDate': file_document['uploadDate'],
+                    'generation': generation, 'complete': False,
+                },
+            },
+            upsert=True,
+        )
+        if result.get('updatedExisting'):
+            shared_file = self.fs_files.find_one({'_id': content_ref}, {'complete': 1})
+            if shared_file is None or not shared_file.get('complete'):
+                # The content is still being copied by another process, or its copy was interrupted.
+                self._release_shared_content(content_ref)
+                return None
+        elif not self._copy_chunks(file_document, content_ref, generation):
+            self._release_shared_content(content_ref)
+            return None
+
+        self.fs_files.update({'_id': file_document['_id']}, {'$set': {'content_ref': content_ref}})
+        self.chunks.remove({'files_id': file_document['_id']})
+        file_document['content_ref'] = content_ref
+        return content_ref
+
+    def _copy_chunks(self, file_document, content_ref, generation):
+        """
+        Copies the chunks of the asset with the given files document to the new shared file with the given _id
+        and generation, and marks it complete. Returns whether all of the chunks were copied. The chunks are
+        copied SHARED_CONTENT_COPY_BATCH_SIZE at a time; those copied before a failure are removed along with
+        the shared file once it's released.
+        """
+        chunk_size = file_document['chunkSize']
+        expected_count = (file_document['length'] + chunk_size - 1) // chunk_size
+        copied_count = 0
+        chunks = []
+        source_chunks = self.chunks.find({'files_id': file_document['_id']}).batch_size(SHARED_CONTENT_COPY_BATCH_SIZE)
+        try:
+            for chunk in source_chunks:
+                chunk['_id'] = ObjectId()
+                chunk['files_id'] = content_ref
+                chunk['generation'] = generation
+                chunks.append(chunk)
+                if len(chunks) == SHARED_CONTENT_COPY_BATCH_SIZE:
+                    self.chunks.insert(chunks)
+                    copied_count += len(chunks)
+                    chunks = []
+            if chunks:
+                self.chunks.insert(chunks)
+                copied_count += len(chunks)
+        except DuplicateKeyError:
+            # The chunks of a previous shared file for the same content aren't removed yet.
+            return False
+        finally:
+            source_chunks.close()
+        if copied_count != expected_count:
+            log.warning(u'Asset %s has %d chunks out of %d, not sharing its content',
+                        file_document['_id'], copied_count, expected_count)
+            return False
+        if self.chunks.find({'files_id': content_ref, 'generation': generation}).count() != expected_count:
+            return False
+        self.fs_files.update({'_id': content_ref}, {'$set': {'complete': True}})
+        return True
+
+    def _release_shared_content(self, content_ref):
+        """
+        Drops a reference to the shared file with the given _id, removing it once it's no longer referenced.
+        """
+        self.fs_files.update({'_id': content_ref}, {'$inc': {'refcount': -1}})
+        shared_file = self.fs_files.find_and_modify(
+            {'_id': content_ref, 'refcount': {'$lte': 0}}, remove=True, fields={'generation': 1}
+        )
+        if shared_file is not None:
+            # Leave alone the chunks of any new shared file created for the same content meanwhile.
+            self.chunks.remove({'files_id': content_ref, 'generation': shared_file.get('generation')})
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
@@ -425,6 +750,186 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+            if 'content_ref' in asset:
+                self._release_shared_content(asset['content_ref'])
+        self._invalidate_asset_index(course_key)
+
+    def get_asset_index(self, course_key):
+        """
+        Returns an index of the metadata needed to build urls to all of this course's assets and thumbnails.
+
+        The index is a dict keyed by the (block_type, block_id) of each asset, whose values are dicts with the
+        asset's `locked` status and `content_digest`. It is built with a single query, and cached in shards of
+        up to ASSET_INDEX_SHARD_SIZE assets until any of the course's assets are saved, deleted or have their
+        attributes changed, which moves the course to a new generation of cached asset indexes.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+        """
+        cache_key = self._asset_index_cache_key(
+            course_key.org, course_key.course, course_key.run, getattr(course_key, 'deprecated', False)
+        )
+        request_cache = get_cache(ASSET_INDEX_REQUEST_CACHE_NAME)
+        if cache_key in request_cache:
+            return request_cache[cache_key]
+
+        cache = get_asset_index_cache()
+        asset_index = None
+        if cache is not None:
+            generation = self._get_asset_index_generation(cache, cache_key)
+            asset_index = self._get_cached_asset_index(cache, cache_key, generation)
+        if asset_index is None:
+            asset_index = self._build_asset_index(course_key)
+            if cache is not None:
+                self._set_cached_asset_index(cache, cache_key, generation, asset_index)
+
+        request_cache[cache_key] = asset_index
+        return asset_index
+
+    @staticmethod
+    def _get_asset_index_generation(cache, cache_key):
+        """
+        Returns the current generation of the asset index cached under `cache_key`, starting one if there's none.
+        """
+        generation_key = MongoContentStore._asset_index_generation_key(cache_key)
+        generation = cache.get(generation_key, version=ASSET_INDEX_VERSION)
+        if generation is None:
+            generation = uuid4().hex
+            if not cache.add(generation_key, generation, None, version=ASSET_INDEX_VERSION):
+                generation = cache.get(generation_key, version=ASSET_INDEX_VERSION) or generation
+        return generation
+
+    @staticmethod
+    def _get_cached_asset_index(cache, cache_key, generation):
+        """
+        Returns the asset index cached in `cache` under `cache_key` for the given generation, or None if it or any
+        of its shards isn't cached.
+        """
+        generation_cache_key = MongoContentStore._asset_index_generation_cache_key(cache_key, generation)
+        shard_count = cache.get(generation_cache_key, version=ASSET_INDEX_VERSION)
+        if shard_count is None:
+            return None
+        shard_keys = [
+            MongoContentStore._asset_index_shard_key(generation_cache_key, shard) for shard in range(shard_count)
+        ]
+        shards = cache.get_many(shard_keys, version=ASSET_INDEX_VERSION)
+        if len(shards) != shard_count:
+            return None
+
+        asset_index = {}
+        for shard in shards.itervalues():
+            asset_index.update(shard)
+        return asset_index
+
+    @staticmethod
+    def _set_cached_asset_index(cache, cache_key, generation, asset_index):
+        """
+        Caches `asset_index` in `cache` for the given generation: its shards first, then their number.
+
+        Nothing is cached if the course moved to a new generation since `generation` was read, as
+        `asset_index` may have been built from the assets as they were before the change.
+        """
+        generation_cache_key = MongoContentStore._asset_index_generation_cache_key(cache_key, generation)
+        shard_count = max(1, (len(asset_index) + ASSET_INDEX_SHARD_SIZE - 1) // ASSET_INDEX_SHARD_SIZE)
+        shards = {
+            MongoContentStore._asset_index_shard_key(generation_cache_key, shard): {} for shard in range(shard_count)
+        }
+        for asset_id, asset_metadata in asset_index.iteritems():
+            # Shards are picked by a hash of the asset's name which is stable across processes.
+            shard = zlib.crc32(u'{}/{}'.format(*asset_id).encode('utf-8')) % shard_count
+            shards[MongoContentStore._asset_index_shard_key(generation_cache_key, shard)][asset_id] = asset_metadata
+
+        try:
+            generation_key = MongoContentStore._asset_index_generation_key(cache_key)
+            if cache.get(generation_key, version=ASSET_INDEX_VERSION) != generation:
+                return
+            failed_keys = cache.set_many(shards, version=ASSET_INDEX_VERSION)
+            if failed_keys:
+                log.warning(u'Could not cache %d of the %d shards of the asset index %s',
+                            len(failed_keys), shard_count, cache_key)
+                return
+            cache.set(generation_cache_key, shard_count, version=ASSET_INDEX_VERSION)
+        except Exception:  # pylint: disable=broad-except
+            log.exception(u'Could not cache the asset index %s', cache_key)
+
+    @autoretry_read()
+    def _build_asset_index(self, course_key):
+        """
+        Queries the metadata of all of the course's assets and thumbnails; see :meth:`get_asset_index`.
+        """
+        asset_index = {}
+        fields = {'_id': 1, 'content_son': 1, 'locked': 1, 'md5': 1}
+        for asset in self.fs_files.find(query_for_course(course_key), fields):
+            asset_id = asset.get('content_son', asset['_id'])
+            asset_index[(asset_id['category'], asset_id['name'])] = {
+                'locked': asset.get('locked', False),
+                'content_digest': asset.get('md5'),
+            }
+        return asset_index
+
+    @staticmethod
+    def _asset_index_cache_key(org, course, run, deprecated):
+        """
+        Returns the key under which the asset index of the given course is cached.
+        """
+        if deprecated:
+            # assets of deprecated courses are stored without a run; see :func:`query_for_course`
+            run = None
+        return u'asset_index.{}.{}.{}.{}'.format(org, course, run, deprecated).encode('utf-8')
+
+    @staticmethod
+    def _asset_index_generation_key(cache_key):
+        """
+        Returns the key under which the current generation of the asset index cached under `cache_key` is cached.
+        """
+        return '{}.generation'.format(cache_key)
+
+    @staticmethod
+    def _asset_index_generation_cache_key(cache_key, generation):
+        """
+        Returns the key under which the number of shards of the given generation of the asset index cached under
+        `cache_key` is cached.
+        """
+        return '{}.{}'.format(cache_key, generation)
+
+    @staticmethod
+    def _asset_index_shard_key(generation_cache_key, shard):
+        """
+        Returns the key under which the given shard of the asset index cached under `generation_cache_key` is cached.
+        """
+        return '{}.{}'.format(generation_cache_key, shard)
+
+    def _invalidate_asset_index(self, course_key):
+        """
+        Drops the cached asset index of the given course, so that it's rebuilt on next use.
+        """
+        self._drop_cached_asset_index(self._asset_index_cache_key(
+            course_key.org, course_key.course, course_key.run, getattr(course_key, 'deprecated', False)
+        ))
+
+    def _invalidate_asset_index_for_id(self, asset_id):
+        """
+        Like :meth:`_invalidate_asset_index`, for the course of the asset stored under the given database _id.
+        """
+        if isinstance(asset_id, basestring):
+            self._invalidate_asset_index(AssetKey.from_string(asset_id).course_key)
+        else:
+            self._drop_cached_asset_index(self._asset_index_cache_key(
+                asset_id['org'], asset_id['course'], asset_id.get('run'), 'run' not in asset_id
+            ))
+
+    def _drop_cached_asset_index(self, cache_key):
+        """
+        Removes the asset index cached under `cache_key` from the request cache, and moves it to a new generation
+        in the django cache. The entries of the previous generation are left to expire, as they're no longer read,
+        and asset indexes built before the change are no longer cached.
+        """
+        get_cache(ASSET_INDEX_REQUEST_CACHE_NAME).pop(cache_key, None)
+        cache = get_asset_index_cache()
+        if cache is not None:
+            cache.set(
+                self._asset_index_generation_key(cache_key), uuid4().hex, None, version=ASSET_INDEX_VERSION
+            )
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -0,0 +1,93 @@
+"""
+Performance test for streaming large assets out of the contentstore.
+"""
+import os
+import threading
+import unittest
+from uuid import uuid4
+
+import ddt
+import pytest
+
+from opaque_keys.edx.locator import CourseLocator
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.mongo import MongoContentStore
+from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Size of the asset downloaded by every client, in bytes.
+ASSET_SIZE = 64 * 1024 * 1024
+
+# Number of clients downloading the asset at the same time.
+CONCURRENT_DOWNLOADS = (1, 4, 16)
+
+
+@ddt.ddt
+@unittest.skip
+class ConcurrentAssetDownloads(unittest.TestCase):
+    """
+    This class exists to time concurrent downloads of a large asset, streamed from GridFS
+    as the contentserver does, and to check how much data each download holds at a time.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(ConcurrentAssetDownloads, self).setUp()
+        self.contentstore = MongoContentStore(MONGO_HOST, 'test_asset_streaming_{}'.format(uuid4().hex[:5]),
+                                              port=MONGO_PORT_NUM)
+        self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
+
+        self.asset_key = CourseLocator('perf', 'streaming', 'run').make_asset_key('asset', 'large.bin')
+        self.contentstore.save(
+            StaticContent(self.asset_key, 'large.bin', 'application/octet-stream', os.urandom(ASSET_SIZE))
+        )
+
+    def download(self, results, ranged):
+        """
+        Streams the asset, entirely or a range covering most of it, and records the size of the
+        data streamed along with the size of the largest piece of data held at once.
+        """
+        content = self.contentstore.find(self.asset_key, as_stream=True)
+        if ranged:
+            chunks = content.stream_data_in_range(1, ASSET_SIZE - 2)
+        else:
+            chunks = content.stream_data()
+        total_length = 0
+        largest_chunk = 0
+        for chunk in chunks:
+            total_length += len(chunk)
+            largest_chunk = max(largest_chunk, len(chunk))
+        content.close()
+        results.append((total_length, largest_chunk))
+
+    @ddt.data(*[(downloads, ranged) for downloads in CONCURRENT_DOWNLOADS for ranged in (False, True)])
+    @ddt.unpack
+    def test_concurrent_downloads(self, downloads, ranged):
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        results = []
+        threads = [threading.Thread(target=self.download, args=(results, ranged)) for __ in range(downloads)]
+        desc = "ConcurrentAssetDownloads:{}:{}MB:{}".format(
+            downloads, ASSET_SIZE // (1024 * 1024), 'ranged' if ranged else 'full'
+        )
+        with CodeBlockTimer(desc):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(results), downloads)
+        expected_length = ASSET_SIZE - 2 if ranged else ASSET_SIZE
+        for total_length, largest_chunk in results:
+            self.assertEqual(total_length, expected_length)
+            # Memory per download stays bounded by the GridFS chunk size.
+            self.assertLessEqual(largest_chunk, 255 * 1024)
@@ -2,6 +2,8 @@
  Test contentstore.mongo functionality
 """
 import logging
+import tarfile
+from io import BytesIO
 from uuid import uuid4
 import unittest
 import mimetypes
@@ -12,10 +14,19 @@ import shutil
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
 from xmodule.tests import DATA_DIR
-from xmodule.contentstore.mongo import MongoContentStore
+from xmodule.contentstore.mongo import (
+    ASSET_INDEX_REQUEST_CACHE_NAME,
+    ASSET_INDEX_VERSION,
+    SHARED_CONTENT_ID_PREFIX,
+    MongoContentStore
+)
 from xmodule.contentstore.content import StaticContent
 from xmodule.exceptions import NotFoundError
 import ddt
+from bson.binary import Binary
+from django.core.cache.backends.locmem import LocMemCache
+from mock import patch
+from openedx.core.lib.cache_utils import get_cache
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 
 log = logging.getLogger(__name__)
@@ -124,6 +135,49 @@ class TestContentstore(unittest.TestCase):
             "Found unknown asset {}".format(unknown_asset)
         )
 
+    @ddt.data(*[(deprecated, prefetch) for deprecated in (True, False) for prefetch in (0, 1024 ** 2)])
+    @ddt.unpack
+    def test_export_for_course_to_tarfile(self, deprecated, prefetch_max_size):
+        """
+        Test exporting a course's assets into a tarfile, both streamed and prefetched
+        """
+        self.set_up_assets(deprecated)
+        tar_buffer = BytesIO()
+        with patch('xmodule.contentstore.mongo.EXPORT_PREFETCH_MAX_SIZE', prefetch_max_size):
+            with tarfile.open(fileobj=tar_buffer, mode='w:gz') as tar_file:
+                policy = self.contentstore.export_all_for_course_to_tarfile(
+                    self.course1_key, tar_file, u'course/static', max_workers=1,
+                )
+
+        tar_buffer.seek(0)
+        with tarfile.open(fileobj=tar_buffer, mode='r:gz') as tar_file:
+            self.assertItemsEqual(tar_file.getnames(), ['course/static/' + name for name in self.course1_files])
+            for filename in self.course1_files:
+                with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+                    self.assertEqual(tar_file.extractfile('course/static/' + filename).read(), f.read())
+        self.assertItemsEqual(policy.keys(), self.course1_files)
+        self.assertEqual(policy['picture1.jpg']['displayname'], 'picture1.jpg')
+        self.assertNotIn('md5', policy['picture1.jpg'])
+
+    def test_export_for_course_to_tarfile_exclude(self):
+        """
+        Test that excluded paths are left out of the tarfile, but not out of the policy
+        """
+        self.set_up_assets(False)
+        tar_buffer = BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode='w:gz') as tar_file:
+            policy = self.contentstore.export_all_for_course_to_tarfile(
+                self.course1_key, tar_file, u'course/static', exclude={u'course/static/picture1.jpg'},
+            )
+
+        tar_buffer.seek(0)
+        with tarfile.open(fileobj=tar_buffer, mode='r:gz') as tar_file:
+            self.assertItemsEqual(
+                tar_file.getnames(),
+                ['course/static/' + name for name in self.course1_files if name != 'picture1.jpg'],
+            )
+        self.assertItemsEqual(policy.keys(), self.course1_files)
+
     @ddt.data(True, False)
     def test_export_for_course(self, deprecated):
         """
@@ -197,6 +251,101 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_deduplicated(self, deprecated):
+        """
+        copy_all_course_assets with deduplicated assets copies no data
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore.deduplicate_assets = True
+        chunk_count = self.contentstore.chunks.count()
+        source_data = {
+            filename: self.contentstore.find(self.course1_key.make_asset_key('asset', filename)).data
+            for filename in self.course1_files
+        }
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assertEqual(self.contentstore.chunks.count(), chunk_count)
+        __, count = self.contentstore.get_all_content_for_course(dest_course)
+        self.assertEqual(count, len(self.course1_files))
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            dest_key = dest_course.make_asset_key('asset', filename)
+            source = self.contentstore.find(asset_key)
+            copied = self.contentstore.find(dest_key)
+            for propname in ['name', 'content_type', 'length', 'locked', 'content_digest', 'data']:
+                self.assertEqual(getattr(source, propname), getattr(copied, propname))
+            self.assertEqual(copied.data, source_data[filename])
+            self.assertEqual(
+                ''.join(self.contentstore.find(dest_key, as_stream=True).stream_data()), source_data[filename]
+            )
+
+        # deleting either copy leaves the other intact, deleting both removes the shared content
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        for filename in self.course1_files:
+            dest_key = dest_course.make_asset_key('asset', filename)
+            self.assertEqual(self.contentstore.find(dest_key).data, source_data[filename])
+        for filename in self.course1_files:
+            self.contentstore.delete(dest_course.make_asset_key('asset', filename))
+        self.assertEqual(self.contentstore.fs_files.find({'content_ref': {'$exists': True}}).count(), 0)
+        self.assertEqual(self.contentstore.fs_files.find({'refcount': {'$exists': True}}).count(), 0)
+        self.assertEqual(
+            self.contentstore.chunks.count(),
+            sum(self.contentstore.chunks.find({'files_id': asset['_id']}).count()
+                for asset in self.contentstore.fs_files.find())
+        )
+
+    def test_copy_assets_shared_content_in_batches(self):
+        """
+        The chunks of content shared for the first time are copied a few at a time
+        """
+        self.set_up_assets(False)
+        self.contentstore.deduplicate_assets = True
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        asset_id, __ = self.contentstore.asset_db_key(asset_key)
+        data = self.contentstore.find(asset_key).data
+        # Store the asset in chunks of 4 bytes
+        chunk_size = 4
+        self.contentstore.chunks.remove({'files_id': asset_id})
+        self.contentstore.chunks.insert([
+            {'files_id': asset_id, 'n': index, 'data': Binary(data[offset:offset + chunk_size])}
+            for index, offset in enumerate(range(0, len(data), chunk_size))
+        ])
+        self.contentstore.fs_files.update({'_id': asset_id}, {'$set': {'chunkSize': chunk_size}})
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        with patch('xmodule.contentstore.mongo.SHARED_CONTENT_COPY_BATCH_SIZE', 2):
+            with patch.object(
+                self.contentstore.chunks, 'insert', wraps=self.contentstore.chunks.insert
+            ) as mock_insert:
+                self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        content_ref = self.contentstore.get_attrs(asset_key)['content_ref']
+        batches = [args[0] for args, __ in mock_insert.call_args_list if args[0][0]['files_id'] == content_ref]
+        self.assertEqual(len(batches), (len(data) + 2 * chunk_size - 1) // (2 * chunk_size))
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertEqual(self.contentstore.find(asset_key).data, data)
+        self.assertEqual(self.contentstore.find(dest_course.make_asset_key('asset', self.course1_files[0])).data, data)
+
+    def test_copy_assets_shared_content_incomplete(self):
+        """
+        Assets whose shared content is still being copied are copied in full, and keep their own chunks
+        """
+        self.set_up_assets(False)
+        self.contentstore.deduplicate_assets = True
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        source = self.contentstore.find_metadata(asset_key)
+        content_ref = SHARED_CONTENT_ID_PREFIX + source['md5']
+        self.contentstore.fs_files.insert({'_id': content_ref, 'refcount': 1, 'complete': False})
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        dest_key = dest_course.make_asset_key('asset', self.course1_files[0])
+        self.assertNotIn('content_ref', self.contentstore.find_metadata(asset_key))
+        self.assertNotIn('content_ref', self.contentstore.find_metadata(dest_key))
+        self.assertEqual(self.contentstore.find(dest_key).data, self.contentstore.find(asset_key).data)
+        self.assertEqual(self.contentstore.fs_files.find_one({'_id': content_ref})['refcount'], 1)
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
@@ -209,3 +358,100 @@ class TestContentstore(unittest.TestCase):
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         self.assertEqual(count, len(self.course2_files))
+
+    @ddt.data(True, False)
+    def test_asset_index(self, deprecated):
+        """
+        Test get_asset_index and its invalidation when assets change
+        """
+        self.set_up_assets(deprecated)
+        asset_index = self.contentstore.get_asset_index(self.course1_key)
+        self.assertEqual(
+            sorted(asset_index.keys()),
+            sorted(('asset', filename) for filename in self.course1_files)
+        )
+        for filename in self.course1_files:
+            asset_key = self.course1_key.make_asset_key('asset', filename)
+            content = self.contentstore.find(asset_key)
+            self.assertEqual(asset_index[('asset', filename)], {
+                'locked': content.locked,
+                'content_digest': content.content_digest,
+            })
+
+        # the index is only built once
+        with patch.object(self.contentstore, '_build_asset_index') as mock_build:
+            self.assertEqual(self.contentstore.get_asset_index(self.course1_key), asset_index)
+        self.assertFalse(mock_build.called)
+
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        prelocked = asset_index[('asset', self.course1_files[0])]['locked']
+        self.contentstore.set_attr(asset_key, 'locked', not prelocked)
+        self.assertEqual(
+            self.contentstore.get_asset_index(self.course1_key)[('asset', self.course1_files[0])]['locked'],
+            not prelocked
+        )
+
+        self.contentstore.delete(asset_key)
+        self.assertNotIn(('asset', self.course1_files[0]), self.contentstore.get_asset_index(self.course1_key))
+
+        self.save_asset(self.course1_files[0], asset_key, self.course1_files[0], False)
+        self.assertIn(('asset', self.course1_files[0]), self.contentstore.get_asset_index(self.course1_key))
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.assertEqual(self.contentstore.get_asset_index(self.course1_key), {})
+
+    def test_asset_index_shards(self):
+        """
+        Test that the asset index is cached in shards, and rebuilt when any of them is missing
+        """
+        self.set_up_assets(False)
+        cache = LocMemCache('test_asset_index_shards', {})
+        with patch('xmodule.contentstore.mongo.get_asset_index_cache', return_value=cache):
+            with patch('xmodule.contentstore.mongo.ASSET_INDEX_SHARD_SIZE', 1):
+                asset_index = self.contentstore.get_asset_index(self.course1_key)
+            # The shards, their number and the generation of the course's asset index
+            self.assertEqual(len(cache._cache), len(self.course1_files) + 2)  # pylint: disable=protected-access
+
+            get_cache(ASSET_INDEX_REQUEST_CACHE_NAME).clear()
+            with patch.object(self.contentstore, '_build_asset_index') as mock_build:
+                self.assertEqual(self.contentstore.get_asset_index(self.course1_key), asset_index)
+            self.assertFalse(mock_build.called)
+
+            get_cache(ASSET_INDEX_REQUEST_CACHE_NAME).clear()
+            cache_key = self.contentstore._asset_index_cache_key(  # pylint: disable=protected-access
+                self.course1_key.org, self.course1_key.course, self.course1_key.run, False
+            )
+            # pylint: disable=protected-access
+            generation = self.contentstore._get_asset_index_generation(cache, cache_key)
+            generation_cache_key = self.contentstore._asset_index_generation_cache_key(cache_key, generation)
+            shard_key = self.contentstore._asset_index_shard_key(generation_cache_key, 0)
+            cache.delete(shard_key, version=ASSET_INDEX_VERSION)
+            with patch.object(
+                self.contentstore, '_build_asset_index', wraps=self.contentstore._build_asset_index
+            ) as mock_build:
+                self.assertEqual(self.contentstore.get_asset_index(self.course1_key), asset_index)
+            self.assertTrue(mock_build.called)
+
+    def test_stale_asset_index_not_cached(self):
+        """
+        Test that an asset index built before the course's assets changed isn't cached
+        """
+        self.set_up_assets(False)
+        cache = LocMemCache('test_stale_asset_index_not_cached', {})
+        cache_key = self.contentstore._asset_index_cache_key(  # pylint: disable=protected-access
+            self.course1_key.org, self.course1_key.course, self.course1_key.run, False
+        )
+        with patch('xmodule.contentstore.mongo.get_asset_index_cache', return_value=cache):
+            generation = self.contentstore._get_asset_index_generation(  # pylint: disable=protected-access
+                cache, cache_key
+            )
+            stale_asset_index = self.contentstore._build_asset_index(  # pylint: disable=protected-access
+                self.course1_key
+            )
+            self.contentstore.delete(self.course1_key.make_asset_key('asset', self.course1_files[0]))
+            self.contentstore._set_cached_asset_index(  # pylint: disable=protected-access
+                cache, cache_key, generation, stale_asset_index
+            )
+
+            get_cache(ASSET_INDEX_REQUEST_CACHE_NAME).clear()
+            self.assertNotIn(('asset', self.course1_files[0]), self.contentstore.get_asset_index(self.course1_key))
@@ -3,6 +3,9 @@ Methods for exporting course data to XML
 """
 
 import logging
+import os
+import tarfile
+import time
 from abc import abstractmethod
 from six import text_type
 import lxml.etree
@@ -15,8 +18,8 @@ from xmodule.modulestore.inheritance import own_metadata
 from xmodule.modulestore.store_utilities import draft_node_constructor, get_draft_subtree_roots
 from xmodule.modulestore import LIBRARY_ROOT
 from fs.osfs import OSFS
+from fs.tempfs import TempFS
 from json import dumps
-import os
 
 from xmodule.modulestore.draft_and_published import DIRECT_ONLY_CATEGORIES
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
@@ -112,14 +115,17 @@ class ExportManager(object):
         `modulestore`: A `ModuleStore` object that is the source of the modules to export
         `contentstore`: A `ContentStore` object that is the source of the content to export, can be None
         `courselike_key`: The Locator of the Descriptor to export
-        `root_dir`: The directory to write the exported xml to
-        `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `root_dir`: The directory to write the exported xml to, unused when exporting to a tarfile
+        `target_dir`: The name of the directory inside `root_dir` (or the tarfile) to write the content to
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = text_type(target_dir)
+        # The tarfile being exported to, if any, and the files exported before the static assets to it.
+        self.tar_file = None
+        self._files_before_assets = None
 
     @abstractmethod
     def get_key(self):
@@ -149,13 +155,73 @@ class ExportManager(object):
         Get the target courselike object for this export.
         """
 
+    def export_static_assets(self, export_fs, root_courselike_dir):
+        """
+        Export the static assets from the contentstore, along with their policy file.
+        """
+        if self.tar_file is None:
+            self.contentstore.export_all_for_course(
+                self.courselike_key,
+                root_courselike_dir + '/static/',
+                root_courselike_dir + '/policies/assets.json',
+            )
+        else:
+            # The assets are added to the tarfile once everything else is exported, see export_to_tarfile.
+            self._files_before_assets = set(export_fs.walk.files())
+
     def export(self):
         """
         Perform the export given the parameters handed to this class at init.
         """
+        self._export(OSFS(self.root_dir))
+
+    def export_to_tarfile(self, tar_file):
+        """
+        Perform the export into `tar_file`, a tarfile open for writing, rather than into `root_dir`.
+
+        The exported xml and policies are spooled to a temporary directory, while the assets are streamed
+        into the tarfile straight from the contentstore. Each path is only added to the tarfile once.
+        """
+        temp_fs = TempFS()
+        self.tar_file = tar_file
+        self._files_before_assets = None
+        try:
+            self._export(temp_fs)
+            asset_paths = set()
+            if self._files_before_assets is not None:
+                asset_paths = self._add_static_assets_to_tarfile(temp_fs.opendir(self.target_dir))
+            _add_fs_to_tarfile(temp_fs, tar_file, exclude=asset_paths)
+        finally:
+            self.tar_file = None
+            self._files_before_assets = None
+            temp_fs.close()
+
+    def _add_static_assets_to_tarfile(self, export_fs):
+        """
+        Add the static assets from the contentstore to the tarfile, and their policy file to `export_fs`.
+        Returns the paths of the assets in the tarfile.
+
+        As when exporting to a directory, the assets replace the files exported to the same paths before
+        them, e.g. video transcripts, and are replaced by those exported after them, e.g. the course image.
+        """
+        files_after_assets = {
+            os.path.normpath(self.target_dir + file_path) for file_path in export_fs.walk.files()
+            if file_path not in self._files_before_assets
+        }
+        member_names_before_assets = set(self.tar_file.getnames())
+        policy = self.contentstore.export_all_for_course_to_tarfile(
+            self.courselike_key, self.tar_file, self.target_dir + '/static', exclude=files_after_assets,
+        )
+        with export_fs.makedir('policies', recreate=True).open(u'assets.json', 'wb') as assets_policy:
+            assets_policy.write(dumps(policy, sort_keys=True, indent=4))
+        return set(self.tar_file.getnames()) - member_names_before_assets
+
+    def _export(self, fsm):
+        """
+        Perform the export into the `fsm` filesystem.
+        """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -173,7 +239,7 @@ class ExportManager(object):
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
+            root_courselike_dir = None if self.root_dir is None else self.root_dir + '/' + self.target_dir
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
@@ -203,26 +269,20 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        asset_dir = export_fs.makedir(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(export_fs, root_courselike_dir)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -237,10 +297,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open(u'course_image.jpg', 'wb') as course_image_file:
+                    output_dir = export_fs.makedirs(u'static/images', recreate=True)
+                    with output_dir.open(u'course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -317,11 +375,7 @@ class LibraryExportManager(ExportManager):
         export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            self.export_static_assets(export_fs, root_courselike_dir)
 
     def post_process(self, root, export_fs):
         """
@@ -350,6 +404,43 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tarball(modulestore, contentstore, course_key, tar_file, course_dir):
+    """
+    Thin wrapper for the Course Export Manager, exporting into an open tarfile. See ExportManager for details.
+    """
+    CourseExportManager(modulestore, contentstore, course_key, None, course_dir).export_to_tarfile(tar_file)
+
+
+def export_library_to_tarball(modulestore, contentstore, library_key, tar_file, library_dir):
+    """
+    Thin wrapper for the Library Export Manager, exporting into an open tarfile. See ExportManager for details.
+    """
+    LibraryExportManager(modulestore, contentstore, library_key, None, library_dir).export_to_tarfile(tar_file)
+
+
+def _add_fs_to_tarfile(export_fs, tar_file, exclude=frozenset()):
+    """
+    Add all of the directories and files of `export_fs` to `tar_file`, but for the files in `exclude`.
+    """
+    mtime = time.time()
+    for dir_path in export_fs.walk.dirs():
+        tarinfo = tarfile.TarInfo(dir_path.lstrip('/').encode('utf-8'))
+        tarinfo.type = tarfile.DIRTYPE
+        tarinfo.mode = 0o755
+        tarinfo.mtime = mtime
+        tar_file.addfile(tarinfo)
+    for file_path in export_fs.walk.files():
+        member_name = os.path.normpath(file_path.lstrip('/'))
+        if member_name in exclude:
+            continue
+        tarinfo = tarfile.TarInfo(member_name.encode('utf-8'))
+        tarinfo.size = export_fs.getsize(file_path)
+        tarinfo.mode = 0o644
+        tarinfo.mtime = mtime
+        with export_fs.open(file_path, 'rb') as exported_file:
+            tar_file.addfile(tarinfo, exported_file)
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
@@ -4,12 +4,15 @@ user partitions.  It uses the user_service key/value store provided by the LMS r
 persist the assignments.
 """
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
+from edx_django_utils.cache import RequestCache
 import logging
 
 from openedx.core.lib.cache_utils import request_cached
 from openedx.features.content_type_gating.partitions import create_content_gating_partition
 from xmodule.partitions.partitions import (
+    NoSuchUserPartitionGroupError,
     UserPartition,
     UserPartitionError,
     ENROLLMENT_TRACK_PARTITION_ID,
@@ -21,6 +24,9 @@ log = logging.getLogger(__name__)
 
 FEATURES = getattr(settings, 'FEATURES', {})
 
+# Namespace of the request cache of the groups users are in for user partitions.
+USER_PARTITION_GROUPS_NAMESPACE = u'partitions_service.user_partition_groups'
+
 
 @request_cached()
 def get_all_partitions_for_course(course, active_only=False):
@@ -59,17 +65,81 @@ def get_user_partition_groups(course_key, user_partitions, user, partition_dict_
 
     partition_groups = {}
     for partition in user_partitions:
-        group = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
-        )
+        group = get_user_group_for_partition(course_key, user, partition)
 
         if group is not None:
             partition_groups[getattr(partition, partition_dict_key)] = group
     return partition_groups
 
 
+def get_user_group_for_partition(course_key, user, user_partition, assign=True):
+    """
+    Returns the group of the user partition the user is in, as returned by the
+    partition's scheme, or None if the user isn't in any of its groups.
+
+    The group is memoized for the rest of the request, and, unless it's 0 or
+    the user is masquerading, cached for USER_PARTITION_GROUPS_CACHE_TIMEOUT
+    seconds across requests.
+
+    Arguments:
+        course_key (CourseKey)
+        user (User)
+        user_partition (UserPartition)
+        assign (bool) - Whether the scheme may assign the user to a group, if
+            they're not in one yet.
+    """
+    if getattr(user, 'masquerade_settings', {}).get(course_key):
+        # The group depends on the masquerade, which isn't part of the cache keys.
+        return _get_group_from_scheme(course_key, user, user_partition, assign)
+
+    cache_key = u'{}.{}.{}.{}.{}'.format(
+        USER_PARTITION_GROUPS_NAMESPACE, course_key, user.id, user_partition.id, int(assign)
+    )
+    request_cache = RequestCache(USER_PARTITION_GROUPS_NAMESPACE)
+    cached_response = request_cache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    timeout = getattr(settings, 'USER_PARTITION_GROUPS_CACHE_TIMEOUT', 0)
+    group = None
+    group_is_cached = False
+    if timeout and user.id is not None:
+        cached_group_id = cache.get(cache_key)
+        if cached_group_id is not None:
+            try:
+                group = user_partition.get_group(cached_group_id) if cached_group_id >= 0 else None
+                group_is_cached = True
+            except NoSuchUserPartitionGroupError:
+                pass
+
+    if not group_is_cached:
+        group = _get_group_from_scheme(course_key, user, user_partition, assign)
+        if timeout and user.id is not None:
+            # Users in no group are cached with a negative group id, which no group has.
+            cache.set(cache_key, group.id if group is not None else -1, timeout)
+
+    request_cache.set(cache_key, group)
+    return group
+
+
+def clear_user_partition_groups_cache():
+    """
+    Clears the groups of users memoized for the request, after a change of
+    the groups users are in.
+    """
+    RequestCache(USER_PARTITION_GROUPS_NAMESPACE).clear()
+
+
+def _get_group_from_scheme(course_key, user, user_partition, assign):
+    """
+    Returns the group of the user partition the user is in, as returned by the
+    partition's scheme.
+    """
+    # Not all the schemes accept the assign argument, so it's only passed to prevent assignments.
+    kwargs = {} if assign else {'assign': False}
+    return user_partition.scheme.get_group_for_user(course_key, user, user_partition, **kwargs)
+
+
 def _get_dynamic_partitions(course):
     """
     Return the dynamic user partitions for this course.
@@ -201,9 +271,7 @@ class PartitionService(object):
         If the user has not yet been assigned, a group will be chosen for them based upon
         the partition's scheme.
         """
-        return user_partition.scheme.get_group_for_user(
-            self._course_id, user, user_partition, assign=assign,
-        )
+        return get_user_group_for_partition(self._course_id, user, user_partition, assign=assign)
 
 
 def _get_partition_from_id(partitions, user_partition_id):
@@ -4,7 +4,10 @@ Test the partitions and partitions service
 """
 
 from datetime import datetime
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import override_settings
+from edx_django_utils.cache import RequestCache
 from mock import Mock, patch
 
 from opaque_keys.edx.locator import CourseLocator
@@ -14,7 +17,8 @@ from xmodule.partitions.partitions import (
     USER_PARTITION_SCHEME_NAMESPACE, ENROLLMENT_TRACK_PARTITION_ID
 )
 from xmodule.partitions.partitions_service import (
-    PartitionService, get_all_partitions_for_course, FEATURES
+    PartitionService, clear_user_partition_groups_cache, get_all_partitions_for_course, get_user_group_for_partition,
+    FEATURES
 )
 from openedx.features.content_type_gating.models import ContentTypeGatingConfig
 
@@ -553,6 +557,58 @@ class TestPartitionService(PartitionServiceBaseClass):
         self.assertEqual(group2, groups[1])
 
 
+class TestGetUserGroupForPartition(PartitionServiceBaseClass):
+    """
+    Test memoizing the groups users are in.
+    """
+    shard = 2
+
+    def setUp(self):
+        super(TestGetUserGroupForPartition, self).setUp()
+        RequestCache.clear_all_namespaces()
+        cache.clear()
+        self.addCleanup(RequestCache.clear_all_namespaces)
+        self.user = Mock(id=1, masquerade_settings={})
+        self.groups = self.user_partition.groups
+        self.user_partition.scheme.current_group = self.groups[0]
+
+    def get_group(self):
+        """
+        Returns the group of the test user, after switching the scheme to the second group.
+        """
+        group = get_user_group_for_partition(self.course.id, self.user, self.user_partition)
+        self.user_partition.scheme.current_group = self.groups[1]
+        return group
+
+    def test_memoized_per_request(self):
+        self.assertEqual(self.get_group(), self.groups[0])
+        self.assertEqual(self.get_group(), self.groups[0])
+        clear_user_partition_groups_cache()
+        self.assertEqual(self.get_group(), self.groups[1])
+
+    @override_settings(USER_PARTITION_GROUPS_CACHE_TIMEOUT=60)
+    def test_cached_across_requests(self):
+        self.assertEqual(self.get_group(), self.groups[0])
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(self.get_group(), self.groups[0])
+        cache.clear()
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(self.get_group(), self.groups[1])
+
+    @override_settings(USER_PARTITION_GROUPS_CACHE_TIMEOUT=60)
+    def test_no_group_cached_across_requests(self):
+        with patch.object(self.user_partition.scheme, 'get_group_for_user', return_value=None) as mock_get_group:
+            self.assertIsNone(self.get_group())
+            RequestCache.clear_all_namespaces()
+            self.assertIsNone(self.get_group())
+        self.assertEqual(mock_get_group.call_count, 1)
+
+    def test_not_memoized_when_masquerading(self):
+        self.user.masquerade_settings = {self.course.id: Mock()}
+        self.assertEqual(self.get_group(), self.groups[0])
+        self.assertEqual(self.get_group(), self.groups[1])
+
+
 class TestGetCourseUserPartitions(PartitionServiceBaseClass):
     """
     Test the helper method get_all_partitions_for_course.
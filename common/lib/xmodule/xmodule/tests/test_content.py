@@ -216,6 +216,31 @@ class ContentTest(unittest.TestCase):
 
         self.assertEqual(total_length, last_byte - first_byte + 1)
 
+    def test_static_content_stream_reads_whole_chunks(self):
+        """
+        Test that StaticContentStream reads GridFS files one chunk at a time, even within a range
+        that doesn't start or end on a chunk boundary.
+        """
+        item = FakeGridFsItem(SAMPLE_STRING)
+        item.chunk_size = 256
+        static_content_stream = StaticContentStream('loc', 'name', 'type', item, length=item.length)
+
+        chunks = list(static_content_stream.stream_data())
+        self.assertEqual(''.join(chunks), SAMPLE_STRING)
+        self.assertTrue(all(len(chunk) <= 256 for chunk in chunks))
+
+        chunks = list(static_content_stream.stream_data_in_range(100, 1500))
+        self.assertEqual(''.join(chunks), SAMPLE_STRING[100:1501])
+        self.assertEqual([len(chunk) for chunk in chunks[:2]], [156, 256])
+        self.assertEqual(len(chunks[-1]), 1501 % 256)
+
+    def test_static_content_stream_data_in_range(self):
+        """
+        Test that in-memory StaticContent can serve a range of its data
+        """
+        static_content = StaticContent('loc', 'name', 'type', SAMPLE_STRING)
+        self.assertEqual(''.join(static_content.stream_data_in_range(100, 1500)), SAMPLE_STRING[100:1501])
+
     def test_static_content_write_js(self):
         """
         Test that only one filename starts with 000.
@@ -67,6 +67,25 @@ class StubCompletionService(object):
         return {} if self._completion_value == 1.0 else blocks
 
 
+class StubConcurrentRenderService(object):
+    """
+    A stub implementation of the ConcurrentRenderService, rendering the blocks in reverse order
+    """
+
+    def __init__(self):
+        self.rendered_blocks = []
+
+    def render_blocks(self, view, blocks_and_contexts):
+        """
+        Render the blocks last to first, and return their fragments in order.
+        """
+        fragments = []
+        for block, context in reversed(blocks_and_contexts):
+            self.rendered_blocks.append(block)
+            fragments.insert(0, block.render(view, context))
+        return fragments
+
+
 class BaseVerticalBlockTest(XModuleXmlImportTest):
     """
     Tests for the BaseVerticalBlock.
@@ -170,6 +189,19 @@ class VerticalBlockTestCase(BaseVerticalBlockTest):
             else:
                 self.assertNotIn('wrap_xblock_data', mock_student_view.call_args[0][1])
 
+    def test_render_children_concurrently(self):
+        """
+        Test that children rendered by the concurrent render service keep their order.
+        """
+        concurrent_render_service = StubConcurrentRenderService()
+        self.module_system._services['bookmarks'] = Mock()
+        self.module_system._services['user'] = StubUserService()
+        self.module_system._services['concurrent_render'] = concurrent_render_service
+
+        html = self.module_system.render(self.vertical, STUDENT_VIEW, self.default_context).content
+        self.assertEqual(concurrent_render_service.rendered_blocks, [self.html2block, self.html1block])
+        self.assertLess(html.index(self.test_html_1), html.index(self.test_html_2))
+
     def test_render_studio_view(self):
         """
         Test the rendering of the Studio author view
@@ -28,7 +28,7 @@ CLASS_PRIORITY = ['video', 'problem']
 
 
 @XBlock.needs('user', 'bookmarks')
-@XBlock.wants('completion')
+@XBlock.wants('completion', 'concurrent_render')
 class VerticalBlock(SequenceFields, XModuleFields, StudioEditableBlock, XmlParserMixin, MakoTemplateBlockBase, XBlock):
     """
     Layout XBlock for rendering subblocks vertically.
@@ -76,13 +76,26 @@ class VerticalBlock(SequenceFields, XModuleFields, StudioEditableBlock, XmlParse
         is_child_of_vertical = context.get('child_of_vertical', False)
 
         # pylint: disable=no-member
+        children_and_contexts = []
         for child in child_blocks:
             child_block_context = copy(child_context)
             if child in child_blocks_to_complete_on_view:
                 child_block_context['wrap_xblock_data'] = {
                     'mark-completed-on-view-after-delay': complete_on_view_delay
                 }
-            rendered_child = child.render(view, child_block_context)
+            children_and_contexts.append((child, child_block_context))
+
+        # When the runtime offers it, the children are rendered concurrently, and
+        # the fragments are returned in the children's order.
+        concurrent_render_service = self.runtime.service(self, 'concurrent_render')
+        if concurrent_render_service and len(children_and_contexts) > 1:
+            rendered_children = concurrent_render_service.render_blocks(view, children_and_contexts)
+        else:
+            rendered_children = [
+                child.render(view, child_block_context) for child, child_block_context in children_and_contexts
+            ]
+
+        for (child, __), rendered_child in zip(children_and_contexts, rendered_children):
             fragment.add_fragment_resources(rendered_child)
 
             contents.append({
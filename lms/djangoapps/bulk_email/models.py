@@ -15,6 +15,7 @@ from enrollment.api import validate_course_mode
 from enrollment.errors import CourseModeNotFoundError
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_by_name
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.html_to_text import html_to_text
 from openedx.core.lib.mail_utils import wrap_message
 from student.roles import CourseInstructorRole, CourseStaffRole
@@ -417,11 +418,25 @@ class CourseAuthorization(models.Model):
     # Whether or not to enable instructor email
     email_enabled = models.BooleanField(default=False)
 
+    _CACHE_NAMESPACE = u'bulk_email.models.CourseAuthorization'
+
+    @classmethod
+    def prefetch(cls, course_ids):
+        """
+        Prefetches whether or not email is enabled for the given course ids.
+        """
+        prefetched = get_cache(cls._CACHE_NAMESPACE)
+        prefetched.update({course_id: False for course_id in course_ids})
+        prefetched.update(cls.objects.filter(course_id__in=course_ids).values_list('course_id', 'email_enabled'))
+
     @classmethod
     def instructor_email_enabled(cls, course_id):
         """
         Returns whether or not email is enabled for the given course id.
         """
+        prefetched = get_cache(cls._CACHE_NAMESPACE)
+        if course_id in prefetched:
+            return prefetched[course_id]
         try:
             record = cls.objects.get(course_id=course_id)
             return record.email_enabled
@@ -20,7 +20,7 @@ from rest_framework.response import Response
 
 from courseware import courses
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
-from lms.djangoapps.ccx.overrides import override_field_for_ccx
+from lms.djangoapps.ccx.overrides import CCX_OVERRIDES_CACHE, override_field_for_ccx
 from lms.djangoapps.ccx.utils import (
     add_master_course_staff_to_ccx,
     assign_staff_role_to_ccx,
@@ -667,6 +667,7 @@ class CCXDetailView(GenericAPIView):
         # clean everything up with a single transaction
         with transaction.atomic():
             CcxFieldOverride.objects.filter(ccx=ccx_course_object).delete()
+            CCX_OVERRIDES_CACHE.invalidate(ccx_course_object.id)
             # remove all users enrolled in the CCX from the CourseEnrollment model
             CourseEnrollment.objects.filter(course_id=ccx_course_key).delete()
             ccx_course_overview.delete()
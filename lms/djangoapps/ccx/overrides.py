@@ -4,17 +4,21 @@ by the individual custom courses feature.
 """
 import json
 import logging
+from copy import deepcopy
 
 from ccx_keys.locator import CCXBlockUsageLocator, CCXLocator
 from django.db import transaction
 from opaque_keys.edx.keys import CourseKey, UsageKey
 
-from openedx.core.lib.cache_utils import get_cache
-from lms.djangoapps.courseware.field_overrides import FieldOverrideProvider
+from openedx.core.lib.cache_utils import VersionedProcessCache, get_cache
+from lms.djangoapps.courseware.field_overrides import FieldOverrideProvider, clear_inherited_overrides
 from lms.djangoapps.ccx.models import CcxFieldOverride, CustomCourseForEdX
 
 log = logging.getLogger(__name__)
 
+# Overrides of the CCXs, by CCX id, shared by the requests of the process.
+CCX_OVERRIDES_CACHE = VersionedProcessCache(u'ccx.overrides', maxsize=1000)
+
 
 class CustomCoursesForEdxOverrideProvider(FieldOverrideProvider):
     """
@@ -117,26 +121,46 @@ def _clean_ccx_key(block_location):
 
 def _get_overrides_for_ccx(ccx):
     """
-    Returns a dictionary mapping field name to overriden value for any
-    overrides set on this block for this CCX.
+    Returns a dictionary mapping the locations of the blocks overridden for
+    this CCX to dictionaries of their overridden field values, along with the
+    ids of the overrides.
+
+    The overrides are loaded once per process and version of the CCX's
+    overrides, and copied for each request, which can modify its copy.
     """
     overrides_cache = get_cache('ccx-overrides')
 
     if ccx not in overrides_cache:
-        overrides = {}
-        query = CcxFieldOverride.objects.filter(
-            ccx=ccx,
-        )
+        overrides_cache[ccx] = deepcopy(CCX_OVERRIDES_CACHE.get_or_set(ccx.id, lambda: _load_overrides_for_ccx(ccx)))
 
-        for override in query:
-            block_overrides = overrides.setdefault(override.location, {})
-            block_overrides[override.field] = json.loads(override.value)
-            block_overrides[override.field + "_id"] = override.id
-            block_overrides[override.field + "_instance"] = override
+    return overrides_cache[ccx]
 
-        overrides_cache[ccx] = overrides
 
-    return overrides_cache[ccx]
+def _load_overrides_for_ccx(ccx):
+    """
+    Loads the overrides of this CCX, as returned by `_get_overrides_for_ccx`.
+    """
+    overrides = {}
+    query = CcxFieldOverride.objects.filter(
+        ccx=ccx,
+    ).values_list('location', 'field', 'value', 'id')
+
+    for location, field, value, override_id in query:
+        block_overrides = overrides.setdefault(location, {})
+        block_overrides[field] = json.loads(value)
+        block_overrides[field + "_id"] = override_id
+
+    return overrides
+
+
+def _overrides_changed_for_ccx(ccx):
+    """
+    Makes all processes reload the overrides of this CCX, now and once the
+    current transaction commits.
+    """
+    CCX_OVERRIDES_CACHE.invalidate(ccx.id)
+    transaction.on_commit(lambda: CCX_OVERRIDES_CACHE.invalidate(ccx.id))
+    clear_inherited_overrides()
 
 
 @transaction.atomic
@@ -149,31 +173,27 @@ def override_field_for_ccx(ccx, block, name, value):
     field = block.fields[name]
     value_json = field.to_json(value)
     serialized_value = json.dumps(value_json)
-    override_has_changes = False
-    clean_ccx_key = _clean_ccx_key(block.location)
-
-    override = get_override_for_ccx(ccx, block, name + "_instance")
-    if override:
-        override_has_changes = serialized_value != override.value
+    block_overrides = _get_overrides_for_ccx(ccx).setdefault(_clean_ccx_key(block.location), {})
 
-    if not override:
+    override_id = block_overrides.get(name + "_id")
+    if override_id is None:
         override, created = CcxFieldOverride.objects.get_or_create(
             ccx=ccx,
             location=block.location,
             field=name,
             defaults={'value': serialized_value},
         )
-        if created:
-            _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_id"] = override.id
-        else:
-            override_has_changes = serialized_value != override.value
+        override_id = override.id
+        override_has_changes = not created and serialized_value != override.value
+    else:
+        override_has_changes = json.loads(serialized_value) != block_overrides.get(name)
 
     if override_has_changes:
-        override.value = serialized_value
-        override.save()
+        CcxFieldOverride.objects.filter(id=override_id).update(value=serialized_value)
 
-    _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name] = value_json
-    _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})[name + "_instance"] = override
+    block_overrides[name] = json.loads(serialized_value)
+    block_overrides[name + "_id"] = override_id
+    _overrides_changed_for_ccx(ccx)
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -204,9 +224,9 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):
         ccx_override_map = _get_overrides_for_ccx(ccx).setdefault(clean_ccx_key, {})
         ccx_override_map.pop(name)
         ccx_override_map.pop(name + "_id")
-        ccx_override_map.pop(name + "_instance")
     except KeyError:
         pass
+    _overrides_changed_for_ccx(ccx)
 
 
 def bulk_delete_ccx_override_fields(ccx, ids):
@@ -217,3 +237,4 @@ def bulk_delete_ccx_override_fields(ccx, ids):
     ids = list(set(ids))
     if ids:
         CcxFieldOverride.objects.filter(ccx=ccx, id__in=ids).delete()
+        _overrides_changed_for_ccx(ccx)
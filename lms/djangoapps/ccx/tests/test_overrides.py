@@ -14,7 +14,7 @@ from courseware.courses import get_course_by_id
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from courseware.testutils import FieldOverrideTestMixin
 from lms.djangoapps.ccx.models import CustomCourseForEdX
-from lms.djangoapps.ccx.overrides import override_field_for_ccx
+from lms.djangoapps.ccx.overrides import CCX_OVERRIDES_CACHE, get_override_for_ccx, override_field_for_ccx
 from lms.djangoapps.ccx.tests.utils import flatten, iter_blocks
 from lms.djangoapps.courseware.tests.test_field_overrides import inject_field_overrides
 from student.tests.factories import AdminFactory
@@ -147,6 +147,30 @@ class TestFieldOverrides(FieldOverrideTestMixin, SharedModuleStoreTestCase):
         with self.assertNumQueries(6):
             override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
 
+    def test_overrides_cached_across_requests(self):
+        """
+        Test that the overrides are loaded once per process, until they change.
+        """
+        ccx_start = datetime.datetime(2014, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        new_ccx_start = datetime.datetime(2015, 12, 25, 00, 00, tzinfo=pytz.UTC)
+        chapter = self.ccx_course.get_children()[0]
+        override_field_for_ccx(self.ccx, chapter, 'start', ccx_start)
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), ccx_start)
+
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), ccx_start)
+
+        override_field_for_ccx(self.ccx, chapter, 'start', new_ccx_start)
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), new_ccx_start)
+
+        CCX_OVERRIDES_CACHE.invalidate(self.ccx.id)
+        RequestCache.clear_all_namespaces()
+        with self.assertNumQueries(1):
+            self.assertEqual(get_override_for_ccx(self.ccx, chapter, 'start'), new_ccx_start)
+
     def test_override_is_inherited(self):
         """
         Test that sequentials inherit overridden start date from chapter.
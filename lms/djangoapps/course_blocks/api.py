@@ -4,9 +4,15 @@ get_course_blocks function.
 """
 from django.conf import settings
 
+from lms.djangoapps.courseware.access import has_access
+from lms.djangoapps.courseware.access_utils import in_preview_mode
+from lms.djangoapps.courseware.field_overrides import resolve_dotted
+from lms.djangoapps.courseware.masquerade import get_course_masquerade
 from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
 from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
 from openedx.features.content_type_gating.block_transformers import ContentTypeGateTransformer
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from .transformers import (
     library_content,
@@ -21,6 +27,13 @@ INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER = (
     'lms.djangoapps.courseware.student_field_overrides.IndividualStudentOverrideProvider'
 )
 
+# Field override providers whose overrides are applied by the transformers
+# get_accessible_usage_keys checks access with.
+ACCESS_TRANSFORMED_OVERRIDE_PROVIDERS = (
+    INDIVIDUAL_STUDENT_OVERRIDE_PROVIDER,
+    'openedx.features.content_type_gating.field_override.ContentTypeGatingFieldOverride',
+)
+
 
 def has_individual_student_override_provider():
     """
@@ -99,3 +112,86 @@ def get_course_blocks(
         starting_block_usage_key,
         collected_block_structure,
     )
+
+
+def get_accessible_usage_keys(user, action, course, usage_keys):
+    """
+    Returns the set of the given usage keys of blocks in the course on which
+    the user can perform the action, as has_access would grant it, checked
+    for all the blocks at once against the course's block structure.
+
+    Blocks missing from the block structure, such as orphans or blocks added
+    since it was collected, are checked one by one with has_access. Returns
+    None if the block structure doesn't reflect the user's access,
+    i.e. when the user is masquerading, in preview mode, or when field
+    overrides are enabled for the course, in which case callers should check
+    the blocks one by one with has_access.
+
+    Arguments:
+        user (django.contrib.auth.models.User) - User whose access is
+            checked.
+
+        action (str) - One of the actions has_access checks on blocks:
+            'load', 'staff' or 'instructor'.
+
+        course (CourseDescriptor) - Course of the blocks.
+
+        usage_keys (iterable of UsageKey) - Keys of the blocks to check.
+    """
+    usage_keys = set(usage_keys)
+    if action in ('staff', 'instructor'):
+        return usage_keys if has_access(user, action, course.id) else set()
+    if action != 'load':
+        raise ValueError(u"Unknown action for blocks: '{}'".format(action))
+
+    if get_course_masquerade(user, course.id) or in_preview_mode() or _has_field_overrides(course):
+        return None
+
+    access_transformers = []
+    if has_individual_student_override_provider():
+        # Applied first, so that the overridden dates are the ones checked.
+        access_transformers.append(load_override_data.OverrideDataTransformer(user))
+    access_transformers += [
+        start_date.StartDateTransformer(),
+        ContentTypeGateTransformer(),
+        user_partitions.UserPartitionTransformer(),
+        visibility.VisibilityTransformer(),
+    ]
+    collected_block_structure = get_block_structure_manager(course.id).get_collected()
+    block_structure = get_course_blocks(
+        user,
+        collected_block_structure.root_block_usage_key,
+        BlockStructureTransformers(access_transformers),
+        collected_block_structure,
+    )
+    return {
+        usage_key for usage_key in usage_keys
+        if usage_key in block_structure or (
+            usage_key not in collected_block_structure and _has_access_to_block(user, usage_key, course.id)
+        )
+    }
+
+
+def _has_access_to_block(user, usage_key, course_key):
+    """
+    Returns whether the user can load the block, which is read from the
+    modulestore.
+    """
+    try:
+        block = modulestore().get_item(usage_key)
+    except ItemNotFoundError:
+        return False
+    return bool(has_access(user, 'load', block, course_key))
+
+
+def _has_field_overrides(course):
+    """
+    Returns whether field overrides which the access transformers don't apply
+    are enabled for the course.
+    """
+    provider_names = tuple(settings.FIELD_OVERRIDE_PROVIDERS) + tuple(settings.MODULESTORE_FIELD_OVERRIDE_PROVIDERS)
+    return any(
+        resolve_dotted(name).enabled_for(course)
+        for name in provider_names
+        if name not in ACCESS_TRANSFORMED_OVERRIDE_PROVIDERS
+    )
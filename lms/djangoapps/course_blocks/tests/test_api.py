@@ -0,0 +1,64 @@
+"""
+Tests for the course_blocks API.
+"""
+from datetime import timedelta
+
+from django.utils.timezone import now
+from mock import patch
+
+from lms.djangoapps.course_blocks import api
+from lms.djangoapps.course_blocks.api import get_accessible_usage_keys
+from student.tests.factories import AdminFactory, UserFactory
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class GetAccessibleUsageKeysTestCase(ModuleStoreTestCase):
+    """
+    Tests for get_accessible_usage_keys.
+    """
+    shard = 3
+
+    def setUp(self):
+        super(GetAccessibleUsageKeysTestCase, self).setUp()
+        self.course = CourseFactory.create(start=now() - timedelta(days=30))
+        self.released = ItemFactory.create(parent=self.course, category='chapter')
+        self.unreleased = ItemFactory.create(parent=self.course, category='chapter', start=now() + timedelta(days=30))
+        self.staff_only = ItemFactory.create(parent=self.course, category='chapter', visible_to_staff_only=True)
+        self.discussion = ItemFactory.create(parent=self.released, category='discussion')
+        self.usage_keys = {
+            self.released.location, self.unreleased.location, self.staff_only.location, self.discussion.location
+        }
+        self.student = UserFactory.create()
+        self.staff = AdminFactory.create()
+
+    def test_load(self):
+        self.assertEqual(
+            get_accessible_usage_keys(self.student, 'load', self.course, self.usage_keys),
+            {self.released.location, self.discussion.location},
+        )
+        self.assertEqual(get_accessible_usage_keys(self.staff, 'load', self.course, self.usage_keys), self.usage_keys)
+
+    def test_staff(self):
+        self.assertEqual(get_accessible_usage_keys(self.student, 'staff', self.course, self.usage_keys), set())
+        self.assertEqual(get_accessible_usage_keys(self.staff, 'staff', self.course, self.usage_keys), self.usage_keys)
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            get_accessible_usage_keys(self.student, 'see_exists', self.course, self.usage_keys)
+
+    def test_blocks_missing_from_block_structure(self):
+        with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+            orphan = self.store.create_item(
+                self.user.id, self.course.id, 'discussion', 'orphan', fields={'start': self.course.start}
+            )
+            self.store.publish(orphan.location, self.user.id)
+        self.assertEqual(
+            get_accessible_usage_keys(self.student, 'load', self.course, [self.discussion.location, orphan.location]),
+            {self.discussion.location, orphan.location},
+        )
+
+    def test_field_overrides(self):
+        with patch.object(api, '_has_field_overrides', return_value=True):
+            self.assertIsNone(get_accessible_usage_keys(self.student, 'load', self.course, self.usage_keys))
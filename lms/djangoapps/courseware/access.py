@@ -66,6 +66,7 @@ from util.milestones_helpers import (
 from xmodule.course_module import CATALOG_VISIBILITY_ABOUT, CATALOG_VISIBILITY_CATALOG_AND_ABOUT, CourseDescriptor
 from xmodule.error_module import ErrorDescriptor
 from xmodule.partitions.partitions import NoSuchUserPartitionError, NoSuchUserPartitionGroupError
+from xmodule.partitions.partitions_service import get_user_group_for_partition
 from xmodule.x_module import XModule
 
 log = logging.getLogger(__name__)
@@ -506,11 +507,7 @@ def _has_group_access(descriptor, user, course_key):
     # If missing_groups is NOT empty, we generate an error based on one of the particular groups they are missing.
     missing_groups = []
     for partition, groups in partition_groups:
-        user_group = partition.scheme.get_group_for_user(
-            course_key,
-            user,
-            partition,
-        )
+        user_group = get_user_group_for_partition(course_key, user, partition)
         if user_group not in groups:
             missing_groups.append((partition, user_group, groups))
 
@@ -19,7 +19,7 @@ from abc import ABCMeta, abstractmethod
 from contextlib import contextmanager
 
 from django.conf import settings
-from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, RequestCache
 from xblock.field_data import FieldData
 
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -27,6 +27,7 @@ from xmodule.modulestore.inheritance import InheritanceMixin
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+INHERITED_OVERRIDES_NAMESPACE = u'courseware.field_overrides.inherited_overrides'
 
 
 def resolve_dotted(name):
@@ -48,17 +49,6 @@ def resolve_dotted(name):
     return target
 
 
-def _lineage(block):
-    """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
-    """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
-
-
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -89,6 +79,14 @@ def overrides_disabled():
     return bool(_OVERRIDES_DISABLED.disabled)
 
 
+def clear_inherited_overrides():
+    """
+    Clears the inherited overrides resolved during the current request. To be
+    called whenever field overrides are set or cleared.
+    """
+    RequestCache(INHERITED_OVERRIDES_NAMESPACE).clear()
+
+
 class FieldOverrideProvider(object):
     """
     Abstract class which defines the interface that a `FieldOverrideProvider`
@@ -198,6 +196,9 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user, fallback) for provider in providers)
+        self._inherited_overrides_key = (
+            type(self).__name__, getattr(user, 'id', None), tuple(provider.__name__ for provider in providers)
+        )
 
     def get_override(self, block, name):
         """
@@ -211,6 +212,36 @@ class OverrideFieldData(FieldData):
                     return value
         return NOTSET
 
+    def _get_descendant_override(self, block, name):
+        """
+        Returns the override of the inheritable field `name` which `block`'s
+        descendants inherit, i.e. the override of `block`, or else the override
+        it inherits, or `NOTSET` if there isn't any.
+
+        The overrides of the blocks of a request are resolved once, top-down,
+        and shared by the field data of all the blocks of the same user.
+        """
+        inherited_overrides = RequestCache(INHERITED_OVERRIDES_NAMESPACE).data.setdefault(
+            self._inherited_overrides_key, {}
+        )
+        key = (block.scope_ids.usage_id, name)
+        if key not in inherited_overrides:
+            value = self.get_override(block, name)
+            if value is NOTSET:
+                value = self._get_inherited_override(block, name)
+            inherited_overrides[key] = value
+        return inherited_overrides[key]
+
+    def _get_inherited_override(self, block, name):
+        """
+        Returns the override of the inheritable field `name` which `block`
+        inherits from its ancestors, or `NOTSET` if there isn't any.
+        """
+        parent = block.get_parent()
+        if parent is None:
+            return NOTSET
+        return self._get_descendant_override(parent, name)
+
     def get(self, block, name):
         value = self.get_override(block, name)
         if value is not NOTSET:
@@ -233,10 +264,9 @@ class OverrideFieldData(FieldData):
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
             inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in inheritable and not overrides_disabled():
+                if self._get_inherited_override(block, name) is not NOTSET:
+                    return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -249,10 +279,9 @@ class OverrideFieldData(FieldData):
         if self.providers and not overrides_disabled():
             inheritable = InheritanceMixin.fields.keys()
             if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+                value = self._get_inherited_override(block, name)
+                if value is not NOTSET:
+                    return value
         return self.fallback.default(block, name)
 
 
@@ -0,0 +1,113 @@
+"""
+Rewrites the states of StudentModules in batches, compressing them, or with --decompress, restoring them to plain
+JSON. Rows are rewritten without changing their modified dates, and without adding history entries. Rows whose
+states are written by learners while they're being rewritten are left as the learners wrote them.
+"""
+from __future__ import print_function
+
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Q, TextField, Value
+from django.db.models.functions import Substr
+
+from courseware.models import COMPRESSED_STATE_PREFIX, StudentModule, decode_state, encode_state
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_SLEEP_TIME_SECS = 1
+
+
+class Command(BaseCommand):
+    """
+    Implementation of the compress_student_module_state command
+    """
+    help = 'Compress the states of StudentModules, or restore them to plain JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--decompress',
+                            action='store_true',
+                            help='Restore compressed states to plain JSON.')
+        parser.add_argument('--start_id',
+                            type=int,
+                            default=1,
+                            help='ID to begin from, in case a run needs to be restarted from the middle.')
+        parser.add_argument('--chunk_size',
+                            type=int,
+                            default=DEFAULT_CHUNK_SIZE,
+                            help='Number of StudentModules read per batch.')
+        parser.add_argument('--sleep_time_secs',
+                            type=float,
+                            default=DEFAULT_SLEEP_TIME_SECS,
+                            help='Number of seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        """
+        Execute the command.
+        """
+        decompress = options['decompress']
+        chunk_size = options['chunk_size']
+        sleep_time_secs = options['sleep_time_secs']
+        start = options['start_id']
+        end = start + chunk_size
+
+        max_id = StudentModule.objects.all().aggregate(Max('id'))['id__max'] or 0
+
+        print('{} StudentModule states. Start id is {}, current max id is {}. Chunk size is of {}'.format(
+            'Decompressing' if decompress else 'Compressing', start, max_id, chunk_size
+        ))
+
+        updated_count = 0
+
+        while True:
+            # On the last time through catch any new rows added since this run began
+            if end >= max_id:
+                print('Last round, includes all new rows added since this run started.')
+                id_query = Q(id__gte=start)
+            else:
+                id_query = Q(id__gte=start) & Q(id__lt=end)
+
+            curr = self._rewrite_states(id_query, decompress)
+            updated_count += curr
+
+            print('Updated rows {} to {}, {} rows affected'.format(start, end - 1, curr))
+
+            if end >= max_id:
+                break
+
+            start = end
+            end += chunk_size
+            sleep(sleep_time_secs)
+
+        print('Finished! Updated {} total StudentModule states'.format(updated_count))
+
+    def _rewrite_states(self, id_query, decompress):
+        """
+        Rewrites the states of the StudentModules matching `id_query` that aren't stored the requested way yet.
+        Returns the number of rows updated.
+        """
+        # The prefix and the stored value are read as plain text, so that stored values
+        # can be told apart from the decoded states the state field returns.
+        student_modules = StudentModule.objects.filter(id_query, state__isnull=False).annotate(
+            state_prefix=Substr('state', 1, len(COMPRESSED_STATE_PREFIX), output_field=TextField()),
+            stored_state=Substr('state', 1, output_field=TextField()),
+        )
+        if decompress:
+            student_modules = student_modules.filter(state_prefix=COMPRESSED_STATE_PREFIX)
+        else:
+            student_modules = student_modules.exclude(state_prefix=COMPRESSED_STATE_PREFIX)
+
+        updated_count = 0
+        for student_module_id, stored_state in student_modules.values_list('id', 'stored_state'):
+            stored_value = decode_state(stored_state) if decompress else encode_state(stored_state)
+            if stored_value == stored_state:
+                # This state is too short to be worth compressing.
+                continue
+            # The values are wrapped in expressions so that they're compared and written as is,
+            # whatever the COMPRESS_STUDENT_MODULE_STATE setting. Rows whose stored value changed
+            # since it was read were written by learners in the meantime, and aren't updated.
+            updated_count += StudentModule.objects.filter(
+                id=student_module_id, state=Value(stored_state, output_field=TextField())
+            ).update(
+                state=Value(stored_value, output_field=TextField())
+            )
+        return updated_count
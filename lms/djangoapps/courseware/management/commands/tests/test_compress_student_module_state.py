@@ -0,0 +1,96 @@
+"""
+Tests for the compress_student_module_state management command and the compressed StudentModule states.
+"""
+import json
+
+from django.core.management import call_command
+from django.db.models import TextField
+from django.db.models.functions import Substr
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from courseware.models import COMPRESSED_STATE_PREFIX, StudentModule, encode_state
+from courseware.tests.factories import StudentModuleFactory
+from openedx.core.lib.tests import attr
+
+LONG_STATE = json.dumps({'student_answers': {'answer_{}'.format(index): 'choice_1' for index in range(100)}})
+SHORT_STATE = json.dumps({'position': 1})
+
+
+@attr(shard=1)
+class CompressStudentModuleStateTest(TestCase):
+    """
+    Tests for compressing StudentModule states.
+    """
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(CompressStudentModuleStateTest, self).setUp()
+        course_key = CourseLocator('edX', 'compression', 'run')
+        self.long_state_module = StudentModuleFactory(
+            course_id=course_key, module_state_key=course_key.make_usage_key('problem', 'long'), state=LONG_STATE
+        )
+        self.short_state_module = StudentModuleFactory(
+            course_id=course_key, module_state_key=course_key.make_usage_key('problem', 'short'), state=SHORT_STATE
+        )
+
+    def stored_values(self):
+        """
+        Returns the states as stored in the database, by StudentModule id.
+        """
+        return dict(StudentModule.objects.annotate(
+            stored_state=Substr('state', 1, output_field=TextField())
+        ).values_list('id', 'stored_state'))
+
+    def assert_states(self):
+        """
+        Asserts that the states read are the states written, whichever way they're stored.
+        """
+        self.assertEqual(StudentModule.objects.get(id=self.long_state_module.id).state, LONG_STATE)
+        self.assertEqual(StudentModule.objects.get(id=self.short_state_module.id).state, SHORT_STATE)
+
+    def test_plain_by_default(self):
+        self.assertEqual(self.stored_values()[self.long_state_module.id], LONG_STATE)
+        self.assert_states()
+
+    @override_settings(COMPRESS_STUDENT_MODULE_STATE=True)
+    def test_compressed_when_saved(self):
+        self.long_state_module.save()
+        self.short_state_module.save()
+        stored_values = self.stored_values()
+        self.assertTrue(stored_values[self.long_state_module.id].startswith(COMPRESSED_STATE_PREFIX))
+        self.assertLess(len(stored_values[self.long_state_module.id]), len(LONG_STATE))
+        self.assertEqual(stored_values[self.short_state_module.id], SHORT_STATE)
+        self.assert_states()
+
+    def test_compress_and_decompress(self):
+        modified = StudentModule.objects.get(id=self.long_state_module.id).modified
+        call_command('compress_student_module_state', chunk_size=1, sleep_time_secs=0)
+        self.assertTrue(self.stored_values()[self.long_state_module.id].startswith(COMPRESSED_STATE_PREFIX))
+        self.assertEqual(self.stored_values()[self.short_state_module.id], SHORT_STATE)
+        self.assertEqual(StudentModule.objects.get(id=self.long_state_module.id).modified, modified)
+        self.assert_states()
+
+        call_command('compress_student_module_state', decompress=True, sleep_time_secs=0)
+        self.assertEqual(self.stored_values()[self.long_state_module.id], LONG_STATE)
+        self.assert_states()
+
+    def test_concurrent_write_kept(self):
+        learner_state = json.dumps({'position': 2})
+
+        def write_then_encode(state):
+            """
+            Writes the state of the learner while the command compresses the one it read.
+            """
+            StudentModule.objects.filter(id=self.long_state_module.id).update(state=learner_state)
+            return encode_state(state)
+
+        with patch(
+            'courseware.management.commands.compress_student_module_state.encode_state',
+            side_effect=write_then_encode,
+        ):
+            call_command('compress_student_module_state', sleep_time_secs=0)
+        self.assertEqual(self.stored_values()[self.long_state_module.id], learner_state)
@@ -7,14 +7,17 @@ Classes to provide the LMS runtime data storage to XBlocks.
 
 
 :class:`FieldDataCache`: A object which provides a read-through prefetch cache
-    of data to support XBlock fields within a limited set of scopes.
+    of data to support XBlock fields within a limited set of scopes. The data is
+    either prefetched when blocks are added to the cache, or lazily loaded, one
+    scope and one group of sibling blocks at a time, when it's first accessed.
 
 The remaining classes in this module provide read-through prefetch cache implementations
 for specific scopes. The individual classes provide the knowledge of what are the essential
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
 entries.
 
-UserStateCache: A cache for Scope.user_state
+UserStateCache: A cache for Scope.user_state, whose writes can be buffered with
+    :func:`buffered_user_state_writes`
 UserStateSummaryCache: A cache for Scope.user_state_summary
 PreferencesCache: A cache for Scope.preferences
 UserInfoCache: A cache for Scope.user_info
@@ -23,11 +26,16 @@ DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 
 import json
 import logging
+import threading
 from abc import ABCMeta, abstractmethod
 from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from functools import wraps
 
 from contracts import contract, new_contract
+from django.conf import settings
 from django.db import DatabaseError, IntegrityError, transaction
+from edx_django_utils.cache import RequestCache
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import CourseKey
@@ -51,6 +59,38 @@ class InvalidWriteError(Exception):
     """
 
 
+# Namespace of the request cache keeping track of the buffered user state writes.
+USER_STATE_WRITE_BUFFER_NAMESPACE = 'courseware.model_data.user_state_write_buffer'
+
+
+@contextmanager
+def buffered_user_state_writes():
+    """
+    Buffers the Scope.user_state fields set through any :class:`UserStateCache`
+    within the context, merging them per user and block, and writes them when
+    the outermost context exits. Reading when a buffered field was last modified
+    writes the buffered fields of its block first.
+    """
+    buffer_state = RequestCache(USER_STATE_WRITE_BUFFER_NAMESPACE).data
+    buffer_state['depth'] = buffer_state.get('depth', 0) + 1
+    buffer_state.setdefault('caches', [])
+    try:
+        yield
+    finally:
+        buffer_state['depth'] -= 1
+        if buffer_state['depth'] == 0:
+            caches = buffer_state.pop('caches')
+            for user_state_cache in caches:
+                user_state_cache.flush()
+
+
+def _user_state_writes_buffered():
+    """
+    Returns whether writes of Scope.user_state fields are currently buffered.
+    """
+    return RequestCache(USER_STATE_WRITE_BUFFER_NAMESPACE).data.get('depth', 0) > 0
+
+
 def _all_usage_keys(descriptors, aside_types):
     """
     Return a set of all usage_ids for the `descriptors` and for
@@ -347,6 +387,7 @@ class UserStateCache(object):
     """
     def __init__(self, user, course_id):
         self._cache = defaultdict(dict)
+        self._pending_updates = defaultdict(dict)
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
@@ -389,6 +430,8 @@ class UserStateCache(object):
 
         Returns: datetime if there was a modified date, or None otherwise
         """
+        if kvs_key.block_scope_id in self._pending_updates:
+            self.flush()
         try:
             return self._client.get(
                 self.user.username,
@@ -413,6 +456,14 @@ class UserStateCache(object):
 
             pending_updates[cache_key][kvs_key.field_name] = value
 
+        if _user_state_writes_buffered():
+            if not self._pending_updates:
+                RequestCache(USER_STATE_WRITE_BUFFER_NAMESPACE).data['caches'].append(self)
+            for cache_key, field_state in pending_updates.items():
+                self._pending_updates[cache_key].update(field_state)
+                self._cache[cache_key].update(field_state)
+            return
+
         try:
             self._client.set_many(
                 self.user.username,
@@ -424,6 +475,23 @@ class UserStateCache(object):
         finally:
             self._cache.update(pending_updates)
 
+    def flush(self):
+        """
+        Write the fields buffered by :func:`buffered_user_state_writes`, all
+        blocks at once.
+        """
+        if not self._pending_updates:
+            return
+        pending_updates, self._pending_updates = self._pending_updates, defaultdict(dict)
+        try:
+            self._client.set_many(
+                self.user.username,
+                pending_updates
+            )
+        except DatabaseError:
+            log.exception(u"Saving user state failed for %s", self.user.username)
+            raise KeyValueMultiSaveError([])
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def get(self, kvs_key):
         """
@@ -460,6 +528,8 @@ class UserStateCache(object):
         if kvs_key.field_name not in field_state:
             raise KeyError(kvs_key.field_name)
 
+        if cache_key in self._pending_updates:
+            self.flush()
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
 
@@ -677,12 +747,37 @@ class UserInfoCache(DjangoOrmFieldCache):
         return key.field_name
 
 
+def _synchronized(method):
+    """
+    Serializes the calls of `method` on a FieldDataCache, so that the blocks of
+    a request rendered concurrently can share it.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):  # pylint: disable=missing-docstring
+        with self._lock:  # pylint: disable=protected-access
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _LazyDescriptorGroup(object):
+    """
+    A group of descriptors added to a lazy FieldDataCache together, whose field data
+    is loaded together, one scope at a time, when it's first accessed for any of them.
+    """
+    def __init__(self, descriptors):
+        self.descriptors = descriptors
+        self.loaded_scopes = set()
+
+
 class FieldDataCache(object):
     """
     A cache of django model objects needed to supply the data
     for a module and its descendants
     """
-    def __init__(self, descriptors, course_id, user, asides=None, read_only=False):
+    # Scopes whose field data is stored per block usage, rather than per block type or per user.
+    _usage_scopes = (Scope.user_state, Scope.user_state_summary)
+
+    def __init__(self, descriptors, course_id, user, asides=None, read_only=False, eager=None):
         """
         Find any courseware.models objects that are needed by any descriptor
         in descriptors. Attempts to minimize the number of queries to the database.
@@ -695,6 +790,8 @@ class FieldDataCache(object):
         user: The user for which to cache data
         asides: The list of aside types to load, or None to prefetch no asides.
         read_only: We should not perform writes (they become a no-op).
+        eager: Whether to prefetch the field data of descriptors as they're added to the cache,
+            rather than loading it on first access. Defaults to settings.FIELD_DATA_CACHE_EAGER_LOADING.
         """
         if asides is None:
             self.asides = []
@@ -705,6 +802,13 @@ class FieldDataCache(object):
         self.course_id = course_id
         self.user = user
         self.read_only = read_only
+        self.eager = getattr(settings, 'FIELD_DATA_CACHE_EAGER_LOADING', False) if eager is None else eager
+        self._lock = threading.RLock()
+
+        # Groups of descriptors whose field data is yet to be loaded, and the same groups by the
+        # usage keys of their descriptors and asides.
+        self._lazy_groups = []
+        self._lazy_groups_by_usage_key = {}
 
         self.cache = {
             Scope.user_state: UserStateCache(
@@ -724,17 +828,53 @@ class FieldDataCache(object):
         self.scorable_locations = set()
         self.add_descriptors_to_cache(descriptors)
 
+    @_synchronized
     def add_descriptors_to_cache(self, descriptors):
         """
         Add all `descriptors` to this FieldDataCache.
         """
         if self.user.is_authenticated:
             self.scorable_locations.update(desc.location for desc in descriptors if desc.has_score)
-            for scope, fields in self._fields_to_cache(descriptors).items():
-                if scope not in self.cache:
-                    continue
+            if self.eager:
+                self._cache_fields(descriptors)
+            else:
+                group = _LazyDescriptorGroup(descriptors)
+                self._lazy_groups.append(group)
+                for usage_key in _all_usage_keys(descriptors, self.asides):
+                    self._lazy_groups_by_usage_key[usage_key] = group
+
+    def _cache_fields(self, descriptors, scope=None):
+        """
+        Load the field data of `descriptors` into this FieldDataCache, for all scopes or only for `scope`.
+        """
+        for field_scope, fields in self._fields_to_cache(descriptors).items():
+            if field_scope not in self.cache or scope not in (None, field_scope):
+                continue
+
+            self.cache[field_scope].cache_fields(fields, descriptors, self.asides)
 
-                self.cache[scope].cache_fields(fields, descriptors, self.asides)
+    def _load_lazily(self, key):
+        """
+        Make sure the field data needed to access `key` is loaded into this FieldDataCache.
+
+        For scopes stored per block usage, the data of the block identified by `key` is loaded
+        along with that of the blocks added to the cache with it, typically its siblings. For
+        the other scopes, the data of all the blocks not loaded yet is loaded at once. Only the
+        fields in `key`'s scope are loaded.
+        """
+        if not self._lazy_groups:
+            return
+
+        if key.scope in self._usage_scopes:
+            group = self._lazy_groups_by_usage_key.get(key.block_scope_id)
+            groups = [group] if group is not None and key.scope not in group.loaded_scopes else []
+        else:
+            groups = [group for group in self._lazy_groups if key.scope not in group.loaded_scopes]
+
+        if groups:
+            self._cache_fields([descriptor for group in groups for descriptor in group.descriptors], key.scope)
+            for group in groups:
+                group.loaded_scopes.add(key.scope)
 
     def add_descriptor_descendents(self, descriptor, depth=None, descriptor_filter=lambda descriptor: True):
         """
@@ -748,38 +888,43 @@ class FieldDataCache(object):
                 should be cached
         """
 
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
+        def get_child_descriptor_groups(descriptor, depth, descriptor_filter):
             """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
+            Return the lists of sibling child descriptors, down to the specified depth,
+            that match the descriptor filter. Excludes `descriptor`
 
             descriptor: The parent to search inside
             depth: The number of levels to descend, or None for infinite depth
             descriptor_filter(descriptor): A function that returns True
                 if descriptor should be included in the results
             """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
+            groups = []
             if depth is None or depth > 0:
                 new_depth = depth - 1 if depth is not None else depth
 
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
+                children = descriptor.get_children() + descriptor.get_required_module_descriptors()
+                groups.append([child for child in children if descriptor_filter(child)])
+                for child in children:
+                    groups.extend(get_child_descriptor_groups(child, new_depth, descriptor_filter))
 
-            return descriptors
+            return groups
 
         with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+            groups = get_child_descriptor_groups(descriptor, depth, descriptor_filter)
+        if descriptor_filter(descriptor):
+            groups.insert(0, [descriptor])
 
-        self.add_descriptors_to_cache(descriptors)
+        if self.eager:
+            self.add_descriptors_to_cache([child for group in groups for child in group])
+        else:
+            for group in groups:
+                if group:
+                    self.add_descriptors_to_cache(group)
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
                                          descriptor_filter=lambda descriptor: True,
-                                         asides=None, read_only=False):
+                                         asides=None, read_only=False, eager=None):
         """
         course_id: the course in the context of which we want StudentModules.
         user: the django user for whom to load modules.
@@ -788,8 +933,9 @@ class FieldDataCache(object):
             the supplied descriptor. If depth is None, load all descendant StudentModules
         descriptor_filter is a function that accepts a descriptor and return whether the field data
             should be cached
+        eager: whether to prefetch the field data rather than loading it on first access
         """
-        cache = FieldDataCache([], course_id, user, asides=asides, read_only=read_only)
+        cache = FieldDataCache([], course_id, user, asides=asides, read_only=read_only, eager=eager)
         cache.add_descriptor_descendents(descriptor, depth, descriptor_filter)
         return cache
 
@@ -803,6 +949,7 @@ class FieldDataCache(object):
                 scope_map[field.scope].add(field)
         return scope_map
 
+    @_synchronized
     @contract(key=DjangoKeyValueStore.Key)
     def get(self, key):
         """
@@ -823,8 +970,10 @@ class FieldDataCache(object):
         if key.scope not in self.cache:
             raise KeyError(key.field_name)
 
+        self._load_lazily(key)
         return self.cache[key.scope].get(key)
 
+    @_synchronized
     @contract(kv_dict="dict(DjangoKeyValueStore_Key: *)")
     def set_many(self, kv_dict):
         """
@@ -850,6 +999,8 @@ class FieldDataCache(object):
             if key.scope not in self.cache:
                 continue
 
+            # Existing field data has to be loaded before it's overwritten.
+            self._load_lazily(key)
             by_scope[key.scope][key] = value
 
         for scope, set_many_data in by_scope.iteritems():
@@ -862,6 +1013,7 @@ class FieldDataCache(object):
                 log.exception(u'Error saving fields %r', [key.field_name for key in set_many_data])
                 raise KeyValueMultiSaveError(saved_fields + exc.saved_field_names)
 
+    @_synchronized
     @contract(key=DjangoKeyValueStore.Key)
     def delete(self, key):
         """
@@ -883,8 +1035,10 @@ class FieldDataCache(object):
         if key.scope not in self.cache:
             raise KeyError(key.field_name)
 
+        self._load_lazily(key)
         self.cache[key.scope].delete(key)
 
+    @_synchronized
     @contract(key=DjangoKeyValueStore.Key, returns=bool)
     def has(self, key):
         """
@@ -904,8 +1058,10 @@ class FieldDataCache(object):
         if key.scope not in self.cache:
             return False
 
+        self._load_lazily(key)
         return self.cache[key.scope].has(key)
 
+    @_synchronized
     @contract(key=DjangoKeyValueStore.Key, returns="datetime|None")
     def last_modified(self, key):
         """
@@ -924,6 +1080,7 @@ class FieldDataCache(object):
         if key.scope not in self.cache:
             return None
 
+        self._load_lazily(key)
         return self.cache[key.scope].last_modified(key)
 
     def __len__(self):
@@ -12,8 +12,10 @@ file and check it in at the same time as your model changes. To do that,
 ASSUMPTIONS: modules have unique IDs, even across different module_types
 
 """
+import base64
 import itertools
 import logging
+import zlib
 
 from config_models.models import ConfigurationModel
 from django.conf import settings
@@ -71,6 +73,55 @@ class ChunkingManager(models.Manager):
         return res
 
 
+# Prefix of the StudentModule states stored as base64 encoded, zlib compressed JSON.
+# The trailing number is the version of the encoding.
+COMPRESSED_STATE_PREFIX = u'zlib1:'
+
+# States shorter than this many characters are always stored as plain JSON.
+STATE_COMPRESSION_MIN_LENGTH = 512
+
+
+def encode_state(state):
+    """
+    Returns the value stored for the JSON `state`: the compressed encoding of it,
+    if it's long enough and shorter compressed, or `state` itself.
+    """
+    if state is None or len(state) < STATE_COMPRESSION_MIN_LENGTH or state.startswith(COMPRESSED_STATE_PREFIX):
+        return state
+    state_bytes = state.encode('utf-8') if isinstance(state, text_type) else state
+    encoded_state = COMPRESSED_STATE_PREFIX + base64.b64encode(zlib.compress(state_bytes)).decode('ascii')
+    return encoded_state if len(encoded_state) < len(state) else state
+
+
+def decode_state(value):
+    """
+    Returns the JSON state stored as `value`, which is either plain JSON or
+    its compressed encoding.
+    """
+    if value is None or not value.startswith(COMPRESSED_STATE_PREFIX):
+        return value
+    return zlib.decompress(base64.b64decode(value[len(COMPRESSED_STATE_PREFIX):])).decode('utf-8')
+
+
+class StudentModuleStateField(models.TextField):
+    """
+    Stores the JSON state of a StudentModule, compressed if the
+    COMPRESS_STUDENT_MODULE_STATE setting is enabled. States are always
+    decoded when read, whichever way they are stored.
+    """
+    def from_db_value(self, value, expression, connection, context):  # pylint: disable=unused-argument
+        return decode_state(value)
+
+    def to_python(self, value):
+        return decode_state(super(StudentModuleStateField, self).to_python(value))
+
+    def get_prep_value(self, value):
+        value = super(StudentModuleStateField, self).get_prep_value(value)
+        if getattr(settings, 'COMPRESS_STUDENT_MODULE_STATE', False):
+            return encode_state(value)
+        return value
+
+
 class StudentModule(models.Model):
     """
     Keeps student state for a particular module in a particular course.
@@ -101,7 +152,7 @@ class StudentModule(models.Model):
         unique_together = (('student', 'module_state_key', 'course_id'),)
 
     # Internal state of the object
-    state = models.TextField(null=True, blank=True)
+    state = StudentModuleStateField(null=True, blank=True)
 
     # Grade, and are we done?
     grade = models.FloatField(null=True, blank=True, db_index=True)
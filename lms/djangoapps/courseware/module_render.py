@@ -48,7 +48,8 @@ from courseware.masquerade import (
     is_masquerading_as_specific_student,
     setup_masquerade
 )
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, buffered_user_state_writes
+from courseware.table_of_contents import get_course_outline
 from edxmako.shortcuts import render_to_string
 from eventtracking import tracker
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
@@ -70,9 +71,7 @@ from openedx.core.lib.url_utils import quote_slashes, unquote_slashes
 from openedx.core.lib.xblock_utils import request_token as xblock_request_token
 from openedx.core.lib.xblock_utils import (
     add_staff_markup,
-    replace_course_urls,
-    replace_jump_to_id_urls,
-    replace_static_urls,
+    replace_urls,
     wrap_xblock,
     is_xblock_aside,
     get_aside_from_xblock,
@@ -160,18 +159,21 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
     NOTE: assumes that if we got this far, user has access to course.  Returns
     None if this is not the case.
 
-    field_data_cache must include data from the course module and 2 levels of its descendants
+    field_data_cache must include data from the course module and 2 levels of its descendants,
+    unless the outline is served from the block structure based cache (see table_of_contents).
     '''
 
     with modulestore().bulk_operations(course.id):
-        course_module = get_module_for_descriptor(
-            user, request, course, field_data_cache, course.id, course=course
-        )
-        if course_module is None:
-            return None, None, None
+        chapters = get_course_outline(user, course)
+        if chapters is None:
+            course_module = get_module_for_descriptor(
+                user, request, course, field_data_cache, course.id, course=course
+            )
+            if course_module is None:
+                return None, None, None
+            chapters = _course_module_outline(course_module)
 
         toc_chapters = list()
-        chapters = course_module.get_display_items()
 
         # Check for content which needs to be completed
         # before the rest of the content is made available
@@ -187,35 +189,33 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
         for chapter in chapters:
             # Only show required content, if there is required content
             # chapter.hide_from_toc is read-only (bool)
-            # xss-lint: disable=python-deprecated-display-name
-            display_id = slugify(chapter.display_name_with_default_escaped)
+            display_id = slugify(chapter['display_name'])
             local_hide_from_toc = False
             if required_content:
-                if unicode(chapter.location) not in required_content:
+                if chapter['location'] not in required_content:
                     local_hide_from_toc = True
 
             # Skip the current chapter if a hide flag is tripped
-            if chapter.hide_from_toc or local_hide_from_toc:
+            if chapter['hide_from_toc'] or local_hide_from_toc:
                 continue
 
             sections = list()
-            for section in chapter.get_display_items():
+            for section in chapter['sections']:
                 # skip the section if it is hidden from the user
-                if section.hide_from_toc:
+                if section['hide_from_toc']:
                     continue
 
-                is_section_active = (chapter.url_name == active_chapter and section.url_name == active_section)
+                is_section_active = (chapter['url_name'] == active_chapter and section['url_name'] == active_section)
                 if is_section_active:
                     found_active_section = True
 
                 section_context = {
-                    # xss-lint: disable=python-deprecated-display-name
-                    'display_name': section.display_name_with_default_escaped,
-                    'url_name': section.url_name,
-                    'format': section.format if section.format is not None else '',
-                    'due': section.due,
+                    'display_name': section['display_name'],
+                    'url_name': section['url_name'],
+                    'format': section['format'] if section['format'] is not None else '',
+                    'due': section['due'],
                     'active': is_section_active,
-                    'graded': section.graded,
+                    'graded': section['graded'],
                 }
                 _add_timed_exam_info(user, course, section, section_context)
 
@@ -223,22 +223,21 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
                 if is_section_active:
                     if last_processed_section:
                         previous_of_active_section = last_processed_section.copy()
-                        previous_of_active_section['chapter_url_name'] = last_processed_chapter.url_name
+                        previous_of_active_section['chapter_url_name'] = last_processed_chapter['url_name']
                 elif found_active_section and not next_of_active_section:
                     next_of_active_section = section_context.copy()
-                    next_of_active_section['chapter_url_name'] = chapter.url_name
+                    next_of_active_section['chapter_url_name'] = chapter['url_name']
 
                 sections.append(section_context)
                 last_processed_section = section_context
                 last_processed_chapter = chapter
 
             toc_chapters.append({
-                # xss-lint: disable=python-deprecated-display-name
-                'display_name': chapter.display_name_with_default_escaped,
+                'display_name': chapter['display_name'],
                 'display_id': display_id,
-                'url_name': chapter.url_name,
+                'url_name': chapter['url_name'],
                 'sections': sections,
-                'active': chapter.url_name == active_chapter
+                'active': chapter['url_name'] == active_chapter
             })
         return {
             'chapters': toc_chapters,
@@ -247,12 +246,48 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
         }
 
 
+def _course_module_outline(course_module):
+    """
+    Yields the outline of the chapters of `course_module`, in the format returned by
+    `table_of_contents.get_course_outline`. The sections of each chapter are only
+    instantiated as they're iterated over.
+    """
+    def _chapter_sections(chapter):
+        """
+        Yields the outline of the sections of `chapter`.
+        """
+        for section in chapter.get_display_items():
+            yield {
+                'location': unicode(section.location),
+                'url_name': section.url_name,
+                # xss-lint: disable=python-deprecated-display-name
+                'display_name': section.display_name_with_default_escaped,
+                'format': section.format,
+                'due': section.due,
+                'graded': section.graded,
+                'hide_from_toc': section.hide_from_toc,
+                'is_time_limited': getattr(section, 'is_time_limited', False),
+            }
+
+    for chapter in course_module.get_display_items():
+        yield {
+            'location': unicode(chapter.location),
+            'url_name': chapter.url_name,
+            # xss-lint: disable=python-deprecated-display-name
+            'display_name': chapter.display_name_with_default_escaped,
+            'hide_from_toc': chapter.hide_from_toc,
+            'sections': _chapter_sections(chapter),
+        }
+
+
 def _add_timed_exam_info(user, course, section, section_context):
     """
     Add in rendering context if exam is a timed exam (which includes proctored)
+
+    `section` is the section's outline, as returned by `table_of_contents.get_course_outline`.
     """
     section_is_time_limited = (
-        getattr(section, 'is_time_limited', False) and
+        section['is_time_limited'] and
         settings.FEATURES.get('ENABLE_SPECIAL_EXAMS', False)
     )
     if section_is_time_limited:
@@ -283,7 +318,7 @@ def _add_timed_exam_info(user, course, section, section_context):
             timed_exam_attempt_context = get_attempt_status_summary(
                 user.id,
                 unicode(course.id),
-                unicode(section.location)
+                section['location']
             )
         except Exception, ex:  # pylint: disable=broad-except
             # safety net in case something blows up in edx_proctoring
@@ -710,27 +745,21 @@ def get_module_system_for_user(
     # prefix is going to have to be specific to the module, not the directory
     # that the xml was loaded from
 
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
+    # Rewrite, in a single pass over the fragment:
+    # * urls beginning in /static to point to course-specific content
+    # * urls of the form '/course/' to refer to the root of multicourse directory
     #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
+    # * intra-courseware links (/jump_to_id/<id>). This format is an improvement
+    #   over the /course/... format for studio authored courses, because it is
+    #   agnostic to course-hierarchy.
     # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
     # function, we just need to specify something to get the reverse() to work.
     block_wrappers.append(partial(
-        replace_jump_to_id_urls,
+        replace_urls,
         course_id,
         reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''}),
+        getattr(descriptor, 'data_dir', None),
+        static_asset_path=static_asset_path or descriptor.static_asset_path
     ))
 
     block_wrappers.append(partial(display_access_messages, user))
@@ -1182,7 +1211,9 @@ def _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course
                     handler_instance = get_aside_from_xblock(instance, usage_key.aside_type)
                 else:
                     handler_instance = instance
-                resp = handler_instance.handle(handler, req, suffix)
+                # Write the user state the handler sets once it's done, merged per block.
+                with buffered_user_state_writes():
+                    resp = handler_instance.handle(handler, req, suffix)
                 if suffix == 'problem_check' \
                         and course \
                         and getattr(course, 'entrance_exam_enabled', False) \
@@ -4,10 +4,17 @@ by the individual due dates feature.
 """
 import json
 
+from django.db import transaction
+
 from courseware.models import StudentFieldOverride
+from openedx.core.lib.cache_utils import VersionedProcessCache
 from openedx.core.lib.xblock_utils import is_xblock_aside
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import FieldOverrideProvider, clear_inherited_overrides
+
+# Overrides of the students in courses, by student id and course id, shared
+# by the requests of the process.
+STUDENT_OVERRIDES_CACHE = VersionedProcessCache(u'courseware.student_overrides', maxsize=5000)
 
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
@@ -54,19 +61,52 @@ def _get_overrides_for_user(user, block):
     else:
         location = block.location
 
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=location,
-        student_id=user.id,
+    course_id = block.runtime.course_id
+    course_overrides = STUDENT_OVERRIDES_CACHE.get_or_set(
+        _student_overrides_cache_key(user.id, course_id),
+        lambda: _load_overrides_for_user(user.id, course_id),
     )
     overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for field_name, value in course_overrides.get(unicode(location), {}).iteritems():
+        overrides[field_name] = block.fields[field_name].from_json(value)
+    return overrides
+
+
+def _load_overrides_for_user(user_id, course_id):
+    """
+    Loads all of the individual student overrides for the given user in the
+    given course. Returns a dictionary of JSON field values keyed by field
+    name, keyed by block location.
+    """
+    query = StudentFieldOverride.objects.filter(
+        course_id=course_id,
+        student_id=user_id,
+    ).values_list('location', 'field', 'value')
+    overrides = {}
+    for location, field_name, value in query:
+        overrides.setdefault(unicode(location), {})[field_name] = json.loads(value)
     return overrides
 
 
+def _student_overrides_cache_key(user_id, course_id):
+    """
+    Returns the key of the overrides of the given user in the given course in
+    `STUDENT_OVERRIDES_CACHE`.
+    """
+    return u'{}.{}'.format(user_id, course_id)
+
+
+def _overrides_changed_for_user(user, block):
+    """
+    Makes all processes reload the overrides of `user` in the course of
+    `block`, now and once the current transaction commits.
+    """
+    cache_key = _student_overrides_cache_key(user.id, block.runtime.course_id)
+    STUDENT_OVERRIDES_CACHE.invalidate(cache_key)
+    transaction.on_commit(lambda: STUDENT_OVERRIDES_CACHE.invalidate(cache_key))
+    clear_inherited_overrides()
+
+
 def override_field_for_user(user, block, name, value):
     """
     Overrides a field for the `user`.  `block` and `name` specify the block
@@ -81,6 +121,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _overrides_changed_for_user(user, block)
 
 
 def clear_override_for_user(user, block, name):
@@ -98,3 +139,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _overrides_changed_for_user(user, block)
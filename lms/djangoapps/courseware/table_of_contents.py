@@ -0,0 +1,190 @@
+"""
+Outline of the chapters and sections shown in the courseware table of contents.
+
+The outline is built from the course's block structure rather than from instantiated
+XModules, and is cached per course version and per combination of the user attributes
+the course block access transformers depend on: staff access, beta testing and user
+partition groups. Views of the courseware by users sharing those attributes therefore
+reuse the same outline.
+"""
+from datetime import datetime, timedelta
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from pytz import UTC
+
+from courseware.access import has_access
+from courseware.access_utils import in_preview_mode
+from courseware.masquerade import get_course_masquerade
+from lms.djangoapps.course_blocks.api import get_course_block_access_transformers, get_course_blocks
+from lms.djangoapps.course_blocks.transformers.start_date import StartDateTransformer
+from lms.djangoapps.courseware.field_overrides import resolve_dotted
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag, WaffleFlagNamespace
+from student.roles import CourseBetaTesterRole
+from xmodule.block_metadata_utils import display_name_with_default_escaped
+from xmodule.partitions.partitions_service import get_all_partitions_for_course, get_user_partition_groups
+
+WAFFLE_FLAG_NAMESPACE = WaffleFlagNamespace(name=u'courseware')
+
+# Waffle flag to build the courseware table of contents from the cached course outline.
+CACHED_TABLE_OF_CONTENTS_FLAG = CourseWaffleFlag(WAFFLE_FLAG_NAMESPACE, u'cached_table_of_contents')
+
+# Maximum number of seconds a course outline is cached for.
+OUTLINE_CACHE_TIMEOUT = 60 * 60
+
+
+class TableOfContentsTransformer(BlockStructureTransformer):
+    """
+    Collects the fields of the chapters and sections shown in the courseware
+    table of contents. It doesn't transform the block structure.
+    """
+    WRITE_VERSION = 1
+    READ_VERSION = 1
+    FIELDS = ('display_name', 'format', 'due', 'graded', 'hide_from_toc', 'is_time_limited')
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return "table_of_contents"
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to execute this
+        transformer's transform method.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS)
+
+    def transform(self, usage_info, block_structure):
+        """
+        Nothing to transform; the outline is read from the collected fields.
+        """
+        pass
+
+
+def get_course_outline(user, course):
+    """
+    Returns the outline of the chapters of `course` visible to `user`, or None if it can't
+    be computed from the course's block structure for this user, e.g. when the user is
+    masquerading or when per-user field overrides are enabled for the course.
+
+    The outline is a list of chapters:
+        {'location': ..., 'url_name': ..., 'display_name': ..., 'hide_from_toc': bool, 'sections': SECTIONS}
+    where SECTIONS is a list:
+        [{'location': ..., 'url_name': ..., 'display_name': ..., 'format': ..., 'due': ..., 'graded': bool,
+          'hide_from_toc': bool, 'is_time_limited': bool}, ...]
+    """
+    if not CACHED_TABLE_OF_CONTENTS_FLAG.is_enabled(course.id):
+        return None
+    if get_course_masquerade(user, course.id) or in_preview_mode() or _has_field_overrides(course):
+        return None
+
+    has_staff_access = bool(has_access(user, 'staff', course.id))
+    is_beta_tester = CourseBetaTesterRole(course.id).has_user(user)
+    user_groups = get_user_partition_groups(
+        course.id, get_all_partitions_for_course(course, active_only=True), user, 'id'
+    )
+    cache_key = _outline_cache_key(course, has_staff_access, is_beta_tester, user_groups)
+    outline = cache.get(cache_key)
+    if outline is None:
+        collected_block_structure = get_block_structure_manager(course.id).get_collected()
+        block_structure = get_course_blocks(
+            user,
+            collected_block_structure.root_block_usage_key,
+            BlockStructureTransformers(get_course_block_access_transformers(user) + [TableOfContentsTransformer()]),
+            collected_block_structure,
+        )
+        if block_structure.root_block_usage_key not in block_structure:
+            return None
+        outline = _build_outline(block_structure)
+        timeout = OUTLINE_CACHE_TIMEOUT
+        if not has_staff_access:
+            timeout = _get_outline_cache_timeout(collected_block_structure, is_beta_tester)
+        cache.set(cache_key, outline, timeout)
+    return outline
+
+
+def _outline_cache_key(course, has_staff_access, is_beta_tester, user_groups):
+    """
+    Returns the cache key of the outline of `course` shared by the users with the given attributes.
+    """
+    return u'courseware.outline.v{}.{}.{}.{}.{}.{}.{}'.format(
+        TableOfContentsTransformer.WRITE_VERSION,
+        course.id,
+        getattr(course, 'course_version', None),
+        getattr(course, 'subtree_edited_on', None),
+        int(has_staff_access),
+        int(is_beta_tester),
+        u','.join(
+            u'{}:{}'.format(partition_id, group.id) for partition_id, group in sorted(user_groups.iteritems())
+        ),
+    )
+
+
+def _has_field_overrides(course):
+    """
+    Returns whether per-user field overrides, which the block structure doesn't reflect,
+    are enabled for `course`.
+    """
+    return any(resolve_dotted(name).enabled_for(course) for name in settings.FIELD_OVERRIDE_PROVIDERS)
+
+
+def _build_outline(block_structure):
+    """
+    Returns the outline of the chapters remaining in the transformed `block_structure`.
+    """
+    outline = []
+    for chapter_key in block_structure.get_children(block_structure.root_block_usage_key):
+        sections = []
+        for section_key in block_structure.get_children(chapter_key):
+            section = block_structure[section_key]
+            sections.append({
+                'location': unicode(section_key),
+                'url_name': section_key.block_id,
+                # xss-lint: disable=python-deprecated-display-name
+                'display_name': display_name_with_default_escaped(section),
+                'format': block_structure.get_xblock_field(section_key, 'format'),
+                'due': block_structure.get_xblock_field(section_key, 'due'),
+                'graded': block_structure.get_xblock_field(section_key, 'graded'),
+                'hide_from_toc': block_structure.get_xblock_field(section_key, 'hide_from_toc'),
+                'is_time_limited': bool(block_structure.get_xblock_field(section_key, 'is_time_limited')),
+            })
+        outline.append({
+            'location': unicode(chapter_key),
+            'url_name': chapter_key.block_id,
+            # xss-lint: disable=python-deprecated-display-name
+            'display_name': display_name_with_default_escaped(block_structure[chapter_key]),
+            'hide_from_toc': block_structure.get_xblock_field(chapter_key, 'hide_from_toc'),
+            'sections': sections,
+        })
+    return outline
+
+
+def _get_outline_cache_timeout(collected_block_structure, is_beta_tester):
+    """
+    Returns the number of seconds an outline can be cached for before one of the course's
+    chapters or sections starts, and would have to be added to it.
+    """
+    now = datetime.now(UTC)
+    timeout = OUTLINE_CACHE_TIMEOUT
+    root_block_usage_key = collected_block_structure.root_block_usage_key
+    for chapter_key in collected_block_structure.get_children(root_block_usage_key):
+        for block_key in [chapter_key] + list(collected_block_structure.get_children(chapter_key)):
+            start = collected_block_structure.get_transformer_block_field(
+                block_key, StartDateTransformer, StartDateTransformer.MERGED_START_DATE
+            )
+            days_early_for_beta = collected_block_structure.get_xblock_field(block_key, 'days_early_for_beta')
+            if start is None:
+                continue
+            if is_beta_tester and days_early_for_beta is not None:
+                start = start - timedelta(days_early_for_beta)
+            if start > now:
+                timeout = min(timeout, int(ceil((start - now).total_seconds())))
+    return timeout
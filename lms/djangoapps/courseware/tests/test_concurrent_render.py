@@ -0,0 +1,98 @@
+"""
+Performance test for rendering the children of a vertical concurrently.
+"""
+import time
+import unittest
+
+import ddt
+import pytest
+from django.conf import settings
+from mock import patch
+
+from courseware.model_data import FieldDataCache
+from courseware.module_render import get_module_for_descriptor
+from courseware.tests.factories import RequestFactoryNoCsrf, UserFactory
+from lms.djangoapps.lms_xblock.runtime import LmsModuleSystem
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.x_module import STUDENT_VIEW
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Types of the blocks of the unit, repeated until it has UNIT_SIZE blocks.
+BLOCK_TYPES = ('html', 'problem', 'video', 'word_cloud', 'html')
+
+# Number of blocks in the unit.
+UNIT_SIZE = 20
+
+# Seconds each block waits on simulated external services while it renders.
+SIMULATED_IO_LATENCIES = (0, 0.01, 0.05)
+
+# Number of times the unit is rendered in each mode.
+RENDER_COUNT = 5
+
+
+@ddt.ddt
+@unittest.skip
+class ConcurrentChildRenderBenchmark(ModuleStoreTestCase):
+    """
+    This class exists to time the rendering of a unit of mixed blocks with
+    its children rendered one after another, and concurrently.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(ConcurrentChildRenderBenchmark, self).setUp()
+        self.user = UserFactory()
+        self.request = RequestFactoryNoCsrf().get('/')
+        self.request.user = self.user
+
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        sequential = ItemFactory.create(parent=chapter, category='sequential')
+        self.unit = ItemFactory.create(parent=sequential, category='vertical')
+        for index in range(UNIT_SIZE):
+            ItemFactory.create(parent=self.unit, category=BLOCK_TYPES[index % len(BLOCK_TYPES)])
+        self.course_key = course.id
+
+    def render_unit(self):
+        """
+        Renders the student view of the unit, as the courseware does.
+        """
+        unit = self.store.get_item(self.unit.location)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course_key, self.user, unit)
+        module = get_module_for_descriptor(self.user, self.request, unit, field_data_cache, self.course_key)
+        module.render(STUDENT_VIEW, {})
+
+    @ddt.data(*SIMULATED_IO_LATENCIES)
+    def test_render_unit(self, latency):
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        original_render = LmsModuleSystem.render
+
+        def render(runtime, block, view_name, context=None):  # pylint: disable=missing-docstring
+            if block.location.block_type != 'vertical':
+                time.sleep(latency)
+            return original_render(runtime, block, view_name, context)
+
+        desc = "ConcurrentChildRender:{}blocks:{}s".format(UNIT_SIZE, latency)
+        with CodeBlockTimer(desc):
+            # The transaction of the test case isn't that of a request, which would keep the children
+            # from being rendered concurrently.
+            with patch.object(LmsModuleSystem, 'render', render), patch(
+                'lms.djangoapps.lms_xblock.concurrent_render._in_atomic_block', return_value=False
+            ):
+                for concurrent in (False, True):
+                    with patch.dict(settings.FEATURES, {'ENABLE_CONCURRENT_CHILD_RENDERING': concurrent}):
+                        self.render_unit()
+                        with CodeBlockTimer("concurrent" if concurrent else "sequential"):
+                            for __ in range(RENDER_COUNT):
+                                self.render_unit()
@@ -5,6 +5,7 @@ Tests for `field_overrides` module.
 import unittest
 
 from django.test.utils import override_settings
+from mock import Mock
 from xblock.field_data import DictFieldData
 
 from openedx.core.lib.tests import attr
@@ -15,6 +16,7 @@ from ..field_overrides import (
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
+    clear_inherited_overrides,
     disable_overrides,
     resolve_dotted
 )
@@ -45,6 +47,25 @@ class TestOverrideProvider(FieldOverrideProvider):
         return True
 
 
+class TestInheritedOverrideProvider(FieldOverrideProvider):
+    """
+    A concrete implementation of `FieldOverrideProvider` overriding the due
+    date of the blocks in `due_dates`, and counting its calls.
+    """
+    due_dates = {}
+    calls = []
+
+    def get(self, block, name, default):
+        self.calls.append((block.scope_ids.usage_id, name))
+        if name == 'due':
+            return self.due_dates.get(block.scope_ids.usage_id, default)
+        return default
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
 class OverrideFieldBase(SharedModuleStoreTestCase):
     """
     Base class for field data override tests.  Using override_settings and
@@ -132,6 +153,62 @@ class OverrideFieldDataTests(OverrideFieldBase):
         self.assertIsInstance(data, DictFieldData)
 
 
+@attr(shard=1)
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'courseware.tests.test_field_overrides.TestInheritedOverrideProvider',))
+class InheritedOverrideTests(OverrideFieldBase):
+    """
+    Tests for the overrides inherited through `OverrideFieldData`.
+    """
+
+    def setUp(self):
+        super(InheritedOverrideTests, self).setUp()
+        OverrideFieldData.provider_classes = None
+        self.addCleanup(setattr, OverrideFieldData, 'provider_classes', None)
+        TestInheritedOverrideProvider.due_dates = {'chapter': 'chapter due'}
+        TestInheritedOverrideProvider.calls = []
+
+        self.chapter = self.make_block('chapter', None)
+        self.sequential = self.make_block('sequential', self.chapter)
+        self.verticals = [self.make_block('vertical{}'.format(index), self.sequential) for index in range(2)]
+
+    def make_block(self, usage_id, parent):
+        """
+        Returns a block with the given usage id and parent.
+        """
+        return Mock(scope_ids=Mock(usage_id=usage_id), get_parent=Mock(return_value=parent))
+
+    def make_one(self):
+        """
+        Factory method.
+        """
+        return OverrideFieldData.wrap(TESTUSER, self.course, DictFieldData({'due': 'original due'}))
+
+    def test_default(self):
+        data = self.make_one()
+        for vertical in self.verticals:
+            self.assertEqual(data.default(vertical, 'due'), 'chapter due')
+        self.assertFalse(data.has(self.verticals[0], 'due'))
+        self.assertTrue(data.has(self.chapter, 'due'))
+        self.assertEqual(
+            sorted(TestInheritedOverrideProvider.calls),
+            [('chapter', 'due'), ('chapter', 'due'), ('sequential', 'due'), ('vertical0', 'due')],
+        )
+
+    def test_shared_by_blocks(self):
+        self.make_one().default(self.verticals[0], 'due')
+        TestInheritedOverrideProvider.calls = []
+        self.assertEqual(self.make_one().default(self.verticals[1], 'due'), 'chapter due')
+        self.assertEqual(TestInheritedOverrideProvider.calls, [])
+
+    def test_cleared(self):
+        data = self.make_one()
+        self.assertEqual(data.default(self.verticals[0], 'due'), 'chapter due')
+        TestInheritedOverrideProvider.due_dates = {'sequential': 'sequential due'}
+        clear_inherited_overrides()
+        self.assertEqual(data.default(self.verticals[0], 'due'), 'sequential due')
+
+
 @attr(shard=1)
 @override_settings(
     MODULESTORE_FIELD_OVERRIDE_PROVIDERS=['courseware.tests.test_field_overrides.TestOverrideProvider']
@@ -6,12 +6,13 @@ from functools import partial
 
 from django.db import DatabaseError
 from django.test import TestCase
+from django.test.utils import override_settings
 from mock import Mock, patch
 from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError, buffered_user_state_writes
 from courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -37,9 +38,9 @@ def mock_field(scope, name):
     return field
 
 
-def mock_descriptor(fields=[]):
+def mock_descriptor(fields=[], usage_id='usage_id'):
     descriptor = Mock(entry_point=XBlock.entry_point)
-    descriptor.scope_ids = ScopeIds('user1', 'mock_problem', location('def_id'), location('usage_id'))
+    descriptor.scope_ids = ScopeIds('user1', 'mock_problem', location('def_id'), location(usage_id))
     descriptor.module_class.fields.values.return_value = fields
     descriptor.fields.values.return_value = fields
     descriptor.module_class.__name__ = 'MockProblemModule'
@@ -120,10 +121,10 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         self.user = student_module.student
         self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
 
-        # There should be only one query to load a single descriptor with a single user_state field
+        # There should be only one query to prefetch a single descriptor with a single user_state field
         with self.assertNumQueries(1):
             self.field_data_cache = FieldDataCache(
-                [mock_descriptor([mock_field(Scope.user_state, 'a_field')])], course_id, self.user
+                [mock_descriptor([mock_field(Scope.user_state, 'a_field')])], course_id, self.user, eager=True
             )
 
         self.kvs = DjangoKeyValueStore(self.field_data_cache)
@@ -234,6 +235,30 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
                 self.kvs.set_many(kv_dict)
         self.assertEquals(exception_context.exception.saved_field_names, [])
 
+    def test_buffered_set(self):
+        "Test that fields set while writes are buffered are written together, once"
+        with self.assertNumQueries(4, using='default'):
+            with self.assertNumQueries(1, using='student_module_history'):
+                with buffered_user_state_writes():
+                    with self.assertNumQueries(0):
+                        self.kvs.set(user_state_key('a_field'), 'new_value')
+                        self.kvs.set_many(self.construct_kv_dict())
+                        self.assertEquals('new_value', self.kvs.get(user_state_key('a_field')))
+        self.assertEquals(
+            {'a_field': 'new_value', 'b_field': 'b_value', 'field_a': 'new value', 'field_b': 'newer value'},
+            json.loads(StudentModule.objects.all()[0].state)
+        )
+
+    def test_buffered_set_last_modified(self):
+        "Test that reading when a buffered field was modified writes it first"
+        with buffered_user_state_writes():
+            self.kvs.set(user_state_key('a_field'), 'new_value')
+            self.assertEquals(
+                StudentModule.objects.all()[0].modified,
+                self.field_data_cache.last_modified(user_state_key('a_field')),
+            )
+            self.assertEquals('new_value', json.loads(StudentModule.objects.all()[0].state)['a_field'])
+
 
 @attr(shard=1)
 class TestMissingStudentModule(TestCase):
@@ -291,6 +316,82 @@ class TestMissingStudentModule(TestCase):
             self.assertFalse(self.kvs.has(user_state_key('a_field')))
 
 
+@attr(shard=1)
+class TestLazyFieldDataCache(TestCase):
+    """Tests for loading field data on first access"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestLazyFieldDataCache, self).setUp()
+        student_module = StudentModuleFactory(state=json.dumps({'a_field': 'a_value'}))
+        self.user = student_module.student
+        self.assertEqual(self.user.id, 1)   # check our assumption hard-coded in the key functions above.
+        StudentModuleFactory(
+            student=self.user, module_state_key=location('sibling_id'), state=json.dumps({'a_field': 'b_value'})
+        )
+        UserStateSummaryFactory()
+
+        fields = [mock_field(Scope.user_state, 'a_field'), mock_field(Scope.user_state_summary, 'existing_field')]
+        # Nothing is loaded until a field is accessed
+        with self.assertNumQueries(0):
+            self.field_data_cache = FieldDataCache(
+                [mock_descriptor(fields), mock_descriptor(fields, 'sibling_id')], course_id, self.user, eager=False
+            )
+            self.field_data_cache.add_descriptors_to_cache([mock_descriptor(fields, 'other_id')])
+        self.kvs = DjangoKeyValueStore(self.field_data_cache)
+
+    def test_get_loads_siblings(self):
+        "Test that the first access to a field loads that scope for the block and its siblings only"
+        with self.assertNumQueries(1):
+            self.assertEquals('a_value', self.kvs.get(user_state_key('a_field')))
+        with self.assertNumQueries(0):
+            self.assertEquals(
+                'b_value',
+                self.kvs.get(DjangoKeyValueStore.Key(Scope.user_state, 1, location('sibling_id'), 'a_field')),
+            )
+        with self.assertNumQueries(1):
+            self.assertRaises(
+                KeyError,
+                self.kvs.get, DjangoKeyValueStore.Key(Scope.user_state, 1, location('other_id'), 'a_field'),
+            )
+        with self.assertNumQueries(1):
+            self.assertEquals('old_value', self.kvs.get(user_state_summary_key('existing_field')))
+
+    def test_has_loads_field_data(self):
+        "Test that `has` loads the field data it checks"
+        with self.assertNumQueries(1):
+            self.assertTrue(self.kvs.has(user_state_key('a_field')))
+            self.assertFalse(self.kvs.has(user_state_key('not_a_field')))
+
+    def test_set_loads_field_data(self):
+        "Test that setting a field of a block not loaded yet keeps its other fields"
+        self.kvs.set(user_state_key('not_a_field'), 'new_value')
+        self.assertEquals('a_value', self.kvs.get(user_state_key('a_field')))
+        self.assertEquals(
+            {'a_field': 'a_value', 'not_a_field': 'new_value'},
+            json.loads(StudentModule.objects.get(module_state_key=location('usage_id')).state),
+        )
+
+    @override_settings(FIELD_DATA_CACHE_EAGER_LOADING=False)
+    def test_lazy_by_default(self):
+        "Test that field data is loaded lazily unless the settings ask for prefetching"
+        fields = [mock_field(Scope.user_state, 'a_field')]
+        with self.assertNumQueries(0):
+            field_data_cache = FieldDataCache([mock_descriptor(fields)], course_id, self.user)
+        with self.assertNumQueries(1):
+            self.assertEquals('a_value', DjangoKeyValueStore(field_data_cache).get(user_state_key('a_field')))
+
+    @override_settings(FIELD_DATA_CACHE_EAGER_LOADING=True)
+    def test_eager_setting(self):
+        "Test that the settings can ask for the field data to be prefetched"
+        fields = [mock_field(Scope.user_state, 'a_field')]
+        with self.assertNumQueries(1):
+            field_data_cache = FieldDataCache([mock_descriptor(fields)], course_id, self.user)
+        with self.assertNumQueries(0):
+            self.assertEquals('a_value', DjangoKeyValueStore(field_data_cache).get(user_state_key('a_field')))
+
+
 @attr(shard=1)
 class StorageTestBase(object):
     """
@@ -316,9 +417,9 @@ class StorageTestBase(object):
             mock_field(self.scope, 'existing_field'),
             mock_field(self.scope, 'other_existing_field')])
         # Each field is stored as a separate row in the table,
-        # but we can query them in a single query
+        # but we can prefetch them in a single query
         with self.assertNumQueries(1):
-            self.field_data_cache = FieldDataCache([self.mock_descriptor], course_id, self.user)
+            self.field_data_cache = FieldDataCache([self.mock_descriptor], course_id, self.user, eager=True)
         self.kvs = DjangoKeyValueStore(self.field_data_cache)
 
     def test_set_and_get_existing_field(self):
@@ -0,0 +1,102 @@
+"""
+Tests for the cached course outline behind the courseware table of contents.
+"""
+from datetime import datetime, timedelta
+
+import ddt
+from mock import patch
+from pytz import UTC
+
+from courseware import module_render as render
+from courseware import table_of_contents
+from courseware.model_data import FieldDataCache
+from courseware.table_of_contents import CACHED_TABLE_OF_CONTENTS_FLAG, get_course_outline
+from courseware.tests.factories import GlobalStaffFactory, RequestFactoryNoCsrf, UserFactory
+from lms.djangoapps.course_blocks.api import get_course_blocks
+from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
+from openedx.core.lib.tests import attr
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, ToyCourseFactory
+
+
+@attr(shard=1)
+@ddt.ddt
+class TestCourseOutline(ModuleStoreTestCase):
+    """
+    Tests for building the table of contents from the cached course outline.
+    """
+    def setUp(self):
+        super(TestCourseOutline, self).setUp()
+        self.user = UserFactory()
+        self.request = RequestFactoryNoCsrf().get('/')
+        self.request.user = self.user
+
+    def get_toc(self, course, chapter=None, section=None):
+        """
+        Returns the table of contents of `course` for the test user.
+        """
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course.id, self.user, course, depth=2)
+        return render.toc_for_course(self.user, self.request, course, chapter, section, field_data_cache)
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    def test_same_toc_as_course_module(self, default_ms):
+        with self.store.default_store(default_ms):
+            course = self.store.get_course(ToyCourseFactory.create().id, depth=2)
+
+        expected = self.get_toc(course, 'Overview', 'Welcome')
+        with override_waffle_flag(CACHED_TABLE_OF_CONTENTS_FLAG, active=True):
+            with patch('courseware.module_render.get_module_for_descriptor') as mock_get_module:
+                actual = self.get_toc(course, 'Overview', 'Welcome')
+        self.assertFalse(mock_get_module.called)
+        self.assertEqual(actual, expected)
+
+    @override_waffle_flag(CACHED_TABLE_OF_CONTENTS_FLAG, active=True)
+    def test_outline_is_cached(self):
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category='chapter', display_name='Week 1')
+        ItemFactory.create(parent=chapter, category='sequential', display_name='Lesson 1', format='Homework')
+        course = self.store.get_course(course.id)
+
+        with patch.object(table_of_contents, 'get_course_blocks', wraps=get_course_blocks) as mock_get_course_blocks:
+            outline = get_course_outline(self.user, course)
+            self.assertEqual(get_course_outline(UserFactory(), course), outline)
+        self.assertEqual(mock_get_course_blocks.call_count, 1)
+        self.assertEqual([chapter['display_name'] for chapter in outline], ['Week 1'])
+        self.assertEqual(outline[0]['sections'][0]['display_name'], 'Lesson 1')
+        self.assertEqual(outline[0]['sections'][0]['format'], 'Homework')
+
+    @override_waffle_flag(CACHED_TABLE_OF_CONTENTS_FLAG, active=True)
+    def test_staff_only_content(self):
+        course = CourseFactory.create()
+        ItemFactory.create(parent=course, category='chapter', display_name='Public')
+        ItemFactory.create(parent=course, category='chapter', display_name='Staff only', visible_to_staff_only=True)
+        course = self.store.get_course(course.id)
+
+        learner_outline = get_course_outline(self.user, course)
+        staff_outline = get_course_outline(GlobalStaffFactory(), course)
+        self.assertEqual([chapter['display_name'] for chapter in learner_outline], ['Public'])
+        self.assertEqual([chapter['display_name'] for chapter in staff_outline], ['Public', 'Staff only'])
+
+    @override_waffle_flag(CACHED_TABLE_OF_CONTENTS_FLAG, active=True)
+    def test_field_overrides_fall_back(self):
+        course = CourseFactory.create()
+        with patch.object(table_of_contents, '_has_field_overrides', return_value=True):
+            self.assertIsNone(get_course_outline(self.user, course))
+
+    @override_waffle_flag(CACHED_TABLE_OF_CONTENTS_FLAG, active=True)
+    def test_cached_until_next_start(self):
+        course = CourseFactory.create(start=datetime(2000, 1, 1, tzinfo=UTC))
+        ItemFactory.create(parent=course, category='chapter', display_name='Started')
+        ItemFactory.create(
+            parent=course, category='chapter', display_name='Upcoming',
+            start=datetime.now(UTC) + timedelta(minutes=10),
+        )
+        course = self.store.get_course(course.id)
+
+        with patch.object(table_of_contents.cache, 'set') as mock_cache_set:
+            outline = get_course_outline(self.user, course)
+        self.assertEqual([chapter['display_name'] for chapter in outline], ['Started'])
+        __, __, timeout = mock_cache_set.call_args[0]
+        self.assertLessEqual(timeout, 10 * 60)
+        self.assertGreater(timeout, 0)
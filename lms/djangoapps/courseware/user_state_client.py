@@ -225,7 +225,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('set_many', 'calls')
 
-        # We do a find_or_create for every block (rather than re-using field objects
+        # We re-read the rows of the blocks (rather than re-using field objects
         # that were queried in get_many) so that if the score has
         # been changed by some other piece of the code, we don't overwrite
         # that score.
@@ -241,26 +241,42 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        # Read the existing rows for all of the blocks at once, rather than
+        # block by block.
+        existing_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(username, block_keys_to_state.keys())
+        }
+
         for usage_key, state in block_keys_to_state.items():
-            try:
-                student_module, created = StudentModule.objects.get_or_create(
-                    student=user,
-                    course_id=usage_key.course_key,
-                    module_state_key=usage_key,
-                    defaults={
-                        'state': json.dumps(state),
-                        'module_type': usage_key.block_type,
-                    },
-                )
-            except IntegrityError:
-                # PLAT-1109 - Until we switch to read committed, we cannot rely
-                # on get_or_create to be able to see rows created in another
-                # process. This seems to happen frequently, and ignoring it is the
-                # best course of action for now
-                log.warning(u"set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
-                    user, repr(unicode(usage_key.course_key)), usage_key
-                ))
-                return
+            student_module = existing_modules.get(usage_key)
+            created = student_module is None
+            if created:
+                try:
+                    with transaction.atomic():
+                        student_module = StudentModule.objects.create(
+                            student=user,
+                            course_id=usage_key.course_key,
+                            module_state_key=usage_key,
+                            state=json.dumps(state),
+                            module_type=usage_key.block_type,
+                        )
+                except IntegrityError:
+                    # PLAT-1109 - Until we switch to read committed, we cannot rely
+                    # on seeing rows created in another process. Update the row that
+                    # process created instead.
+                    log.warning(u"set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+                        user, repr(unicode(usage_key.course_key)), usage_key
+                    ))
+                    try:
+                        student_module = StudentModule.objects.get(
+                            student=user,
+                            course_id=usage_key.course_key,
+                            module_state_key=usage_key,
+                        )
+                    except StudentModule.DoesNotExist:
+                        continue
+                    created = False
 
             num_fields_before = num_fields_after = num_new_fields_set = len(state)
             num_fields_updated = 0
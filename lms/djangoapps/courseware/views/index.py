@@ -59,7 +59,7 @@ from ..masquerade import (
     setup_masquerade,
     check_content_start_date_for_masquerade_user
 )
-from ..model_data import FieldDataCache
+from ..model_data import FieldDataCache, buffered_user_state_writes
 from ..module_render import get_module_for_descriptor, toc_for_course
 
 log = logging.getLogger("edx.courseware.views.index")
@@ -566,21 +566,22 @@ def save_positions_recursively_up(user, request, field_data_cache, xmodule, cour
     """
     current_module = xmodule
 
-    while current_module:
-        parent_location = modulestore().get_parent_location(current_module.location)
-        parent = None
-        if parent_location:
-            parent_descriptor = modulestore().get_item(parent_location)
-            parent = get_module_for_descriptor(
-                user,
-                request,
-                parent_descriptor,
-                field_data_cache,
-                current_module.location.course_key,
-                course=course
-            )
+    with buffered_user_state_writes():
+        while current_module:
+            parent_location = modulestore().get_parent_location(current_module.location)
+            parent = None
+            if parent_location:
+                parent_descriptor = modulestore().get_item(parent_location)
+                parent = get_module_for_descriptor(
+                    user,
+                    request,
+                    parent_descriptor,
+                    field_data_cache,
+                    current_module.location.course_key,
+                    course=course
+                )
 
-        if parent and hasattr(parent, 'position'):
-            save_child_position(parent, current_module.location.block_id)
+            if parent and hasattr(parent, 'position'):
+                save_child_position(parent, current_module.location.block_id)
 
-        current_module = parent
+            current_module = parent
@@ -26,6 +26,7 @@ from django_comment_common.models import (
     Role
 )
 from django_comment_common.utils import get_course_discussion_settings
+from lms.djangoapps.course_blocks.api import get_accessible_usage_keys
 from openedx.core.djangoapps.course_groups.cohorts import get_cohort_id, get_cohort_names, is_course_cohorted
 from openedx.core.lib.cache_utils import request_cached
 from student.models import get_user_by_username_or_email
@@ -144,11 +145,16 @@ def get_accessible_discussion_xblocks_by_course_id(course_id, user=None, include
     Checks for the given user's access if include_all is False.
     """
     all_xblocks = modulestore().get_items(course_id, qualifiers={'category': 'discussion'}, include_orphans=False)
+    xblocks = [xblock for xblock in all_xblocks if has_required_keys(xblock)]
+    if include_all:
+        return xblocks
 
-    return [
-        xblock for xblock in all_xblocks
-        if has_required_keys(xblock) and (include_all or has_access(user, 'load', xblock, course_id))
-    ]
+    accessible_keys = get_accessible_usage_keys(
+        user, 'load', modulestore().get_course(course_id), [xblock.location for xblock in xblocks]
+    )
+    if accessible_keys is None:
+        return [xblock for xblock in xblocks if has_access(user, 'load', xblock, course_id)]
+    return [xblock for xblock in xblocks if xblock.location in accessible_keys]
 
 
 def get_discussion_id_map_entry(xblock):
@@ -554,6 +554,18 @@ class PersistentCourseGrade(TimeStampedModel):
             cls.objects.filter(user_id__in=[user.id for user in users], course_id=course_id)
         }
 
+    @classmethod
+    def prefetch_for_user(cls, user_id, course_ids):
+        """
+        Prefetches grades for the given user for the given courses.
+        """
+        grades = {course_id: None for course_id in course_ids}
+        grades.update(
+            (grade.course_id, grade)
+            for grade in cls.objects.filter(user_id=user_id, course_id__in=course_ids)
+        )
+        get_cache(cls._CACHE_NAMESPACE)[cls._user_cache_key(user_id)] = grades
+
     @classmethod
     def clear_prefetched_data(cls, course_key):
         """
@@ -581,8 +593,16 @@ class PersistentCourseGrade(TimeStampedModel):
                 # assume they have no grade
                 raise cls.DoesNotExist
         except KeyError:
-            # grades were not prefetched for the course, so fetch it
-            return cls.objects.get(user_id=user_id, course_id=course_id)
+            pass
+
+        user_grades = get_cache(cls._CACHE_NAMESPACE).get(cls._user_cache_key(user_id), {})
+        if course_id in user_grades:
+            if user_grades[course_id] is None:
+                raise cls.DoesNotExist
+            return user_grades[course_id]
+
+        # grades were not prefetched for the course, so fetch it
+        return cls.objects.get(user_id=user_id, course_id=course_id)
 
     @classmethod
     def update_or_create(cls, user_id, course_id, **kwargs):
@@ -613,11 +633,18 @@ class PersistentCourseGrade(TimeStampedModel):
         course_cache = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_id))
         if course_cache is not None:
             course_cache[user_id] = grade
+        user_cache = get_cache(cls._CACHE_NAMESPACE).get(cls._user_cache_key(user_id))
+        if user_cache is not None:
+            user_cache[course_id] = grade
 
     @classmethod
     def _cache_key(cls, course_id):
         return u"grades_cache.{}".format(course_id)
 
+    @classmethod
+    def _user_cache_key(cls, user_id):
+        return u"grades_cache.user.{}".format(user_id)
+
     @staticmethod
     def _emit_grade_calculated_event(grade):
         events.course_grade_calculated(grade)
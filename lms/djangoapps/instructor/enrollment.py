@@ -176,6 +176,38 @@ def enroll_email(course_id, student_email, auto_enroll=False, email_students=Fal
     return previous_state, after_state, enrollment_obj
 
 
+def bulk_enroll_users(course_id, users):
+    """
+    Enroll registered students at once, without notifying them.
+
+    `users` is a list of User objects. As with `enroll_email`, students who are
+    already enrolled keep their current mode.
+
+    returns a dict mapping the id of each user to the EmailEnrollmentState's
+        representing state before and after the action, and the enrollment.
+    """
+    previous_states = {user.id: EmailEnrollmentState(course_id, user.email) for user in users}
+    if CourseMode.is_white_label(course_id):
+        default_mode = CourseMode.DEFAULT_SHOPPINGCART_MODE_SLUG
+    else:
+        default_mode = None
+
+    users_by_mode = {}
+    for user in users:
+        previous_state = previous_states[user.id]
+        course_mode = previous_state.mode if previous_state.enrollment else default_mode
+        users_by_mode.setdefault(course_mode, []).append(user)
+    enrollments = {}
+    for course_mode, mode_users in users_by_mode.iteritems():
+        for user, enrollment in zip(mode_users, CourseEnrollment.bulk_enroll(mode_users, course_id, course_mode)):
+            enrollments[user.id] = enrollment
+
+    return {
+        user.id: (previous_states[user.id], EmailEnrollmentState(course_id, user.email), enrollments[user.id])
+        for user in users
+    }
+
+
 def unenroll_email(course_id, student_email, email_students=False, email_params=None, language=None):
     """
     Unenroll a student by email.
@@ -1217,6 +1217,51 @@ class TestInstructorAPIEnrollment(SharedModuleStoreTestCase, LoginEnrollmentTest
         res_json = json.loads(response.content)
         self.assertEqual(res_json, expected)
 
+    def test_enroll_without_email_in_bulk(self):
+        other_student = UserFactory()
+        url = reverse('students_update_enrollment', kwargs={'course_id': text_type(self.course.id)})
+        identifiers = u'{}, {}, {}, {}'.format(
+            self.notenrolled_student.username, self.enrolled_student.email, other_student.email,
+            self.notregistered_email,
+        )
+        with patch(
+            'lms.djangoapps.instructor.enrollment.CourseEnrollment.bulk_enroll', wraps=CourseEnrollment.bulk_enroll
+        ) as mock_bulk_enroll:
+            response = self.client.post(
+                url, {'identifiers': identifiers, 'action': 'enroll', 'email_students': False}
+            )
+        self.assertEqual(response.status_code, 200)
+
+        # The registered students are enrolled at once, those already enrolled keeping their mode.
+        self.assertEqual(
+            sorted(len(call_args[0][0]) for call_args in mock_bulk_enroll.call_args_list), [1, 2]
+        )
+        for user in (self.notenrolled_student, self.enrolled_student, other_student):
+            self.assertTrue(CourseEnrollment.is_enrolled(user, self.course.id))
+        self.assertTrue(
+            CourseEnrollmentAllowed.objects.filter(email=self.notregistered_email, course_id=self.course.id).exists()
+        )
+
+        results = json.loads(response.content)['results']
+        self.assertEqual(
+            [
+                (result['identifier'], result['before']['enrollment'], result['after']['enrollment'])
+                for result in results
+            ],
+            [
+                (self.notenrolled_student.username, False, True),
+                (self.enrolled_student.email, True, True),
+                (other_student.email, False, True),
+                (self.notregistered_email, False, False),
+            ]
+        )
+        self.assertEqual(
+            sorted(ManualEnrollmentAudit.objects.values_list('state_transition', flat=True)),
+            sorted([
+                UNENROLLED_TO_ENROLLED, ENROLLED_TO_ENROLLED, UNENROLLED_TO_ENROLLED, UNENROLLED_TO_ALLOWEDTOENROLL
+            ]),
+        )
+
     def test_enroll_without_email(self):
         url = reverse('students_update_enrollment', kwargs={'course_id': text_type(self.course.id)})
         response = self.client.post(url, {'identifiers': self.notenrolled_student.email, 'action': 'enroll',
@@ -74,6 +74,7 @@ from django_comment_common.models import (
 from edxmako.shortcuts import render_to_string
 from lms.djangoapps.instructor.access import ROLES, allow_access, list_with_level, revoke_access, update_forum_role
 from lms.djangoapps.instructor.enrollment import (
+    bulk_enroll_users,
     enroll_email,
     get_email_params,
     get_user_email_language,
@@ -677,7 +678,7 @@ def students_update_enrollment(request, course_id):
         course = get_course_by_id(course_id)
         email_params = get_email_params(course, auto_enroll, secure=request.is_secure())
 
-    results = []
+    students = []
     for identifier in identifiers:
         # First try to get a user object from the identifer
         user = None
@@ -690,16 +691,41 @@ def students_update_enrollment(request, course_id):
         else:
             email = user.email
             language = get_user_email_language(user)
+        students.append((identifier, user, email, language))
+
+    # Registered students who aren't notified are enrolled at once.
+    bulk_enrollments = {}
+    if action == 'enroll' and not email_students:
+        bulk_users = []
+        for __, user, email, __ in students:
+            if user is None:
+                continue
+            try:
+                validate_email(email)
+            except ValidationError:
+                continue
+            bulk_users.append(user)
+        if bulk_users:
+            try:
+                bulk_enrollments = bulk_enroll_users(course_id, bulk_users)
+            except Exception:  # pylint: disable=broad-except
+                # The students are enrolled one at a time below instead.
+                log.exception(u"Error while bulk enrolling students in %s", course_id)
 
+    results = []
+    for identifier, user, email, language in students:
         try:
             # Use django.core.validators.validate_email to check email address
             # validity (obviously, cannot check if email actually /exists/,
             # simply that it is plausibly valid)
             validate_email(email)  # Raises ValidationError if invalid
             if action == 'enroll':
-                before, after, enrollment_obj = enroll_email(
-                    course_id, email, auto_enroll, email_students, email_params, language=language
-                )
+                if user is not None and user.id in bulk_enrollments:
+                    before, after, enrollment_obj = bulk_enrollments[user.id]
+                else:
+                    before, after, enrollment_obj = enroll_email(
+                        course_id, email, auto_enroll, email_students, email_params, language=language
+                    )
                 before_enrollment = before.to_dict()['enrollment']
                 before_user_registered = before.to_dict()['user']
                 before_allowed = before.to_dict()['allowed']
@@ -45,6 +45,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
 from lms.djangoapps.instructor_task.tasks_helper.module_state import (
     delete_problem_module_state,
     perform_module_state_update,
+    perform_module_state_update_subtask,
     override_score_module_state,
     rescore_problem_module_state,
     reset_attempts_module_state
@@ -77,10 +78,35 @@ def rescore_problem(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    def _create_rescore_subtask(student_module_list, initial_subtask_status):
+        """Creates a subtask to rescore a given chunk of StudentModules."""
+        return rescore_problem_subtask.subtask(
+            (
+                entry_id,
+                [student_module['pk'] for student_module in student_module_list],
+                xmodule_instance_args,
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+        )
+
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, create_subtask_fcn=_create_rescore_subtask)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
+@task
+def rescore_problem_subtask(entry_id, student_module_ids, xmodule_instance_args, subtask_status_dict):
+    """
+    Rescores one chunk of the StudentModules of a `rescore_problem` task.
+
+    `student_module_ids` are the primary keys of the StudentModules to rescore, and
+    `subtask_status_dict` is the initial SubtaskStatus of this subtask, as a dict.
+    Progress is recorded into the InstructorTask entry identified by `entry_id`.
+    """
+    update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
+    return perform_module_state_update_subtask(update_fcn, entry_id, student_module_ids, subtask_status_dict)
+
+
 @task(base=BaseInstructorTask)
 def override_problem_score(entry_id, xmodule_instance_args):
     """
@@ -5,6 +5,8 @@ import json
 import logging
 from time import time
 
+from celery.states import FAILURE, SUCCESS
+from django.conf import settings
 from django.utils.translation import ugettext_noop
 from opaque_keys.edx.keys import UsageKey
 
@@ -23,13 +25,16 @@ from xblock.runtime import KvsFieldData
 from xblock.scorable import Score
 from xmodule.modulestore.django import modulestore
 from ..exceptions import UpdateProblemModuleStateError
+from ..models import InstructorTask
+from ..subtasks import SubtaskStatus, check_subtask_is_valid, queue_subtasks_for_query, update_subtask_status
 from .runner import TaskProgress
 from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED, UPDATE_STATUS_SUCCEEDED
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, entry_id, course_id, task_input, action_name,
+                                create_subtask_fcn=None):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -41,6 +46,13 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `create_subtask_fcn` is provided and there are more StudentModule instances to update than
+    settings.INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK, the instances are instead split into chunks
+    of at most that size, and a subtask is queued for each chunk (see `queue_subtasks_for_query`).
+    `create_subtask_fcn` is called with the list of items for the chunk (dicts containing the 'pk' of
+    each StudentModule) and the initial SubtaskStatus of the subtask, and returns the subtask to queue.
+    Subtasks report their progress into the InstructorTask entry as they complete.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -58,31 +70,28 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
     """
     start_time = time()
-    usage_keys = []
-    problem_url = task_input.get('problem_url')
-    entrance_exam_url = task_input.get('entrance_exam_url')
     student_identifier = task_input.get('student')
     override_score_task = action_name == ugettext_noop('overridden')
-    problems = {}
-
-    # if problem_url is present make a usage key from it
-    if problem_url:
-        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
-        usage_keys.append(usage_key)
-
-        # find the problem descriptor:
-        problem_descriptor = modulestore().get_item(usage_key)
-        problems[unicode(usage_key)] = problem_descriptor
-
-    # if entrance_exam is present grab all problems in it
-    if entrance_exam_url:
-        problems = get_problems_in_section(entrance_exam_url)
-        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+    usage_keys, problems = _get_problems_for_task(course_id, task_input)
 
     modules_to_update = _get_modules_to_update(
         course_id, usage_keys, student_identifier, filter_fcn, override_score_task
     )
 
+    items_per_task = settings.INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK
+    if create_subtask_fcn is not None and items_per_task and student_identifier is None:
+        total_num_modules = modules_to_update.count()
+        if total_num_modules > items_per_task:
+            return queue_subtasks_for_query(
+                InstructorTask.objects.get(pk=entry_id),
+                action_name,
+                create_subtask_fcn,
+                [modules_to_update],
+                [],
+                items_per_task,
+                total_num_modules,
+            )
+
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
@@ -106,6 +115,96 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     return task_progress.update_task_state()
 
 
+def perform_module_state_update_subtask(update_fcn, entry_id, student_module_ids, subtask_status_dict):
+    """
+    Performs the update of one chunk of StudentModule instances, as a subtask queued by
+    `perform_module_state_update`.
+
+    `update_fcn` is as for `perform_module_state_update`.  `student_module_ids` are the primary keys
+    of the StudentModule instances in the chunk, which are fetched with a single query.  Instances
+    deleted since the subtask was queued are counted as skipped.
+
+    The subtask's counts are recorded into the parent InstructorTask entry identified by `entry_id`
+    when the chunk is done, or when it has failed, with the instances not updated yet counted as
+    failed.  Returns the final subtask status, as a dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(
+        u"Preparing to update %d student modules as subtask %s for instructor task %d",
+        len(student_module_ids), current_task_id, entry_id,
+    )
+
+    # Reject subtasks that are unknown to the InstructorTask or have already been run.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    counts = {UPDATE_STATUS_SUCCEEDED: 0, UPDATE_STATUS_FAILED: 0, UPDATE_STATUS_SKIPPED: 0}
+    try:
+        entry = InstructorTask.objects.get(pk=entry_id)
+        task_input = json.loads(entry.task_input)
+        _usage_keys, problems = _get_problems_for_task(entry.course_id, task_input)
+        modules_to_update = StudentModule.objects.filter(pk__in=student_module_ids).select_related('student')
+
+        for module_to_update in modules_to_update:
+            module_descriptor = problems[unicode(module_to_update.module_state_key)]
+            update_status = update_fcn(module_descriptor, module_to_update, task_input)
+            if update_status not in counts:
+                raise UpdateProblemModuleStateError("Unexpected update_status returned: {}".format(update_status))
+            counts[update_status] += 1
+    except Exception:
+        TASK_LOG.exception(u"Subtask %s for instructor task %d failed", current_task_id, entry_id)
+        # The module which raised the exception and the ones after it are counted as failed.
+        num_not_updated = len(student_module_ids) - sum(counts.values())
+        subtask_status.increment(
+            succeeded=counts[UPDATE_STATUS_SUCCEEDED],
+            failed=counts[UPDATE_STATUS_FAILED] + num_not_updated,
+            skipped=counts[UPDATE_STATUS_SKIPPED],
+            state=FAILURE,
+        )
+        subtask_status.attempted += counts[UPDATE_STATUS_SKIPPED]
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        raise
+
+    # As in perform_module_state_update, skipped modules count as attempted.
+    num_skipped = len(student_module_ids) - counts[UPDATE_STATUS_SUCCEEDED] - counts[UPDATE_STATUS_FAILED]
+    subtask_status.increment(
+        succeeded=counts[UPDATE_STATUS_SUCCEEDED],
+        failed=counts[UPDATE_STATUS_FAILED],
+        skipped=num_skipped,
+        state=SUCCESS,
+    )
+    subtask_status.attempted += num_skipped
+    update_subtask_status(entry_id, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
+def _get_problems_for_task(course_id, task_input):
+    """
+    Returns the usage keys of the problems to update for the given `task_input`, and a dict
+    mapping the string form of each usage key to the problem's descriptor.
+    """
+    usage_keys = []
+    problems = {}
+    problem_url = task_input.get('problem_url')
+    entrance_exam_url = task_input.get('entrance_exam_url')
+
+    # if problem_url is present make a usage key from it
+    if problem_url:
+        usage_key = UsageKey.from_string(problem_url).map_into_course(course_id)
+        usage_keys.append(usage_key)
+
+        # find the problem descriptor:
+        problem_descriptor = modulestore().get_item(usage_key)
+        problems[unicode(usage_key)] = problem_descriptor
+
+    # if entrance_exam is present grab all problems in it
+    if entrance_exam_url:
+        problems = get_problems_in_section(entrance_exam_url)
+        usage_keys = [UsageKey.from_string(location) for location in problems.keys()]
+
+    return usage_keys, problems
+
+
 @outer_atomic
 def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
     '''
@@ -11,6 +11,7 @@ from uuid import uuid4
 
 import ddt
 from celery.states import FAILURE, SUCCESS
+from django.test import override_settings
 from django.utils.translation import ugettext_noop
 from mock import MagicMock, Mock, patch
 from opaque_keys.edx.locations import i4xEncoder
@@ -489,6 +490,73 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    @override_settings(INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK=3)
+    def test_rescoring_in_subtasks(self):
+        """
+        Tests that rescoring more StudentModules than fit in one subtask is split
+        into subtasks, whose progress is aggregated into the InstructorTask.
+        """
+        mock_instance = MagicMock()
+        getattr(mock_instance, 'rescore').return_value = None
+        mock_instance.has_submitted_answer.side_effect = [True] * 8 + [False] * 2
+
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        subtasks = json.loads(entry.subtasks)
+        self.assertEqual(subtasks['total'], 4)
+        self.assertEqual(subtasks['succeeded'], 4)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=8,
+            skipped=2,
+            failed=0,
+            action_name='rescored'
+        )
+
+    @override_settings(INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK=3)
+    def test_rescoring_subtask_failure(self):
+        """
+        Tests that a failed subtask records the StudentModules it rescored before failing, and
+        counts the rest of its chunk as failed.
+        """
+        mock_instance = MagicMock()
+        getattr(mock_instance, 'rescore').return_value = None
+        mock_instance.has_submitted_answer.side_effect = [True] * 4 + [ValueError('boom')] + [True] * 5
+
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        with patch(
+                'lms.djangoapps.instructor_task.tasks_helper.module_state.get_module_for_descriptor_internal'
+        ) as mock_get_module:
+            mock_get_module.return_value = mock_instance
+            self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        entry = InstructorTask.objects.get(id=task_entry.id)
+        subtasks = json.loads(entry.subtasks)
+        self.assertEqual(subtasks['succeeded'], 3)
+        self.assertEqual(subtasks['failed'], 1)
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=8,
+            skipped=0,
+            failed=2,
+            action_name='rescored'
+        )
+
 
 @attr(shard=3)
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
@@ -0,0 +1,179 @@
+"""
+Service rendering sibling XBlocks concurrently, for blocks like verticals whose
+children's views wait on submissions or external services.
+"""
+import datetime
+import threading
+from copy import deepcopy
+from decimal import Decimal
+
+import crum
+from concurrent.futures import ThreadPoolExecutor
+from django.db import close_old_connections, connections
+from django.utils import timezone, translation
+from edx_django_utils.cache import RequestCache
+from edx_django_utils.cache import utils as request_cache_utils
+from eventtracking import tracker
+from opaque_keys import OpaqueKey
+from xblock.fields import Scope
+
+# Maximum number of blocks rendered at the same time, by all the requests of the process.
+MAX_WORKERS = 8
+
+# Scopes of the field data loaded from the database for the user, ahead of rendering.
+USER_SCOPES = (Scope.user_state, Scope.user_state_summary, Scope.preferences, Scope.user_info)
+
+# Types of the immutable values which the request cache entries copied into rendering threads may hold.
+_IMMUTABLE_TYPES = (
+    basestring, int, long, float, bool, type(None), datetime.date, datetime.timedelta, Decimal, OpaqueKey
+)
+
+_executor_lock = threading.Lock()
+_executor = None
+_worker_state = threading.local()
+
+
+def _get_executor():
+    """
+    Returns the pool of threads the blocks are rendered on, shared by the process.
+    """
+    global _executor  # pylint: disable=global-statement
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        return _executor
+
+
+class ConcurrentRenderService(object):
+    """
+    An XBlock service which renders blocks on a bounded pool of threads.
+
+    The user's field data of the blocks and their descendants is loaded in the
+    request thread before they're rendered, so that renderings don't load it from
+    the database, outside of the request's transaction, one after another. Only
+    the time renderings spend waiting on other services is spent concurrently.
+
+    Each rendering thread gets the current request, language, timezone and event
+    tracking context, and its own deep copy of the entries of the request cache
+    holding plain data, which is discarded once the block is rendered. Blocks
+    rendered by a rendering thread, e.g. the children of a nested vertical, are
+    rendered in that thread, so that renderings never wait on the pool they run on.
+
+    Rendering threads use their own database connections. Blocks are rendered in
+    the request thread while it's in a transaction, e.g. in views with atomic
+    requests, since the rendering threads would neither see the transaction's
+    changes nor have their own writes rolled back with it.
+    """
+    def render_blocks(self, view, blocks_and_contexts):
+        """
+        Renders `view` of the blocks, each with its context, and returns the
+        fragments in the order of `blocks_and_contexts`.
+        """
+        if getattr(_worker_state, 'rendering', False) or _in_atomic_block():
+            return [block.render(view, context) for block, context in blocks_and_contexts]
+
+        _load_user_field_data([block for block, __ in blocks_and_contexts])
+        request_state = _RequestState()
+        executor = _get_executor()
+        futures = [
+            executor.submit(_render_block, block, view, context, request_state)
+            for block, context in blocks_and_contexts
+        ]
+        return [future.result() for future in futures]
+
+
+class _RequestState(object):
+    """
+    The thread-local state of the current request which the rendering threads need.
+    """
+    def __init__(self):
+        self.request = crum.get_current_request()
+        self.language = translation.get_language()
+        self.timezone = timezone.get_current_timezone()
+        self.tracking_context = tracker.get_tracker().resolve_context()
+        self.request_cache = self._copy_request_cache(_get_thread_request_cache().data)
+
+    def get_request_cache_copy(self):
+        """
+        Returns a copy of the snapshot of the request cache, for a rendering thread to use.
+        """
+        return deepcopy(self.request_cache)
+
+    @staticmethod
+    def _copy_request_cache(namespaces):
+        """
+        Returns a deep copy of the entries of the given request cache namespaces holding plain data. Other
+        entries, e.g. XBlocks or FieldDataCaches, can't be shared with other threads and are left out.
+        """
+        return {
+            namespace: {key: deepcopy(value) for key, value in data.iteritems() if _is_plain_data(value)}
+            for namespace, data in namespaces.iteritems()
+        }
+
+
+def _is_plain_data(value):
+    """
+    Returns whether `value` is made of immutable values, and of lists, tuples, sets and dicts of them.
+    """
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return all(_is_plain_data(item) for item in value)
+    if isinstance(value, dict):
+        return all(_is_plain_data(key) and _is_plain_data(item) for key, item in value.iteritems())
+    return False
+
+
+def _in_atomic_block():
+    """
+    Returns whether the current thread is in a transaction on any database.
+    """
+    return any(connection.in_atomic_block for connection in connections.all())
+
+
+def _get_thread_request_cache():
+    """
+    Returns the thread-local holding the namespaces of the RequestCache, which has
+    no public way to list or replace all of them.
+    """
+    return getattr(request_cache_utils, '_REQUEST_CACHE', None) or request_cache_utils.REQUEST_CACHE
+
+
+def _load_user_field_data(blocks):
+    """
+    Loads the user's field data of `blocks` and their descendants into the request's
+    FieldDataCache, by checking one field of each user scope of every block. The field
+    data of a block is loaded along with that of its siblings, so this only runs a
+    query or so per scope and per parent.
+    """
+    for block in blocks:
+        checked_scopes = set()
+        for field_name, field in block.fields.iteritems():
+            if field.scope in USER_SCOPES and field.scope not in checked_scopes:
+                checked_scopes.add(field.scope)
+                block._field_data.has(block, field_name)  # pylint: disable=protected-access
+        if block.has_children:
+            _load_user_field_data(block.get_children())
+
+
+def _render_block(block, view, context, request_state):
+    """
+    Renders `view` of `block` in a thread of the pool, within the request's context.
+    """
+    _worker_state.rendering = True
+    crum.set_current_request(request_state.request)
+    if request_state.language:
+        translation.activate(request_state.language)
+    timezone.activate(request_state.timezone)
+    _get_thread_request_cache().data = request_state.get_request_cache_copy()
+    close_old_connections()
+    try:
+        with tracker.get_tracker().context('concurrent_render', request_state.tracking_context):
+            return block.render(view, context)
+    finally:
+        close_old_connections()
+        RequestCache.clear_all_namespaces()
+        timezone.deactivate()
+        translation.deactivate()
+        crum.set_current_request(None)
+        _worker_state.rendering = False
@@ -9,6 +9,7 @@ import xblock.reference.plugins
 
 from badges.service import BadgingService
 from badges.utils import badges_enabled
+from lms.djangoapps.lms_xblock.concurrent_render import ConcurrentRenderService
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
 from openedx.core.djangoapps.user_api.course_tag import api as user_course_tag_api
 from openedx.core.lib.url_utils import quote_slashes
@@ -140,6 +141,8 @@ class LmsModuleSystem(ModuleSystem):  # pylint: disable=abstract-method
         user = kwargs.get('user')
         if user and user.is_authenticated:
             services['completion'] = CompletionService(user=user, course_key=kwargs.get('course_id'))
+        if settings.FEATURES.get('ENABLE_CONCURRENT_CHILD_RENDERING'):
+            services['concurrent_render'] = ConcurrentRenderService()
         services['fs'] = xblock.reference.plugins.FSService()
         services['i18n'] = ModuleI18nService
         services['library_tools'] = LibraryToolsService(store)
@@ -0,0 +1,134 @@
+"""
+Tests of the concurrent render service
+"""
+import threading
+
+import crum
+from django.test import SimpleTestCase
+from django.utils import translation
+from edx_django_utils.cache import RequestCache
+from mock import Mock, patch
+from web_fragments.fragment import Fragment
+from xblock.fields import Scope
+
+from lms.djangoapps.lms_xblock.concurrent_render import ConcurrentRenderService
+
+
+class ConcurrentRenderServiceTest(SimpleTestCase):
+    """
+    Tests of the ConcurrentRenderService, outside of transactions
+    """
+    def setUp(self):
+        super(ConcurrentRenderServiceTest, self).setUp()
+        self.service = ConcurrentRenderService()
+        self.request = Mock()
+        crum.set_current_request(self.request)
+        self.addCleanup(crum.set_current_request, None)
+        RequestCache.clear_all_namespaces()
+        self.addCleanup(RequestCache.clear_all_namespaces)
+
+    def render_block(self, name, renders):
+        """
+        Returns a block whose renderings are recorded in `renders`.
+        """
+        def render(view, context):  # pylint: disable=missing-docstring
+            renders.append({
+                'name': name,
+                'thread': threading.current_thread(),
+                'request': crum.get_current_request(),
+                'request_cache': dict(RequestCache('test').data),
+                'language': translation.get_language(),
+                'context': context,
+            })
+            RequestCache('test').data['rendered'] = name
+            return Fragment(u'{}:{}'.format(name, view))
+        return Mock(render=Mock(side_effect=render), fields={}, has_children=False)
+
+    def test_render_blocks(self):
+        RequestCache('test').data['rendered'] = 'parent'
+        renders = []
+        blocks_and_contexts = [(self.render_block(name, renders), {'name': name}) for name in ('a', 'b', 'c')]
+
+        with translation.override('fr'):
+            fragments = self.service.render_blocks('student_view', blocks_and_contexts)
+
+        self.assertEqual(
+            [fragment.content for fragment in fragments],
+            [u'a:student_view', u'b:student_view', u'c:student_view'],
+        )
+        self.assertEqual(RequestCache('test').data['rendered'], 'parent')
+        for render in renders:
+            self.assertEqual(render['context'], {'name': render['name']})
+            self.assertIs(render['request'], self.request)
+            self.assertEqual(render['request_cache'], {'rendered': 'parent'})
+            self.assertEqual(render['language'], 'fr')
+            self.assertIsNot(render['thread'], threading.current_thread())
+
+    def test_request_cache_isolated(self):
+        shared_list = ['parent']
+        RequestCache('test').data['list'] = shared_list
+        RequestCache('test').data['object'] = object()
+        renders = []
+
+        def render(view, context):  # pylint: disable=missing-docstring, unused-argument
+            renders.append(dict(RequestCache('test').data))
+            RequestCache('test').data['list'].append('child')
+            return Fragment(u'')
+        blocks_and_contexts = [(Mock(render=Mock(side_effect=render), fields={}, has_children=False), {})] * 2
+
+        self.service.render_blocks('student_view', blocks_and_contexts)
+
+        self.assertEqual(shared_list, ['parent'])
+        for render_cache in renders:
+            # Only plain data is copied into the rendering threads.
+            self.assertEqual(render_cache.keys(), ['list'])
+            self.assertIsNot(render_cache['list'], shared_list)
+
+    @patch('lms.djangoapps.lms_xblock.concurrent_render._in_atomic_block', Mock(return_value=True))
+    def test_render_blocks_in_transaction(self):
+        renders = []
+        blocks_and_contexts = [(self.render_block(name, renders), {'name': name}) for name in ('a', 'b')]
+
+        fragments = self.service.render_blocks('student_view', blocks_and_contexts)
+
+        self.assertEqual([fragment.content for fragment in fragments], [u'a:student_view', u'b:student_view'])
+        for render in renders:
+            self.assertIs(render['thread'], threading.current_thread())
+
+    def test_user_field_data_loaded_before_rendering(self):
+        renders = []
+        child = self.render_block('child', renders)
+        child.fields = {
+            'state': Mock(scope=Scope.user_state),
+            'more_state': Mock(scope=Scope.user_state),
+            'content': Mock(scope=Scope.content),
+        }
+        parent = self.render_block('parent', renders)
+        parent.has_children = True
+        parent.get_children.return_value = [child]
+
+        def render(view, context):  # pylint: disable=missing-docstring, unused-argument
+            # The field data was loaded by the request thread.
+            self.assertEqual(child._field_data.has.call_count, 1)  # pylint: disable=protected-access
+            return Fragment(u'')
+        parent.render.side_effect = render
+
+        self.service.render_blocks('student_view', [(parent, {})])
+
+        field_name = child._field_data.has.call_args[0][1]  # pylint: disable=protected-access
+        self.assertIn(field_name, ('state', 'more_state'))
+
+    def test_nested_render_blocks(self):
+        renders = []
+        child = self.render_block('child', renders)
+
+        def render_parent(view, context):  # pylint: disable=missing-docstring, unused-argument
+            fragments = self.service.render_blocks(view, [(child, {}), (child, {})])
+            return Fragment(u''.join(fragment.content for fragment in fragments))
+        parent = Mock(render=Mock(side_effect=render_parent), fields={}, has_children=False)
+
+        fragments = self.service.render_blocks('student_view', [(parent, {})])
+
+        self.assertEqual([fragment.content for fragment in fragments], [u'child:student_view' * 2] * 2)
+        for render in renders:
+            self.assertIsNot(render['thread'], threading.current_thread())
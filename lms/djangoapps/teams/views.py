@@ -1048,9 +1048,7 @@ class MembershipListView(ExpandableFieldViewMixin, GenericAPIView):
             specified_username_or_team = True
             username = request.query_params['username']
             if not request.user.is_staff:
-                enrolled_courses = (
-                    CourseEnrollment.enrollments_for_user(request.user).values_list('course_id', flat=True)
-                )
+                enrolled_courses = CourseEnrollment.active_enrollment_modes_for_user(request.user).keys()
                 staff_courses = (
                     CourseAccessRole.objects.filter(user=request.user, role='staff').values_list('course_id', flat=True)
                 )
@@ -390,6 +390,12 @@ FEATURES = {
 
     # Whether to display the account deletion section the account settings page
     'ENABLE_ACCOUNT_DELETION': True,
+
+    # Whether verticals render their children concurrently, on a bounded pool of threads. The user's state of
+    # the children is loaded by the request before they're rendered; other database queries of the children
+    # use the threads' own connections. Children are still rendered one after another while the request is in
+    # a transaction, e.g. when ATOMIC_REQUESTS is set and the view isn't exempted from it.
+    'ENABLE_CONCURRENT_CHILD_RENDERING': False,
 }
 
 # Settings for the course reviews tool template and identification key, set either to None to disable course reviews
@@ -963,6 +969,15 @@ DEFAULT_COURSE_ABOUT_IMAGE_URL = 'images/pencils.jpg'
 MEDIA_ROOT = '/edx/var/edxapp/media/'
 MEDIA_URL = '/media/'
 
+# Local disk cache for course assets too large for the django cache, served by the
+# contentserver.  Files are addressed by content digest and the least recently used
+# ones are evicted once the cache grows beyond COURSE_ASSETS_DISK_CACHE_MAX_SIZE bytes.
+# The maximum size is enforced by each process on its own estimate of the cache's size, so
+# a directory shared by several processes can grow up to about one maximum size per process.
+# Set the directory to None to disable the disk cache.
+COURSE_ASSETS_DISK_CACHE_DIR = None
+COURSE_ASSETS_DISK_CACHE_MAX_SIZE = 2 * 1024 * 1024 * 1024
+
 # Locale/Internationalization
 CELERY_TIMEZONE = 'UTC'
 TIME_ZONE = 'America/New_York'  # http://en.wikipedia.org/wiki/List_of_tz_zones_by_name
@@ -2561,6 +2576,13 @@ BADGR_ISSUER_SLUG = "example-issuer"
 # Number of seconds to wait on the badging server when contacting it before giving up.
 BADGR_TIMEOUT = 10
 
+###################### Instructor Tasks ######################
+# Maximum number of StudentModule instances updated by each subtask of a
+# problem rescoring task.  Rescoring tasks with more modules than this are
+# split into subtasks that can run in parallel on several workers.  Set to 0
+# to always rescore in a single task.
+INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK = 500
+
 ###################### Grade Downloads ######################
 # These keys are used for all of our asynchronous downloadable files, including
 # the ones that contain information other than grades.
@@ -3055,6 +3077,22 @@ CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
 # this setting.
 FIELD_OVERRIDE_PROVIDERS = ()
 
+# Whether FieldDataCaches prefetch the xblock field data of blocks as they're added to them. When False,
+# the field data is loaded when first accessed, for the scope accessed and the block's siblings only.
+FIELD_DATA_CACHE_EAGER_LOADING = False
+
+# Whether the states of StudentModules are stored compressed. States are read whichever way they're stored; the
+# compress_student_module_state management command rewrites existing states in the background.
+COMPRESS_STUDENT_MODULE_STATE = False
+
+# Number of seconds the groups users are in for user partitions are cached across requests. Changes of groups, such
+# as cohort changes, can take that long to be applied. When 0, the groups are only memoized for each request.
+USER_PARTITION_GROUPS_CACHE_TIMEOUT = 0
+
+# Maximum number of CourseOverviews each process keeps in memory, until their courses are published again. When 0,
+# CourseOverviews are always read from the database.
+COURSE_OVERVIEW_PROCESS_CACHE_SIZE = 0
+
 # Modulestore-level field override providers. These field override providers don't
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ('openedx.features.content_type_gating.field_override.ContentTypeGatingFieldOverride',)  # pylint: disable=line-too-long
@@ -133,6 +133,13 @@ COURSE_MODE_DEFAULTS = ENV_TOKENS.get('COURSE_MODE_DEFAULTS', COURSE_MODE_DEFAUL
 MEDIA_ROOT = ENV_TOKENS.get('MEDIA_ROOT', MEDIA_ROOT)
 MEDIA_URL = ENV_TOKENS.get('MEDIA_URL', MEDIA_URL)
 
+# COURSE_ASSETS_DISK_CACHE_DIR specifies the directory where large course assets are cached by the contentserver.
+COURSE_ASSETS_DISK_CACHE_DIR = ENV_TOKENS.get('COURSE_ASSETS_DISK_CACHE_DIR', COURSE_ASSETS_DISK_CACHE_DIR)
+COURSE_ASSETS_DISK_CACHE_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_ASSETS_DISK_CACHE_MAX_SIZE',
+    COURSE_ASSETS_DISK_CACHE_MAX_SIZE
+)
+
 # The following variables use (or) instead of the default value inside (get). This is to enforce using the Lazy Text
 # values when the varibale is an empty string. Therefore, setting these variable as empty text in related
 # json files will make the system reads thier values from django translation files
@@ -473,6 +480,14 @@ if FEATURES.get('ENABLE_CORS_HEADERS') or FEATURES.get('ENABLE_CROSS_DOMAIN_CSRF
 # Field overrides. To use the IDDE feature, add
 # 'courseware.student_field_overrides.IndividualStudentOverrideProvider'.
 FIELD_OVERRIDE_PROVIDERS = tuple(ENV_TOKENS.get('FIELD_OVERRIDE_PROVIDERS', []))
+FIELD_DATA_CACHE_EAGER_LOADING = ENV_TOKENS.get('FIELD_DATA_CACHE_EAGER_LOADING', FIELD_DATA_CACHE_EAGER_LOADING)
+COMPRESS_STUDENT_MODULE_STATE = ENV_TOKENS.get('COMPRESS_STUDENT_MODULE_STATE', COMPRESS_STUDENT_MODULE_STATE)
+USER_PARTITION_GROUPS_CACHE_TIMEOUT = ENV_TOKENS.get(
+    'USER_PARTITION_GROUPS_CACHE_TIMEOUT', USER_PARTITION_GROUPS_CACHE_TIMEOUT
+)
+COURSE_OVERVIEW_PROCESS_CACHE_SIZE = ENV_TOKENS.get(
+    'COURSE_OVERVIEW_PROCESS_CACHE_SIZE', COURSE_OVERVIEW_PROCESS_CACHE_SIZE
+)
 
 ############################## SECURE AUTH ITEMS ###############
 # Secret things: passwords, access keys, etc.
@@ -638,6 +653,12 @@ DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH = ENV_TOKENS.get(
     DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH
 )
 
+# Instructor tasks
+INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK = ENV_TOKENS.get(
+    'INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK',
+    INSTRUCTOR_TASK_STUDENT_MODULES_PER_SUBTASK
+)
+
 # Grades download
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
 
@@ -92,6 +92,10 @@ WIKI_ENABLED = True
 # Enable a parental consent age limit for testing
 PARENTAL_CONSENT_AGE_LIMIT = 13
 
+# The query counts asserted throughout the test suite assume that FieldDataCaches prefetch
+# field data; tests of lazy loading ask for it explicitly.
+FIELD_DATA_CACHE_EAGER_LOADING = True
+
 # Local Directories
 TEST_ROOT = path("test_root")
 # Want static files in the same dir for running on jenkins.
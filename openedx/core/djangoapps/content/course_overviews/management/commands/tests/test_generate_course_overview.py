@@ -5,7 +5,11 @@ from django.core.management.base import CommandError
 from mock import patch
 
 from openedx.core.djangoapps.content.course_overviews.management.commands import generate_course_overview
-from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.djangoapps.content.course_overviews.models import (
+    CourseOverview,
+    CourseOverviewImageConfig,
+    CourseOverviewImageSet
+)
 
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
@@ -79,6 +83,42 @@ class TestGenerateCourseOverview(ModuleStoreTestCase):
         self.assertEquals(CourseOverview.get_from_id(self.course_key_1).display_name, updated_course_name)
         self.assertNotEquals(CourseOverview.get_from_id(self.course_key_2).display_name, updated_course_name)
 
+    def test_generate_outdated(self):
+        """
+        Test that outdated course overviews are updated, keeping their thumbnail images.
+        """
+        CourseOverviewImageConfig.objects.create(enabled=True)
+        self.command.handle(all_courses=True)
+        CourseOverview.objects.filter(id=self.course_key_1).update(version=CourseOverview.VERSION - 1)
+
+        with patch.object(CourseOverviewImageSet, 'create') as mock_create_image_set:
+            self.command.handle(all_courses=True)
+        self.assertFalse(mock_create_image_set.called)
+        self.assertEqual(CourseOverview.objects.get(id=self.course_key_1).version, CourseOverview.VERSION)
+        self.assertTrue(CourseOverviewImageSet.objects.filter(course_overview_id=self.course_key_1).exists())
+
+        with patch.object(CourseOverviewImageSet, 'create') as mock_create_image_set:
+            self.command.handle(unicode(self.course_key_1), all_courses=False, force_update=True)
+        self.assertTrue(mock_create_image_set.called)
+
+    @patch('openedx.core.djangoapps.content.course_overviews.models.log')
+    def test_failure_isolation(self, mock_log):
+        """
+        Test that a course failing to load doesn't prevent the other courses from being loaded.
+        """
+        load_from_module_store = CourseOverview.load_from_module_store
+
+        def fail_for_course_1(course_key, **kwargs):
+            if course_key == self.course_key_1:
+                raise IOError('Could not load course')
+            return load_from_module_store(course_key, **kwargs)
+
+        with patch.object(CourseOverview, 'load_from_module_store', side_effect=fail_for_course_1):
+            self.command.handle(all_courses=True)
+        self._assert_courses_not_in_overview(self.course_key_1)
+        self._assert_courses_in_overview(self.course_key_2)
+        self.assertTrue(mock_log.error.called)
+
     def test_invalid_key(self):
         """
         Test that CommandError is raised for invalid key.
@@ -3,6 +3,8 @@ Declaration of CourseOverview model
 """
 import json
 import logging
+import time
+from copy import deepcopy
 from urlparse import urlparse, urlunparse
 
 from django.conf import settings
@@ -14,13 +16,15 @@ from django.template import defaultfilters
 from ccx_keys.locator import CCXLocator
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import CourseKeyField, UsageKeyField
-from six import text_type
+from opaque_keys.edx.keys import CourseKey
+from six import iteritems, text_type
 
 from config_models.models import ConfigurationModel
 from lms.djangoapps import django_comment_client
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.djangoapps.lang_pref.api import get_closest_released_language
 from openedx.core.djangoapps.models.course_details import CourseDetails
+from openedx.core.lib.cache_utils import VersionedProcessCache
 from static_replace.models import AssetBaseUrlConfig
 from xmodule import course_metadata_utils, block_metadata_utils
 from xmodule.course_module import CourseDescriptor, DEFAULT_START_DATE
@@ -202,13 +206,18 @@ class CourseOverview(TimeStampedModel):
         return course_overview
 
     @classmethod
-    def load_from_module_store(cls, course_id):
+    def load_from_module_store(cls, course_id, reuse_image_set=False):
         """
         Load a CourseDescriptor, create or update a CourseOverview from it, cache the
         overview, and return it.
 
+        Only the course block itself is read from the module store, not its children.
+
         Arguments:
             course_id (CourseKey): the ID of the course overview to be loaded.
+            reuse_image_set (bool): whether to keep the thumbnail images of an existing
+                overview whose course image didn't change, instead of generating them
+                again from the course image.
 
         Returns:
             CourseOverview: overview of the requested course.
@@ -221,8 +230,13 @@ class CourseOverview(TimeStampedModel):
         """
         store = modulestore()
         with store.bulk_operations(course_id):
-            course = store.get_course(course_id)
+            course = store.get_course(course_id, depth=0)
             if isinstance(course, CourseDescriptor):
+                previous_course_image_url = None
+                if reuse_image_set:
+                    previous_course_image_url = cls.objects.filter(
+                        id=course_id, image_set__isnull=False
+                    ).values_list('course_image_url', flat=True).first()
                 course_overview = cls._create_or_update(course)
                 try:
                     with transaction.atomic():
@@ -233,9 +247,10 @@ class CourseOverview(TimeStampedModel):
                             CourseOverviewTab(tab_id=tab.tab_id, course_overview=course_overview)
                             for tab in course.tabs
                         ])
-                        # Remove and recreate course images
-                        CourseOverviewImageSet.objects.filter(course_overview=course_overview).delete()
-                        CourseOverviewImageSet.create(course_overview, course)
+                        # Remove and recreate course images, unless they can be reused
+                        if previous_course_image_url != course_overview.course_image_url:
+                            CourseOverviewImageSet.objects.filter(course_overview=course_overview).delete()
+                            CourseOverviewImageSet.create(course_overview, course)
 
                 except IntegrityError:
                     # There is a rare race condition that will occur if
@@ -286,14 +301,19 @@ class CourseOverview(TimeStampedModel):
             - IOError if some other error occurs while trying to load the
                 course from the module store.
         """
-        try:
-            course_overview = cls.objects.select_related('image_set').get(id=course_id)
-            if course_overview.version < cls.VERSION:
-                # Throw away old versions of CourseOverview, as they might contain stale data.
-                course_overview.delete()
+        course_overview = None
+        if COURSE_OVERVIEW_CACHE.maxsize:
+            course_overview = cls.get_many([course_id]).get(course_id)
+
+        if course_overview is None:
+            try:
+                course_overview = cls.objects.select_related('image_set').get(id=course_id)
+                if course_overview.version < cls.VERSION:
+                    # Throw away old versions of CourseOverview, as they might contain stale data.
+                    course_overview.delete()
+                    course_overview = None
+            except cls.DoesNotExist:
                 course_overview = None
-        except cls.DoesNotExist:
-            course_overview = None
 
         # Regenerate the thumbnail images if they're missing (either because
         # they were never generated, or because they were flushed out after
@@ -315,6 +335,36 @@ class CourseOverview(TimeStampedModel):
         Callers should assume that this list is incomplete and fall back to
         get_from_id if they need to guarantee CourseOverview generation.
         """
+        return cls.get_many(course_ids)
+
+    @classmethod
+    def get_many(cls, course_ids):
+        """
+        Return a dict mapping course_ids to up to date CourseOverviews, if they exist.
+
+        When COURSE_OVERVIEW_PROCESS_CACHE_SIZE is set, snapshots of the CourseOverviews
+        are kept in the memory of the process, per course id and version, until their
+        courses are published again. Only the CourseOverviews missing from that cache are
+        read from the database, all with the same query. The CourseOverviews returned are
+        deep copies of the cached snapshots, along with their model state and related objects,
+        which callers are free to modify.
+
+        Like get_from_ids_if_exists, this method will *not* generate new CourseOverviews.
+        """
+        course_ids = [
+            CourseKey.from_string(course_id) if isinstance(course_id, basestring) else course_id
+            for course_id in course_ids
+        ]
+        if not COURSE_OVERVIEW_CACHE.maxsize:
+            return cls._get_many_from_db(course_ids)
+        course_overviews = COURSE_OVERVIEW_CACHE.get_many(course_ids, cls._get_many_from_db)
+        return {course_id: deepcopy(course_overview) for course_id, course_overview in iteritems(course_overviews)}
+
+    @classmethod
+    def _get_many_from_db(cls, course_ids):
+        """
+        Return a dict mapping course_ids to up to date CourseOverviews read from the database.
+        """
         return {
             overview.id: overview
             for overview
@@ -324,6 +374,17 @@ class CourseOverview(TimeStampedModel):
             )
         }
 
+    @classmethod
+    def clear_process_cache(cls, course_id):
+        """
+        Invalidate the snapshots of the CourseOverview of course_id cached by processes,
+        once now and once when the current transaction is committed, so that no process
+        caches the CourseOverview as it was before the transaction in the meantime.
+        """
+        if COURSE_OVERVIEW_CACHE.maxsize:
+            COURSE_OVERVIEW_CACHE.invalidate(course_id)
+            transaction.on_commit(lambda: COURSE_OVERVIEW_CACHE.invalidate(course_id))
+
     @classmethod
     def get_from_id_if_exists(cls, course_id):
         """
@@ -534,6 +595,10 @@ class CourseOverview(TimeStampedModel):
         A side-effecting method that updates CourseOverview objects for
         the given course_keys.
 
+        Outdated CourseOverview objects, such as those left by an increase of
+        CourseOverview.VERSION, are updated in place, keeping their thumbnail
+        images when the course image didn't change.
+
         Arguments:
             course_keys (list[CourseKey]): Identifies for which courses to
                 return CourseOverview objects.
@@ -544,18 +609,43 @@ class CourseOverview(TimeStampedModel):
         log.info('Generating course overview for %d courses.', len(course_keys))
         log.debug('Generating course overview(s) for the following courses: %s', course_keys)
 
-        action = CourseOverview.load_from_module_store if force_update else CourseOverview.get_from_id
+        outdated_course_keys = set()
+        if not force_update:
+            outdated_course_keys = set(
+                CourseOverview.objects.filter(id__in=course_keys, version__lt=cls.VERSION).values_list('id', flat=True)
+            )
 
+        failed_course_keys = []
         for course_key in course_keys:
+            start_time = time.time()
             try:
-                action(course_key)
+                if force_update:
+                    CourseOverview.load_from_module_store(course_key)
+                elif course_key in outdated_course_keys:
+                    CourseOverview.load_from_module_store(course_key, reuse_image_set=True)
+                else:
+                    CourseOverview.get_from_id(course_key)
             except Exception as ex:  # pylint: disable=broad-except
+                failed_course_keys.append(course_key)
                 log.exception(
                     'An error occurred while generating course overview for %s: %s',
                     unicode(course_key),
                     text_type(ex),
                 )
+            else:
+                log.info(
+                    'Generated course overview for %s in %.2f seconds.',
+                    unicode(course_key),
+                    time.time() - start_time,
+                )
 
+        if failed_course_keys:
+            log.error(
+                'Failed to generate course overviews for %d of %d courses: %s',
+                len(failed_course_keys),
+                len(course_keys),
+                ', '.join(unicode(course_key) for course_key in failed_course_keys),
+            )
         log.info('Finished generating course overviews.')
 
     @classmethod
@@ -704,6 +794,13 @@ class CourseOverview(TimeStampedModel):
         return unicode(self.id)
 
 
+# Snapshots of CourseOverviews kept in the memory of the process, see CourseOverview.get_many.
+COURSE_OVERVIEW_CACHE = VersionedProcessCache(
+    u'course_overviews.CourseOverview.v{}'.format(CourseOverview.VERSION),
+    maxsize=getattr(settings, 'COURSE_OVERVIEW_PROCESS_CACHE_SIZE', 0),
+)
+
+
 class CourseOverviewTab(models.Model):
     """
     Model for storing and caching tabs information of a course.
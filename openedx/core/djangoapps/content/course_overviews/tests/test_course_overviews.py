@@ -37,7 +37,7 @@ from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls_range
 
-from ..models import CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
+from ..models import COURSE_OVERVIEW_CACHE, CourseOverview, CourseOverviewImageSet, CourseOverviewImageConfig
 from .factories import CourseOverviewFactory
 
 
@@ -557,6 +557,32 @@ class CourseOverviewTestCase(CatalogIntegrationMixin, ModuleStoreTestCase, Cache
         course_id_to_overview = CourseOverview.get_from_id_if_exists(course_with_overview.id)
         self.assertEqual(course_id_to_overview, None)
 
+    @mock.patch.object(COURSE_OVERVIEW_CACHE, 'maxsize', 10)
+    def test_get_many_from_process_cache(self):
+        course_1 = CourseFactory.create(emit_signals=True)
+        course_2 = CourseFactory.create(emit_signals=True)
+        course_ids = [course_1.id, course_2.id]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(set(CourseOverview.get_many([course_1.id])), {course_1.id})
+        with self.assertNumQueries(1):
+            course_ids_to_overviews = CourseOverview.get_many(course_ids)
+        self.assertEqual(set(course_ids_to_overviews), set(course_ids))
+
+        # The returned CourseOverviews are deep copies of the cached snapshots.
+        course_ids_to_overviews[course_1.id].display_name = u'Changed'
+        course_ids_to_overviews[course_1.id]._state.db = u'changed'  # pylint: disable=protected-access
+        with self.assertNumQueries(0):
+            course_ids_to_overviews = CourseOverview.get_many(course_ids)
+        self.assertEqual(course_ids_to_overviews[course_1.id].display_name, course_1.display_name)
+        self.assertEqual(course_ids_to_overviews[course_1.id]._state.db, u'default')  # pylint: disable=protected-access
+
+        # Saving a CourseOverview invalidates its snapshot.
+        course_ids_to_overviews[course_2.id].version = CourseOverview.VERSION - 1
+        course_ids_to_overviews[course_2.id].save()
+        course_ids_to_overviews = CourseOverview.get_many(course_ids)
+        self.assertEqual(set(course_ids_to_overviews), {course_1.id})
+
 
 @ddt.ddt
 class CourseOverviewImageSetTestCase(ModuleStoreTestCase):
@@ -6,7 +6,7 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, check_mongo_calls
 
-from ..models import CourseOverview
+from ..models import COURSE_OVERVIEW_CACHE, CourseOverview
 
 
 @ddt.ddt
@@ -68,6 +68,25 @@ class CourseOverviewSignalsTestCase(ModuleStoreTestCase):
                 self.store.delete_course(course.id, ModuleStoreEnum.UserID.test)
                 CourseOverview.get_from_id(course.id)
 
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    @patch.object(COURSE_OVERVIEW_CACHE, 'maxsize', 10)
+    def test_process_cache_invalidation(self, modulestore_type):
+        """
+        Tests that when a course is published, the snapshots of its CourseOverview
+        cached by processes are invalidated.
+        """
+        with self.store.default_store(modulestore_type):
+            course = CourseFactory.create(mobile_available=True, default_store=modulestore_type)
+            self.assertTrue(CourseOverview.get_many([course.id])[course.id].mobile_available)
+            with self.assertNumQueries(0):
+                self.assertTrue(CourseOverview.get_many([course.id])[course.id].mobile_available)
+
+            course.mobile_available = False
+            with self.store.branch_setting(ModuleStoreEnum.Branch.draft_preferred):
+                self.store.update_item(course, ModuleStoreEnum.UserID.test)
+
+            self.assertFalse(CourseOverview.get_many([course.id])[course.id].mobile_available)
+
     def assert_changed_signal_sent(self, field_name, initial_value, changed_value, mock_signal):
         course = CourseFactory.create(emit_signals=True, **{field_name: initial_value})
 
@@ -1,11 +1,20 @@
 """
 Helper functions for caching course assets.
 """
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from xmodule.assetstore.assetmgr import AssetManager
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContentStream
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -14,6 +23,13 @@ try:
 except InvalidCacheBackendError:
     pass
 
+# Estimated total size of the files in each local disk cache directory, which is updated as this process
+# adds files, and recomputed whenever it's over the maximum size. Files added by other processes are only
+# accounted for once recomputed, so the maximum size is enforced per process: with several processes
+# sharing a directory, it can grow up to about one maximum size per process between evictions.
+_disk_cache_sizes = {}
+_disk_cache_sizes_lock = threading.Lock()
+
 
 def set_cached_content(content):
     """
@@ -29,9 +45,30 @@ def get_cached_content(location):
     return CONTENT_CACHE.get(unicode(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
 
 
+def _metadata_cache_key(location):
+    """
+    Returns the key under which the metadata of the content at `location` is cached.
+    """
+    return u'metadata.{}'.format(unicode(location)).encode("utf-8")
+
+
+def set_cached_content_metadata(metadata):
+    """
+    Stores the given content metadata in the cache, using its location as the key.
+    """
+    CONTENT_CACHE.set(_metadata_cache_key(metadata.location), metadata, version=STATIC_CONTENT_VERSION)
+
+
+def get_cached_content_metadata(location):
+    """
+    Retrieves the metadata of the content at the given location if cached.
+    """
+    return CONTENT_CACHE.get(_metadata_cache_key(location), version=STATIC_CONTENT_VERSION)
+
+
 def del_cached_content(location):
     """
-    Delete content for the given location, as well versions of the content without a run.
+    Delete content and content metadata for the given location, as well versions of the content without a run.
 
     It's possible that the content could have been cached without knowing the course_key,
     and so without having the run.
@@ -40,11 +77,177 @@ def del_cached_content(location):
         """Force the location to a Unicode string."""
         return unicode(loc).encode("utf-8")
 
-    locations = [location_str(location)]
+    locations = [location]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(location.replace(run=None))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    CONTENT_CACHE.delete_many(
+        [location_str(loc) for loc in locations] + [_metadata_cache_key(loc) for loc in locations],
+        version=STATIC_CONTENT_VERSION
+    )
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    A piece of content whose data is read from its copy in the local disk cache.
+    """
+    read_size = 64 * 1024
+
+    def __init__(self, content, cached_file):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, cached_file,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self.path = cached_file.name
+
+    @property
+    def file(self):
+        """
+        The open file holding the data of this content.
+        """
+        return self._stream
+
+
+def get_disk_cache_path(content_digest):
+    """
+    Returns the path at which content with the given digest is stored in the local disk cache,
+    or None if the disk cache is disabled.
+    """
+    cache_dir = settings.COURSE_ASSETS_DISK_CACHE_DIR
+    if not cache_dir or not content_digest:
+        return None
+    return os.path.join(cache_dir, content_digest[:2], content_digest)
+
+
+def _open_disk_cached_file(path):
+    """
+    Opens the file at `path` in the local disk cache, or returns None if it isn't cached.
+    """
+    try:
+        # Bump the modification time of the file, which is what the LRU eviction goes by.
+        os.utime(path, None)
+        return open(path, 'rb')
+    except (IOError, OSError):
+        # The file isn't cached yet, or was evicted between the two calls above.
+        return None
+
+
+def find_disk_cached_content(metadata):
+    """
+    Returns the content described by `metadata` backed by its copy in the local disk cache, or None
+    if it isn't cached on disk, without reading anything from the contentstore.
+    """
+    path = get_disk_cache_path(metadata.content_digest)
+    if path is None:
+        return None
+    cached_file = _open_disk_cached_file(path)
+    if cached_file is None:
+        return None
+    return DiskCachedContent(metadata, cached_file)
+
+
+def get_disk_cached_content(content):
+    """
+    Returns the given streamed content backed by its copy in the local disk cache, copying it
+    there first if needed.  Returns `content` itself if it can't be cached on disk.
+
+    Files are addressed by content digest, so assets with identical data share a single copy.
+    """
+    path = get_disk_cache_path(content.content_digest)
+    if path is None:
+        return content
+
+    cached_file = _open_disk_cached_file(path)
+    if cached_file is None:
+        try:
+            _write_disk_cached_content(content, path)
+            # Another process may evict the file as soon as it's written.
+            cached_file = open(path, 'rb')
+        except (IOError, OSError):
+            log.exception(u"Could not cache asset %s on disk at %s", content.location, path)
+            # The stream may have been partially read, so start over with a fresh one.
+            content.close()
+            return AssetManager.find(content.location, as_stream=True)
+        _add_disk_cache_size(
+            settings.COURSE_ASSETS_DISK_CACHE_DIR, settings.COURSE_ASSETS_DISK_CACHE_MAX_SIZE, content.length
+        )
+
+    content.close()
+    return DiskCachedContent(content, cached_file)
+
+
+def _write_disk_cached_content(content, path):
+    """
+    Copies the data of `content` to `path`.  The data is written to a temporary file first, which is
+    then moved into place, so that concurrent readers and writers never see a partially written file.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Another process may have created it in the meantime.
+            if not os.path.isdir(directory):
+                raise
+
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as temp_file:
+            for chunk in content.stream_data():
+                temp_file.write(chunk)
+        os.rename(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _add_disk_cache_size(cache_dir, max_size, size):
+    """
+    Adds `size` bytes to the estimated size of the local disk cache, and evicts files from it only
+    when the estimate is over `max_size` bytes, so that the cache isn't walked after every write.
+    """
+    with _disk_cache_sizes_lock:
+        estimated_size = _disk_cache_sizes.get(cache_dir)
+        if estimated_size is not None and estimated_size + size <= max_size:
+            _disk_cache_sizes[cache_dir] = estimated_size + size
+            return
+        # The first write of the process has no estimate to go by, so the cache is walked anyway.
+        _disk_cache_sizes[cache_dir] = _evict_disk_cached_content(cache_dir, max_size)
+
+
+def _evict_disk_cached_content(cache_dir, max_size):
+    """
+    Removes the least recently used files from the local disk cache until it fits within `max_size` bytes.
+    Returns the total size of the files left in the cache.
+    """
+    cached_files = []
+    total_size = 0
+    for directory, __, filenames in os.walk(cache_dir):
+        for filename in filenames:
+            if filename.startswith('.tmp-'):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Evicted by another process.
+                continue
+            cached_files.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+    cached_files.sort()
+    for __, size, path in cached_files:
+        if total_size <= max_size:
+            break
+        try:
+            # Files still being served remain readable until they're closed.
+            os.remove(path)
+        except OSError:
+            continue
+        total_size -= size
+    return total_size
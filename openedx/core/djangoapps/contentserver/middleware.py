@@ -4,24 +4,35 @@ Middleware to serve assets.
 
 import logging
 import datetime
+from uuid import uuid4
 log = logging.getLogger(__name__)
 try:
     import newrelic.agent
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
 from six import text_type
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import (
+    StaticContent, StaticContentMetadata, StaticContentStream, XASSET_LOCATION_TAG
+)
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    DiskCachedContent,
+    find_disk_cached_content,
+    get_cached_content,
+    get_cached_content_metadata,
+    get_disk_cached_content,
+    set_cached_content,
+    set_cached_content_metadata
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -32,6 +43,14 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Assets smaller than this are kept in the django cache, larger ones in the local disk cache. We cap this
+# at 1MB because it's the default for memcached and also we don't want to do too much buffering in memory
+# when we're serving an actual request.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
+# Range requests with more ranges than this are answered with the full content.
+MAX_BYTE_RANGES = 16
+
 
 class StaticContentServer(object):
     """
@@ -68,11 +87,11 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
+            # Attempt to load the asset's metadata to make sure it exists, and grab the asset digest
+            # if we're able to load it.  The asset's data is only loaded once we know we'll send it.
             actual_digest = None
             try:
-                content = self.load_asset_from_location(loc)
+                content = self.load_asset_metadata_from_location(loc)
                 actual_digest = getattr(content, "content_digest", None)
             except (ItemNotFoundError, NotFoundError):
                 return HttpResponseNotFound()
@@ -115,6 +134,12 @@ class StaticContentServer(object):
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
+            if isinstance(content, StaticContentMetadata):
+                try:
+                    content = self.load_asset_from_location(loc, metadata=content)
+                except (ItemNotFoundError, NotFoundError):
+                    return HttpResponseNotFound()
+
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
@@ -122,11 +147,8 @@ class StaticContentServer(object):
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
+            content_type = content.content_type
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -136,40 +158,55 @@ class StaticContentServer(object):
                         u"%s in Range header: %s for content: %s", text_type(exception), header_value, unicode(loc)
                     )
                 else:
+                    satisfiable_ranges = [
+                        (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                    ]
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, text_type(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
+                        # Requesting many (possibly overlapping) ranges is a known way to exhaust server
+                        # resources, so we send back the full content instead.
+                        log.warning(
+                            u"Too many ranges in Range header: %s for content: %s", header_value, text_type(loc)
+                        )
+                    elif not satisfiable_ranges:
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, text_type(loc)
+                            u"Cannot satisfy ranges in Range header: %s for content: %s",
+                            header_value, text_type(loc)
                         )
+                        return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                    elif len(satisfiable_ranges) == 1:
+                        first, last = satisfiable_ranges[0]
+                        response = self.content_response(content, content.stream_data_in_range(first, last))
+                        response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
+                            first=first, last=last, length=content.length
+                        )
+                        response['Content-Length'] = str(last - first + 1)
+                        response.status_code = 206  # Partial Content
                     else:
-                        first, last = ranges[0]
-
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
-                            response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
-                                first=first, last=last, length=content.length
-                            )
-                            response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
-                        else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s",
-                                header_value, text_type(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
+                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                        boundary = uuid4().hex
+                        content_type = 'multipart/byteranges; boundary={}'.format(boundary)
+                        response = self.content_response(
+                            content, stream_byteranges(content, satisfiable_ranges, boundary)
+                        )
+                        response['Content-Length'] = str(
+                            get_byteranges_length(content, satisfiable_ranges, boundary)
+                        )
+                        response.status_code = 206  # Partial Content
+
+                    if response is not None and newrelic:
+                        newrelic.agent.add_custom_parameter('contentserver.ranged', True)
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, DiskCachedContent):
+                    # Let the WSGI server send the file directly (e.g. with sendfile) when it can.
+                    response = FileResponse(content.file)
+                else:
+                    response = self.content_response(content, content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -178,7 +215,7 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            response['Content-Type'] = content_type
             response['X-Frame-Options'] = 'ALLOW'
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -189,6 +226,16 @@ class StaticContentServer(object):
 
             return response
 
+    @staticmethod
+    def content_response(content, data):
+        """
+        Returns a response with the given `data` of `content`, streamed straight from the
+        contentstore if `content` isn't already in memory.
+        """
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(data)
+        return HttpResponse(data)
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -268,27 +315,54 @@ class StaticContentServer(object):
 
         return True
 
-    def load_asset_from_location(self, location):
+    def load_asset_metadata_from_location(self, location):
+        """
+        Loads the metadata of an asset based on its location: the whole asset if it's
+        cached, its cached metadata otherwise, or the metadata loaded directly from the
+        contentstore without reading any of the asset's data.
+        """
+        content = get_cached_content(location)
+        if content is None:
+            content = get_cached_content_metadata(location)
+            if content is None:
+                content = AssetManager.find_metadata(location)
+                set_cached_content_metadata(content)
+
+        return content
+
+    def load_asset_from_location(self, location, metadata=None):
         """
         Loads an asset based on its location, either retrieving it from a cache
         or loading it directly from the contentstore.
+
+        Assets too large for the django cache are read from the local disk cache
+        when a copy with the digest of `metadata`, or of their cached metadata if
+        no metadata is given, is there.
         """
 
         # See if we can load this item from cache.
         content = get_cached_content(location)
         if content is None:
+            if metadata is None:
+                metadata = get_cached_content_metadata(location)
+            if metadata is not None and (metadata.length is None or metadata.length >= MAX_CACHED_CONTENT_LENGTH):
+                content = find_disk_cached_content(metadata)
+                if content is not None:
+                    return content
+
             # Not in cache, so just try and load it from the asset manager.
             try:
                 content = AssetManager.find(location, as_stream=True)
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            # Now that we fetched it, let's go ahead and try to cache it, in the django cache
+            # if it's small enough, and in the local disk cache otherwise.
+            if content.length is not None and content.length < MAX_CACHED_CONTENT_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            else:
+                content = get_disk_cached_content(content)
 
         return content
 
@@ -334,3 +408,46 @@ def parse_range_header(header_value, content_length):
         raise ValueError('Invalid syntax')
 
     return unit, ranges
+
+
+def _byterange_part_header(content, first, last, boundary):
+    """
+    Returns the header preceding the part of a multipart/byteranges message holding bytes `first` to `last`.
+    """
+    return (
+        '\r\n--{boundary}\r\n'
+        'Content-Type: {content_type}\r\n'
+        'Content-Range: bytes {first}-{last}/{length}\r\n\r\n'
+    ).format(
+        boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+    )
+
+
+def _byteranges_end(boundary):
+    """
+    Returns the delimiter closing a multipart/byteranges message.
+    """
+    return '\r\n--{boundary}--\r\n'.format(boundary=boundary)
+
+
+def stream_byteranges(content, ranges, boundary):
+    """
+    Streams the given (first, last) byte ranges of `content` as a multipart/byteranges message.
+
+    See spec for details: http://www.w3.org/Protocols/rfc2616/rfc2616-sec19.html#sec19.2
+    """
+    for first, last in ranges:
+        yield _byterange_part_header(content, first, last, boundary)
+        for chunk in content.stream_data_in_range(first, last):
+            yield chunk
+    yield _byteranges_end(boundary)
+
+
+def get_byteranges_length(content, ranges, boundary):
+    """
+    Returns the length of the message streamed by :func:`stream_byteranges`.
+    """
+    return sum(
+        len(_byterange_part_header(content, first, last, boundary)) + last - first + 1
+        for first, last in ranges
+    ) + len(_byteranges_end(boundary))
@@ -6,6 +6,9 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
@@ -27,6 +30,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import _add_disk_cache_size, _evict_disk_cached_content, get_disk_cache_path
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -207,6 +211,78 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         resp = self.client.get(self.url_locked)
         self.assertEqual(resp.status_code, 200)
 
+    def test_not_modified_asset_data_not_loaded(self):
+        """
+        Test that conditional requests for unchanged assets are answered without loading the asset's data.
+        """
+        last_modified_at = self.contentstore.get_attr(self.unlocked_asset, 'uploadDate')
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load:
+            resp = self.client.get(
+                self.url_unlocked, HTTP_IF_MODIFIED_SINCE=last_modified_at.strftime(HTTP_DATE_FORMAT)
+            )
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse(mock_load.called)
+
+    def test_versioned_asset_redirect_data_not_loaded(self):
+        """
+        Test that requests for outdated versions of assets are redirected without loading the asset's data.
+        """
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load:
+            resp = self.client.get(StaticContent.add_version_to_asset_path(self.url_unlocked, FAKE_MD5_HASH))
+        self.assertEqual(resp.status_code, 301)
+        self.assertFalse(mock_load.called)
+
+    def test_asset_metadata(self):
+        """
+        Test that the metadata loaded for an asset matches the asset itself.
+        """
+        metadata = StaticContentServer().load_asset_metadata_from_location(self.locked_asset)
+        content = self.contentstore.find(self.locked_asset)
+        for propname in ['name', 'content_type', 'length', 'locked', 'content_digest', 'last_modified_at']:
+            self.assertEqual(getattr(metadata, propname), getattr(content, propname))
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0)
+    def test_disk_cached_asset(self):
+        """
+        Test that assets too large for the django cache are served from the local disk cache.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir):
+            resp = self.client.get(self.url_unlocked)
+            self.assertEqual(resp.status_code, 200)
+            self.assertTrue(resp.streaming)
+            content = ''.join(resp.streaming_content)
+            self.assertEqual(len(content), self.length_unlocked)
+
+            content_digest = self.contentstore.get_attr(self.unlocked_asset, 'md5')
+            with open(get_disk_cache_path(content_digest), 'rb') as cached_file:
+                self.assertEqual(cached_file.read(), content)
+
+            # The second request is served from the disk cache, without reading the asset from the contentstore.
+            with patch('openedx.core.djangoapps.contentserver.middleware.AssetManager.find') as mock_find:
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(''.join(resp.streaming_content), content)
+            self.assertFalse(mock_find.called)
+
+            resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-3')
+            self.assertEqual(resp.status_code, 206)
+            self.assertEqual(''.join(resp.streaming_content), content[1:4])
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0)
+    def test_disk_cached_asset_evicted(self):
+        """
+        Test that assets evicted from the local disk cache before they're opened are served from the contentstore.
+        """
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        with override_settings(COURSE_ASSETS_DISK_CACHE_DIR=cache_dir):
+            # The copied file is evicted as soon as it's written.
+            with patch('openedx.core.djangoapps.contentserver.caching._write_disk_cached_content'):
+                resp = self.client.get(self.url_unlocked)
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(len(''.join(resp.streaming_content)), self.length_unlocked)
+
     def test_range_request_full_file(self):
         """
         Test that a range request from byte 0 to last,
@@ -242,13 +318,40 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart message with each of the ranges.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
+        self.assertEqual(resp.status_code, 206)
+        self.assertNotIn('Content-Range', resp)
+        content_type, boundary = resp['Content-Type'].split('; boundary=')
+        self.assertEqual(content_type, 'multipart/byteranges')
+
+        full_content = self.contentstore.find(self.unlocked_asset).data
+        body = resp.content
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+        parts = body.split('\r\n--{}'.format(boundary))
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        expected_ranges = [
+            (first_byte, last_byte),
+            (self.length_unlocked - 100, self.length_unlocked - 1),
+        ]
+        self.assertEqual(len(parts[1:-1]), len(expected_ranges))
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, data = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {}-{}/{}'.format(first, last, self.length_unlocked), headers)
+            self.assertEqual(data, full_content[first:last + 1])
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that a request for more ranges than we're willing to serve outputs the full content.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=' + ', '.join(['0-1'] * 17))
+
         self.assertEqual(resp.status_code, 200)
         self.assertNotIn('Content-Range', resp)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
@@ -403,6 +506,63 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         self.assertEqual(is_from_cdn, True)
 
 
+class DiskCacheEvictionTestCase(unittest.TestCase):
+    """
+    Tests the eviction of the least recently used assets from the local disk cache.
+    """
+    def setUp(self):
+        super(DiskCacheEvictionTestCase, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def cache_file(self, name, size, last_used):
+        """
+        Creates a cached file of the given size, last used `last_used` seconds after the epoch.
+        """
+        path = os.path.join(self.cache_dir, name[:2], name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as cached_file:
+            cached_file.write('x' * size)
+        os.utime(path, (last_used, last_used))
+        return path
+
+    def test_evicts_least_recently_used(self):
+        oldest = self.cache_file('aa01', 10, 1000)
+        older = self.cache_file('bb02', 10, 2000)
+        newest = self.cache_file('aa03', 10, 3000)
+
+        _evict_disk_cached_content(self.cache_dir, 25)
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(older))
+        self.assertTrue(os.path.exists(newest))
+
+        _evict_disk_cached_content(self.cache_dir, 10)
+        self.assertFalse(os.path.exists(older))
+        self.assertTrue(os.path.exists(newest))
+
+    def test_no_eviction_within_max_size(self):
+        paths = [self.cache_file(name, 10, 1000) for name in ('aa01', 'bb02')]
+        self.assertEqual(_evict_disk_cached_content(self.cache_dir, 20), 20)
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+
+    def test_evicts_only_over_estimated_size(self):
+        oldest = self.cache_file('aa01', 10, 1000)
+        self.cache_file('bb02', 10, 2000)
+
+        # The cache is walked to estimate its size on the first write.
+        _add_disk_cache_size(self.cache_dir, 30, 10)
+        newest = self.cache_file('aa03', 10, 3000)
+        with patch('openedx.core.djangoapps.contentserver.caching._evict_disk_cached_content') as mock_evict:
+            _add_disk_cache_size(self.cache_dir, 30, 10)
+        self.assertFalse(mock_evict.called)
+
+        self.cache_file('bb04', 10, 4000)
+        _add_disk_cache_size(self.cache_dir, 30, 10)
+        self.assertFalse(os.path.exists(oldest))
+        self.assertTrue(os.path.exists(newest))
+
+
 @ddt.ddt
 class ParseRangeHeaderTestCase(unittest.TestCase):
     """
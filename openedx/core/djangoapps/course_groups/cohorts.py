@@ -11,7 +11,7 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.db import IntegrityError
-from django.db.models.signals import m2m_changed, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django.http import Http404
 from django.utils.translation import ugettext as _
@@ -19,6 +19,7 @@ from eventtracking import tracker
 from edx_django_utils.cache import RequestCache
 from openedx.core.lib.cache_utils import request_cached
 from student.models import get_user_by_username_or_email
+from xmodule.partitions.partitions_service import clear_user_partition_groups_cache
 
 from .models import (
     CohortMembership,
@@ -62,6 +63,9 @@ def _cohort_membership_changed(sender, **kwargs):
     pk_set = kwargs["pk_set"]
     reverse = kwargs["reverse"]
 
+    if action in ["post_add", "post_remove", "post_clear"]:
+        clear_user_partition_groups_cache()
+
     if action == "post_add":
         event_name = "edx.cohort.user_added"
     elif action in ["post_remove", "pre_clear"]:
@@ -86,6 +90,13 @@ def _cohort_membership_changed(sender, **kwargs):
         tracker.emit(event_name, event)
 
 
+@receiver(post_save, sender=CourseUserGroupPartitionGroup)
+@receiver(post_delete, sender=CourseUserGroupPartitionGroup)
+def _cohort_partition_group_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """Clears the user partition groups memoized for the request when a cohort's group changes"""
+    clear_user_partition_groups_cache()
+
+
 # A 'default cohort' is an auto-cohort that is automatically created for a course if no cohort with automatic
 # assignment have been specified. It is intended to be used in a cohorted course for users who have yet to be assigned
 # to a cohort, if the course staff have not explicitly created a cohort of type "RANDOM".
@@ -10,10 +10,13 @@ from courseware.masquerade import (
     is_masquerading_as_specific_student
 )
 from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from opaque_keys.edx.keys import CourseKey
 from openedx.core.djangoapps.verified_track_content.models import VerifiedTrackCohortedCourse
 from student.models import CourseEnrollment
 from xmodule.partitions.partitions import Group, UserPartition
+from xmodule.partitions.partitions_service import clear_user_partition_groups_cache
 
 LOGGER = logging.getLogger(__name__)
 
@@ -24,6 +27,15 @@ LOGGER = logging.getLogger(__name__)
 ENROLLMENT_GROUP_IDS = settings.COURSE_ENROLLMENT_MODES
 
 
+@receiver(post_save, sender=CourseEnrollment)
+def _enrollment_changed(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clears the user partition groups memoized for the request when an enrollment's
+    mode or status changes.
+    """
+    clear_user_partition_groups_cache()
+
+
 class EnrollmentTrackUserPartition(UserPartition):
     """
     Extends UserPartition to support dynamic groups pulled from the current course Enrollment tracks.
@@ -5,8 +5,11 @@ import collections
 import cPickle as pickle
 import functools
 import itertools
+import threading
 import zlib
+from uuid import uuid4
 
+from django.core.cache import cache
 from django.utils.encoding import force_text
 from edx_django_utils.cache import RequestCache
 import wrapt
@@ -146,6 +149,147 @@ class process_cached(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class VersionedProcessCache(object):
+    """
+    A least-recently-used cache of values kept in the memory of the process,
+    each stamped with the version of its key when it was computed.
+
+    The versions are kept in the django cache, so that invalidating a key in
+    one process makes all processes recompute its value when it's next read.
+    Each version is read from the django cache once per request, so a key
+    invalidated by another process is recomputed from its next request on.
+    Values are returned as cached, and must not be modified by callers.
+    """
+    def __init__(self, namespace, maxsize):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_request_versions(self):
+        """
+        Returns the dict of the versions read by the current request, by key.
+        """
+        return get_cache(u'{}.versions'.format(self.namespace))
+
+    def _version_cache_key(self, key):
+        """
+        Returns the django cache key of the version of `key`.
+        """
+        return u'{}.version.{}'.format(self.namespace, key)
+
+    def _get_version(self, key):
+        """
+        Returns the current version of `key`, stamping it with a new one if it has none.
+        """
+        request_versions = self._get_request_versions()
+        version = request_versions.get(key)
+        if version is None:
+            version = self._read_version(key)
+            request_versions[key] = version
+        return version
+
+    def _read_version(self, key):
+        """
+        Reads the version of `key` from the django cache, stamping it with a new one if it has none.
+        """
+        version_cache_key = self._version_cache_key(key)
+        version = cache.get(version_cache_key)
+        if version is None:
+            version = uuid4().hex
+            if not cache.add(version_cache_key, version, None):
+                version = cache.get(version_cache_key) or version
+        return version
+
+    def _get_versions(self, keys):
+        """
+        Returns a dict of the current versions of `keys`, reading those the current
+        request hasn't read yet from the django cache at once.
+        """
+        request_versions = self._get_request_versions()
+        version_cache_keys = {
+            key: self._version_cache_key(key) for key in keys if request_versions.get(key) is None
+        }
+        if version_cache_keys:
+            cached_versions = cache.get_many(version_cache_keys.values())
+            for key, version_cache_key in version_cache_keys.iteritems():
+                request_versions[key] = cached_versions.get(version_cache_key) or self._read_version(key)
+        return {key: request_versions[key] for key in keys}
+
+    def _get_entry(self, key):
+        """
+        Returns the (version, value) entry cached for `key`, if any, and marks it as recently used.
+        Must be called with the lock held.
+        """
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._data[key] = entry
+        return entry
+
+    def _set_entry(self, key, version, value):
+        """
+        Caches `value` for `key` at `version`, evicting the least recently used entries.
+        Must be called with the lock held.
+        """
+        self._data.pop(key, None)
+        self._data[key] = (version, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_set(self, key, compute_value):
+        """
+        Returns the value cached for `key` if its version is current, or else
+        the value returned by `compute_value()`, which is cached.
+        """
+        version = self._get_version(key)
+        with self._lock:
+            entry = self._get_entry(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        value = compute_value()
+        with self._lock:
+            self._set_entry(key, version, value)
+        return value
+
+    def get_many(self, keys, compute_values):
+        """
+        Returns a dict mapping `keys` to their values. The values cached for keys
+        whose versions are current are used, and the others are taken from the dict
+        returned by `compute_values(missing_keys)` and cached. Keys that aren't in
+        that dict are left out of the result.
+        """
+        versions = self._get_versions(keys)
+        values = {}
+        missing_keys = []
+        with self._lock:
+            for key in keys:
+                entry = self._get_entry(key)
+                if entry is not None and entry[0] == versions[key]:
+                    values[key] = entry[1]
+                else:
+                    missing_keys.append(key)
+
+        if missing_keys:
+            computed_values = compute_values(missing_keys)
+            with self._lock:
+                for key in missing_keys:
+                    if key in computed_values:
+                        self._set_entry(key, versions[key], computed_values[key])
+                        values[key] = computed_values[key]
+        return values
+
+    def invalidate(self, key):
+        """
+        Stamps `key` with a new version, so that all processes recompute its value.
+        """
+        version = uuid4().hex
+        cache.set(self._version_cache_key(key), version, None)
+        self._get_request_versions()[key] = version
+        with self._lock:
+            self._data.pop(key, None)
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
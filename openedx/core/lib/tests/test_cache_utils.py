@@ -5,10 +5,12 @@ Tests for cache_utils.py
 from unittest import TestCase
 
 import ddt
-from mock import Mock
+from django.core.cache import cache
+from mock import Mock, patch
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import VersionedProcessCache, request_cached
 
 
 @ddt.ddt
@@ -295,3 +297,71 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestVersionedProcessCache(CacheIsolationTestCase):
+    """
+    Test the VersionedProcessCache.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(TestVersionedProcessCache, self).setUp()
+        self.compute_value = Mock(side_effect=lambda: self.compute_value.call_count)
+
+    def test_get_or_set(self):
+        versioned_cache = VersionedProcessCache(u'test', maxsize=10)
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 1)
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 1)
+        self.assertEqual(versioned_cache.get_or_set('other_key', self.compute_value), 2)
+        self.assertEqual(self.compute_value.call_count, 2)
+
+    def test_invalidate(self):
+        versioned_cache = VersionedProcessCache(u'test', maxsize=10)
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 1)
+        versioned_cache.invalidate('key')
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 2)
+
+    def test_invalidate_in_other_process(self):
+        versioned_cache = VersionedProcessCache(u'test', maxsize=10)
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 1)
+        # Another process stamps the key with a new version.
+        cache.set(versioned_cache._version_cache_key('key'), 'other_version', None)  # pylint: disable=protected-access
+        # The version is read once per request.
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 1)
+        RequestCache.clear_all_namespaces()
+        self.assertEqual(versioned_cache.get_or_set('key', self.compute_value), 2)
+
+    def test_versions_read_once_per_request(self):
+        versioned_cache = VersionedProcessCache(u'test', maxsize=10)
+        with patch('openedx.core.lib.cache_utils.cache', wraps=cache) as mock_cache:
+            versioned_cache.get_or_set('key', self.compute_value)
+            versioned_cache.get_or_set('key', self.compute_value)
+            versioned_cache.get_many(['key'], Mock())
+        self.assertEqual(mock_cache.get.call_count, 1)
+
+    def test_maxsize(self):
+        versioned_cache = VersionedProcessCache(u'test', maxsize=2)
+        versioned_cache.get_or_set('first', self.compute_value)
+        versioned_cache.get_or_set('second', self.compute_value)
+        versioned_cache.get_or_set('first', self.compute_value)
+        versioned_cache.get_or_set('third', self.compute_value)
+        self.assertEqual(versioned_cache.get_or_set('first', self.compute_value), 1)
+        self.assertEqual(versioned_cache.get_or_set('second', self.compute_value), 4)
+
+    def test_get_many(self):
+        versioned_cache = VersionedProcessCache(u'test', maxsize=10)
+        compute_values = Mock(side_effect=lambda keys: {key: key.upper() for key in keys if key != 'missing'})
+        self.assertEqual(versioned_cache.get_or_set('first', self.compute_value), 1)
+        self.assertEqual(
+            versioned_cache.get_many(['first', 'second', 'missing'], compute_values),
+            {'first': 1, 'second': 'SECOND'},
+        )
+        compute_values.assert_called_once_with(['second', 'missing'])
+
+        versioned_cache.invalidate('first')
+        self.assertEqual(
+            versioned_cache.get_many(['first', 'second'], compute_values),
+            {'first': 'FIRST', 'second': 'SECOND'},
+        )
+        compute_values.assert_called_with(['first'])
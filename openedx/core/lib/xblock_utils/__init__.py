@@ -254,6 +254,21 @@ def replace_course_urls(course_id, block, view, frag, context):  # pylint: disab
     return wrap_fragment(frag, static_replace.replace_course_urls(frag.content, course_id))
 
 
+def replace_urls(course_id, jump_to_id_base_url, data_dir, block, view, frag, context, static_asset_path=''):  # pylint: disable=unused-argument
+    """
+    Substitutes /static/..., /course/... and /jump_to_id/... urls in the fragment content
+    in a single pass; equivalent to wrapping with replace_static_urls, replace_course_urls
+    and replace_jump_to_id_urls in turn.
+    """
+    return wrap_fragment(frag, static_replace.replace_urls(
+        frag.content,
+        course_id,
+        jump_to_id_base_url=jump_to_id_base_url,
+        data_directory=data_dir,
+        static_asset_path=static_asset_path
+    ))
+
+
 def replace_static_urls(data_dir, block, view, frag, context, course_id=None, static_asset_path=''):  # pylint: disable=unused-argument
     """
     Updates the supplied module with a new get_html function that wraps